@@ -0,0 +1,148 @@
+"""
+Benchmark Model.asdict() and Model.clean() against the previous implementation.
+
+The reference functions below are verbatim copies of the per-call versions the
+compiled serializers replaced; the benchmark checks both produce identical
+output before timing them.
+
+Usage:
+    python benchmarks/entity_serialization.py --count 1000000
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from fractal_repositories.core.entity import Entity
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    INACTIVE = "inactive"
+
+
+@dataclass
+class Customer(Entity):
+    name: str
+    email: str
+    age: int
+    balance: Decimal
+    status: Status
+    account_id: UUID
+    tags: List[str]
+    created_at: datetime
+    birthday: Optional[date] = None
+
+
+def legacy_asdict(self, *, skip_types=None, use_timezone_z=False):
+    if skip_types is None:
+        skip_types = []
+    field_names = {
+        f.name for f in fields(self) if f.name not in self.calculated_fields()
+    }
+
+    def _asdict(v):
+        if v is None:
+            return None
+        if isinstance(v, Entity):
+            return legacy_asdict(
+                v, skip_types=skip_types, use_timezone_z=use_timezone_z
+            )
+        elif isinstance(v, dict) and dict not in skip_types:
+            return {k: _asdict(val) for k, val in v.items()}
+        elif isinstance(v, (list, tuple)) and type(v) not in skip_types:
+            result = [_asdict(i) for i in v]
+            return type(v)(result) if isinstance(v, tuple) else result
+        elif isinstance(v, Decimal) and Decimal not in skip_types:
+            return f"{v:.2f}"
+        elif type(v) is datetime and datetime not in skip_types:
+            return (
+                v.isoformat().replace("+00:00", "Z")
+                if use_timezone_z
+                else v.isoformat()
+            )
+        elif type(v) is date and date not in skip_types:
+            return v.strftime("%Y-%m-%d")
+        elif isinstance(v, UUID) and UUID not in skip_types:
+            return str(v)
+        elif isinstance(v, Enum) and Enum not in skip_types:
+            return v.value
+        return v
+
+    return {k: _asdict(v) for k, v in self.__dict__.items() if k in field_names}
+
+
+def legacy_clean(cls, **kwargs):
+    field_names = {
+        f.name
+        for f in fields(cls)
+        if f.type not in (date, datetime) or kwargs.get(f.name)
+    }
+    return cls(**{k: v for k, v in kwargs.items() if k in field_names})
+
+
+def make_customers(count: int) -> List[Customer]:
+    now = datetime.now(timezone.utc)
+    return [
+        Customer(
+            id=str(i),
+            name=f"customer {i}",
+            email=f"customer{i}@example.com",
+            age=20 + i % 50,
+            balance=Decimal(i) / 100,
+            status=Status.ACTIVE if i % 2 else Status.INACTIVE,
+            account_id=uuid4(),
+            tags=["a", "b"],
+            created_at=now,
+            birthday=date(1990, 1, 1 + i % 28),
+        )
+        for i in range(count)
+    ]
+
+
+def timed(label: str, count: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f}s  {count / elapsed:>12,.0f} ops/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    customers = make_customers(args.count)
+    dicts = [c.asdict(skip_types=[datetime, date, Decimal]) for c in customers]
+
+    for customer in customers[:1000]:
+        assert customer.asdict() == legacy_asdict(customer)
+        assert customer.asdict(use_timezone_z=True) == legacy_asdict(
+            customer, use_timezone_z=True
+        )
+    for data in dicts[:1000]:
+        assert Customer.clean(**data) == legacy_clean(Customer, **data)
+
+    legacy = timed(
+        "asdict (legacy)", args.count, lambda: [legacy_asdict(c) for c in customers]
+    )
+    compiled = timed("asdict", args.count, lambda: [c.asdict() for c in customers])
+    print(f"asdict speedup: {legacy / compiled:.2f}x")
+
+    legacy = timed(
+        "clean (legacy)",
+        args.count,
+        lambda: [legacy_clean(Customer, **d) for d in dicts],
+    )
+    compiled = timed("clean", args.count, lambda: [Customer.clean(**d) for d in dicts])
+    print(f"clean speedup: {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
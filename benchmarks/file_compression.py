@@ -0,0 +1,102 @@
+"""
+Benchmark block compression of a FileRepositoryMixin table.
+
+For no compression and each installed compressor, writes --count entities
+with ``add_many`` (one block per batch), compacts the table (blocks of
+``compression_block_size``), then times a full ``find()`` and --gets random
+``get`` calls through the offset index. Prints the size on disk, the
+compression ratio and the throughput of each step.
+
+Usage:
+    python benchmarks/file_compression.py --count 200000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+from fractal_repositories.utils.compression import COMPRESSORS, get_compressor
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    user: str
+    amount: int
+    note: str
+
+
+class EventRepository(FileRepositoryMixin[Event]):
+    entity = Event
+    offset_index = True
+
+
+def installed_compressors():
+    yield ""
+    for name in COMPRESSORS:
+        try:
+            get_compressor(name)
+        except ImportError:
+            continue
+        yield name
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--gets", type=int, default=2000)
+    args = parser.parse_args()
+
+    events = [
+        Event(str(i), f"kind{i % 5}", f"user{i % 1000}", i, "x" * (i % 40))
+        for i in range(args.count)
+    ]
+    ids = random.Random(0).choices([e.id for e in events], k=args.gets)
+
+    print(
+        f"{'compression':<12} {'size':>10} {'ratio':>6} {'write/s':>10} "
+        f"{'scan/s':>11} {'get/s':>8}"
+    )
+    plain_size = 0
+    for compression in installed_compressors():
+        with tempfile.TemporaryDirectory() as root_dir:
+            os.makedirs(os.path.join(root_dir, "db"))
+
+            class Repository(EventRepository):
+                pass
+
+            Repository.compression = compression
+            repository = Repository(root_dir=root_dir)
+            write_time, _ = timed(lambda r=repository: r.add_many(events))
+            repository.compact()
+            size = os.path.getsize(repository._filename)
+            plain_size = plain_size or size
+
+            reader = Repository(root_dir=root_dir)
+            scan_time, found = timed(lambda r=reader: list(r.find()))
+            assert found == events
+            reader.count()  # builds the offset index
+            get_time, _ = timed(lambda r=reader: [r.get(id) for id in ids])
+            print(
+                f"{compression or 'none':<12} {size / 2**20:>7.1f} MB "
+                f"{plain_size / size:>5.1f}x "
+                f"{args.count / write_time:>10,.0f} "
+                f"{args.count / scan_time:>11,.0f} "
+                f"{args.gets / get_time:>8,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
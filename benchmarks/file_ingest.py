@@ -0,0 +1,65 @@
+"""
+Benchmark one-at-a-time ingestion into a FileRepositoryMixin table per durability.
+
+Adds --count entities with ``add`` (one call per entity) under each
+``durability`` policy, checks every table reads back the same entities, and
+prints the per-entity cost of each.
+
+Usage:
+    python benchmarks/file_ingest.py --count 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    amount: int
+
+
+class EventRepository(FileRepositoryMixin[Event]):
+    entity = Event
+
+
+def ingest(events, **kwargs):
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(os.path.join(root_dir, "db"))
+        start = time.perf_counter()
+        with EventRepository(root_dir=root_dir, **kwargs) as repository:
+            for event in events:
+                repository.add(event)
+        elapsed = time.perf_counter() - start
+        assert list(EventRepository(root_dir=root_dir).find()) == events
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    events = [Event(str(i), f"kind{i % 5}", i) for i in range(args.count)]
+    # fsync per entity is slow enough that a sample gives the per-entity cost.
+    always_sample = events[: min(args.count, 1000)]
+    policies = {
+        "always": (always_sample, {"durability": "always"}),
+        "os": (events, {"durability": "os"}),
+        "batch": (events, {"durability": "batch"}),
+    }
+    print(f"{'durability':<12} {'per entity':>12}")
+    for name, (sample, kwargs) in policies.items():
+        elapsed = ingest(sample, **kwargs)
+        print(f"{name:<12} {elapsed / len(sample) * 1e6:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark a locking FileRepositoryMixin table shared by concurrent processes.
+
+Starts 1 and then --workers processes on the same table, each running
+--count operations: an ``add`` followed by a ``count`` that (after the first
+one) only parses the lines appended by the other workers, with every tenth
+operation a ``get`` of an entity another worker added. Checks no write was
+lost and prints the total throughput of each run.
+
+Usage:
+    python benchmarks/file_locking.py --workers 8 --count 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.exceptions import ObjectNotFoundException
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    worker: int
+    amount: int
+
+
+class EventRepository(FileRepositoryMixin[Event]):
+    entity = Event
+    locking = True
+
+
+def work(root_dir: str, worker: int, count: int, start) -> None:
+    repository = EventRepository(root_dir=root_dir)
+    start.wait()
+    for i in range(count):
+        repository.add(Event(f"{worker}-{i}", worker, i))
+        repository.count()
+        if i % 10 == 9:
+            try:
+                repository.get(f"0-{i}")
+            except ObjectNotFoundException:
+                pass  # worker 0 has not got there yet
+
+
+def run(workers: int, count: int) -> float:
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(os.path.join(root_dir, "db"))
+        start = context.Barrier(workers + 1)
+        processes = [
+            context.Process(target=work, args=(root_dir, worker, count, start))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        start.wait()
+        began = time.perf_counter()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - began
+        assert all(process.exitcode == 0 for process in processes)
+        assert EventRepository(root_dir=root_dir).count() == workers * count
+    return workers * count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'processes':<10} {'add + count / s':>16}")
+    for workers in sorted({1, args.workers}):
+        print(f"{workers:<10} {run(workers, args.count):>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
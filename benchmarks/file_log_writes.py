@@ -0,0 +1,92 @@
+"""
+Benchmark point writes and reads on a FileRepositoryMixin table by format.
+
+Loads --count entities, then times single ``update``, ``delete`` and ``get``
+calls (the mean of --repeat calls after a warm-up call) on the default
+(rewrite) format and the log-structured one, with and without the offset
+index.
+
+Usage:
+    python benchmarks/file_log_writes.py --count 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    amount: int
+
+
+class EventRepository(FileRepositoryMixin[Event]):
+    entity = Event
+    # Keep compaction out of the timings.
+    compaction_min_records = 10**9
+
+
+class EventLogRepository(EventRepository):
+    log_structured = True
+
+
+class IndexedEventLogRepository(EventLogRepository):
+    offset_index = True
+
+
+def timed(call, ids):
+    call(ids[0])  # warm-up: builds indexes
+    start = time.perf_counter()
+    for id in ids[1:]:
+        call(id)
+    return (time.perf_counter() - start) / (len(ids) - 1)
+
+
+def run(repository_class, events, repeat):
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(os.path.join(root_dir, "db"))
+        repository_class(root_dir=root_dir).add_many(events)
+        repository = repository_class(root_dir=root_dir)
+        step = len(events) // (3 * repeat + 3)
+        ids = [event.id for event in events[::step]]
+        update_ids, delete_ids, get_ids = (
+            ids[: repeat + 1],
+            ids[repeat + 1 : 2 * repeat + 2],
+            ids[2 * repeat + 2 : 3 * repeat + 3],
+        )
+        return (
+            timed(lambda id: repository.get(id), get_ids),
+            timed(lambda id: repository.update(Event(id, "updated", 0)), update_ids),
+            timed(lambda id: repository.delete(id), delete_ids),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = [Event(str(i), f"kind{i % 5}", i) for i in range(args.count)]
+    print(f"{'format':<20} {'get':>10} {'update':>10} {'delete':>10}")
+    for name, repository_class in {
+        "rewrite": EventRepository,
+        "log": EventLogRepository,
+        "log + offset_index": IndexedEventLogRepository,
+    }.items():
+        get, update, delete = run(repository_class, events, args.repeat)
+        print(
+            f"{name:<20} {get * 1e3:>7.2f} ms {update * 1e3:>7.2f} ms "
+            f"{delete * 1e3:>7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
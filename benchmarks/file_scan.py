@@ -0,0 +1,81 @@
+"""
+Benchmark full scans of a FileRepositoryMixin table, text reader against mmap.
+
+Writes --count entities to a temporary table, then times a full ``find()``
+with the text-mode reader and with ``memory_map = True``, for each installed
+codec, checking every combination reads back the same entities.
+
+Usage:
+    python benchmarks/file_scan.py --count 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+from fractal_repositories.utils.codecs import CODECS, get_codec
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    user: str
+    amount: int
+    note: str
+
+
+class EventRepository(FileRepositoryMixin[Event]):
+    entity = Event
+
+
+def installed_codecs():
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        yield name
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        events = [
+            Event(str(i), f"kind{i % 5}", f"user{i % 1000}", i, "x" * (i % 40))
+            for i in range(args.count)
+        ]
+        os.makedirs(os.path.join(root_dir, "db"))
+        EventRepository(root_dir=root_dir).add_many(events)
+
+        print(f"{'codec':<10} {'text':>12} {'mmap':>12} {'speedup':>8}")
+        for codec in installed_codecs():
+            text = EventRepository(root_dir=root_dir, codec=codec)
+            mapped = EventRepository(root_dir=root_dir, codec=codec)
+            mapped.memory_map = True
+            text_time, expected = timed(lambda r=text: list(r.find()))
+            mapped_time, found = timed(lambda r=mapped: list(r.find()))
+            assert found == expected == events
+            print(
+                f"{codec:<10} "
+                f"{text_time / args.count * 1e9:>9.0f} ns "
+                f"{mapped_time / args.count * 1e9:>9.0f} ns "
+                f"{text_time / mapped_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
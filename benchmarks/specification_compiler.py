@@ -0,0 +1,87 @@
+"""
+Benchmark compiled specifications against Specification.is_satisfied_by.
+
+Filters --count entities with a few representative specifications, both by
+walking the specification tree per entity and with the predicate from
+compile_specification, checks both select the same entities, and prints the
+per-entity cost of each.
+
+Usage:
+    python benchmarks/specification_compiler.py --count 1000000
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+
+from fractal_specifications.generic.specification import Specification
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.utils.specification_compiler import compile_specification
+
+
+@dataclass
+class Order(Entity):
+    customer: str
+    status: str
+    amount: int
+    tags: list
+
+
+SPECIFICATIONS = {
+    "equals": Specification.parse(status="open"),
+    "and (3 fields)": Specification.parse(
+        status="open", amount__gte=100, customer__in=["c1", "c2", "c3"]
+    ),
+    "or / not / contains": (
+        Specification.parse(status="closed")
+        | Specification.Not(Specification.parse(tags__contains="vip"))
+    ),
+}
+
+
+def make_orders(count: int):
+    statuses = ["open", "closed", "pending"]
+    return [
+        Order(
+            id=str(i),
+            customer=f"c{i % 10}",
+            status=statuses[i % 3],
+            amount=i % 500,
+            tags=["vip"] if i % 7 == 0 else [],
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    orders = make_orders(args.count)
+    print(f"{'specification':<22} {'tree walk':>12} {'compiled':>12} {'speedup':>8}")
+    for name, specification in SPECIFICATIONS.items():
+        tree, expected = timed(
+            lambda spec=specification: [o for o in orders if spec.is_satisfied_by(o)]
+        )
+        compiled, found = timed(
+            lambda spec=specification: list(filter(compile_specification(spec), orders))
+        )
+        assert found == expected
+        print(
+            f"{name:<22} "
+            f"{tree / args.count * 1e9:>9.0f} ns "
+            f"{compiled / args.count * 1e9:>9.0f} ns "
+            f"{tree / compiled:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
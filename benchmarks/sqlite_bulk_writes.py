@@ -0,0 +1,78 @@
+"""
+Benchmark bulk writes to a SqliteRepositoryMixin table.
+
+For each ``connection`` mode, writes --count entities four ways: one ``add``
+per entity (one commit each), the same loop inside ``transaction()`` (one
+commit), ``add_many`` and ``update_many(upsert=True)`` (executemany in
+batches of --batch-size, one commit). Prints the rows per second of each.
+
+Usage:
+    python benchmarks/sqlite_bulk_writes.py --count 100000
+"""
+
+import argparse
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.sqlite_repository_mixin import SqliteRepositoryMixin
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    user: str
+    amount: int
+
+
+class EventRepository(SqliteRepositoryMixin[Event]):
+    entity = Event
+
+
+def add_loop(repository, events, batch_size):
+    for event in events:
+        repository.add(event)
+
+
+def add_in_transaction(repository, events, batch_size):
+    with repository.transaction():
+        for event in events:
+            repository.add(event)
+
+
+def add_many(repository, events, batch_size):
+    repository.add_many(events, batch_size=batch_size)
+
+
+def upsert_many(repository, events, batch_size):
+    repository.update_many(events, upsert=True, batch_size=batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    events = [
+        Event(str(i), f"kind{i % 5}", f"user{i % 1000}", i) for i in range(args.count)
+    ]
+    print(f"{'connection':<10} {'write':<20} {'rows/s':>10}")
+    for connection in SqliteRepositoryMixin._CONNECTIONS:
+        for write in (add_loop, add_in_transaction, add_many, upsert_many):
+            with tempfile.TemporaryDirectory() as root_dir:
+                repository = EventRepository(root_dir=root_dir, connection=connection)
+                start = time.perf_counter()
+                write(repository, events, args.batch_size)
+                elapsed = time.perf_counter() - start
+                assert repository.count() == args.count
+                repository.close()
+            print(
+                f"{connection:<10} {write.__name__:<20} {args.count / elapsed:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
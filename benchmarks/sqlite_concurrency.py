@@ -0,0 +1,112 @@
+"""
+Benchmark concurrent readers and writers on one SqliteRepositoryMixin table.
+
+For each ``pragmas`` preset, seeds the table with --count entities, then
+runs --writers processes that ``add`` entities (one commit each) alongside
+--readers processes that ``get`` random entities, all for --seconds. Prints
+the writes and reads per second of each preset.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py --writers 2 --readers 4 --seconds 5
+"""
+
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.sqlite_repository_mixin import (
+    PRAGMA_PRESETS,
+    SqliteRepositoryMixin,
+)
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    worker: int
+    amount: int
+
+
+class EventRepository(SqliteRepositoryMixin[Event]):
+    entity = Event
+
+
+def write(root_dir, pragmas, worker, seconds, start, done):
+    repository = EventRepository(
+        root_dir=root_dir, connection="thread", pragmas=pragmas
+    )
+    start.wait()
+    end, count = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        repository.add(Event(f"w{worker}-{count}", worker, count))
+        count += 1
+    done.put(("write", count))
+
+
+def read(root_dir, pragmas, worker, seconds, seeded, start, done):
+    repository = EventRepository(
+        root_dir=root_dir, connection="thread", pragmas=pragmas
+    )
+    rng = random.Random(worker)
+    start.wait()
+    end, count = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        repository.get(str(rng.randrange(seeded)))
+        count += 1
+    done.put(("read", count))
+
+
+def run(pragmas, args):
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as root_dir:
+        EventRepository(root_dir=root_dir, pragmas=pragmas).add_many(
+            Event(str(i), -1, i) for i in range(args.count)
+        )
+        start, done = context.Barrier(args.writers + args.readers), context.Queue()
+        processes = [
+            context.Process(
+                target=write, args=(root_dir, pragmas, i, args.seconds, start, done)
+            )
+            for i in range(args.writers)
+        ] + [
+            context.Process(
+                target=read,
+                args=(root_dir, pragmas, i, args.seconds, args.count, start, done),
+            )
+            for i in range(args.readers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {"write": 0, "read": 0}
+        for _ in processes:
+            kind, count = done.get()
+            totals[kind] += count
+        for process in processes:
+            process.join()
+        assert all(process.exitcode == 0 for process in processes)
+        assert EventRepository(root_dir=root_dir).count() == (
+            args.count + totals["write"]
+        )
+    return totals["write"] / args.seconds, totals["read"] / args.seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'pragmas':<12} {'writes/s':>10} {'reads/s':>10}")
+    for pragmas in PRAGMA_PRESETS:
+        writes, reads = run(pragmas, args)
+        print(f"{pragmas:<12} {writes:>10,.0f} {reads:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
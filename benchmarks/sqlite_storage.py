@@ -0,0 +1,84 @@
+"""
+Benchmark filtered queries over text and JSONB SqliteRepositoryMixin storage.
+
+For ``storage="text"`` and, when the runtime SQLite has JSONB (3.45.0+),
+``storage="jsonb"``, loads --count entities and times --queries pushed-down
+``find`` and ``count`` calls filtering on two fields, none of them indexed,
+so every row's document is extracted from. Prints the size on disk and the
+queries per second of each.
+
+Usage:
+    python benchmarks/sqlite_storage.py --count 100000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+
+from fractal_specifications.generic.specification import Specification
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.mixins.sqlite_repository_mixin import SqliteRepositoryMixin
+
+
+@dataclass
+class Event(Entity):
+    id: str
+    kind: str
+    user: str
+    amount: int
+    note: str
+
+
+class EventRepository(SqliteRepositoryMixin[Event]):
+    entity = Event
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    events = [
+        Event(str(i), f"kind{i % 5}", f"user{i % 1000}", i, "x" * (i % 200))
+        for i in range(args.count)
+    ]
+    storages = ["text"] + (["jsonb"] if sqlite3.sqlite_version_info >= (3, 45) else [])
+    print(f"SQLite {sqlite3.sqlite_version}")
+    print(f"{'storage':<8} {'size':>10} {'find/s':>8} {'count/s':>8}")
+    for storage in storages:
+        with tempfile.TemporaryDirectory() as root_dir:
+            repository = EventRepository(
+                root_dir=root_dir, connection="thread", storage=storage
+            )
+            repository.add_many(events)
+            size = os.path.getsize(repository._filename)
+
+            def find(i, r=repository):
+                spec = Specification.parse(kind=f"kind{i % 5}", user=f"user{i}")
+                list(r.find(spec))
+
+            def count(i, r=repository):
+                r.count(Specification.parse(kind="kind1", amount__gte=i * 1000))
+
+            print(
+                f"{storage:<8} {size / 2**20:>7.1f} MB "
+                f"{timed(find, args.queries):>8,.1f} "
+                f"{timed(count, args.queries):>8,.1f}"
+            )
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
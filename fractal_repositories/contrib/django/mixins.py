@@ -1,5 +1,5 @@
 from dataclasses import asdict
-from typing import Dict, Generator, Optional, Type
+from typing import Any, Dict, Generator, Iterable, List, Optional, Type
 
 from django.db.models import ForeignKey, Model  # type: ignore
 from fractal_specifications.contrib.django.specifications import (
@@ -8,6 +8,7 @@ from fractal_specifications.contrib.django.specifications import (
 from fractal_specifications.generic.specification import Specification
 
 from fractal_repositories.core.repositories import EntityType, Repository
+from fractal_repositories.utils.iterables import batched, last_by_key
 
 
 class DjangoModelRepositoryMixin(Repository[EntityType]):
@@ -32,6 +33,66 @@ class DjangoModelRepositoryMixin(Repository[EntityType]):
             return self.add(entity)
         raise self._object_not_found()
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        for batch in batched(entities, batch_size):
+            objs = self.django_model.objects.bulk_create(
+                [
+                    self.django_model(**self.__get_direct_related_data(e)[0])
+                    for e in batch
+                ],
+                batch_size=batch_size,
+            )
+            for entity, obj in zip(batch, objs, strict=True):
+                if obj.pk is not None:
+                    entity.id = obj.pk
+            count += len(objs)
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        count = 0
+        pk_name = self.django_model._meta.pk.attname
+        for batch in batched(entities, batch_size):
+            existing = set(
+                self.django_model.objects.filter(
+                    pk__in=[e.id for e in batch]
+                ).values_list("pk", flat=True)
+            )
+            # bulk_update keeps the first of repeated pks, so send the last.
+            rows = [
+                self.__get_direct_related_data(e)[0]
+                for e in last_by_key(batch, key=lambda e: e.id)
+                if e.id in existing
+            ]
+            fields = sorted(
+                {k for row in rows for k in row if k not in ("id", pk_name)}
+            )
+            if rows and fields:
+                self.django_model.objects.bulk_update(
+                    [self.django_model(**row) for row in rows],
+                    fields,
+                    batch_size=batch_size,
+                )
+            count += sum(e.id in existing for e in batch)
+            if upsert:
+                missing = [e for e in batch if e.id not in existing]
+                self.add_many(
+                    last_by_key(missing, key=lambda e: e.id), batch_size=batch_size
+                )
+                count += len(missing)
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        if _filter := DjangoOrmSpecificationBuilder.build(specification):
+            queryset = self.django_model.objects.filter(_filter)
+        else:
+            queryset = self.django_model.objects.all()
+        _, per_model = queryset.delete()
+        # delete() also counts cascaded rows of other models; report only ours.
+        return per_model.get(self.django_model._meta.label, 0)
+
     def __get_direct_related_data(self, entity: EntityType):
         direct_data = {}
         related_data = {}
@@ -64,14 +125,20 @@ class DjangoModelRepositoryMixin(Repository[EntityType]):
     def find_one(self, specification: Specification) -> EntityType:
         return self._obj_to_domain(self.__get_obj(specification).__dict__)
 
-    def find(
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        # in_bulk splits the lookup further if the database backend has a
+        # lower parameter limit.
+        for obj in self.django_model.objects.in_bulk(ids).values():
+            yield self._obj_to_domain(obj.__dict__)
+
+    def _queryset(
         self,
-        specification: Optional[Specification] = None,
+        specification: Optional[Specification],
         *,
-        offset: int = 0,
-        limit: int = 0,
-        order_by: str = "",
-    ) -> Generator[EntityType, None, None]:
+        offset: int,
+        limit: int,
+        order_by: str,
+    ):
         if _filter := DjangoOrmSpecificationBuilder.build(specification):
             queryset = self.django_model.objects.filter(_filter)
         else:
@@ -90,10 +157,34 @@ class DjangoModelRepositoryMixin(Repository[EntityType]):
 
         if limit:
             queryset = queryset[offset : offset + limit]
+        return queryset
 
-        for obj in queryset:
+    def find(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "",
+    ) -> Generator[EntityType, None, None]:
+        for obj in self._queryset(
+            specification, offset=offset, limit=limit, order_by=order_by
+        ):
             yield self._obj_to_domain(obj.__dict__)
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Generator[Dict[str, Any], None, None]:
+        yield from self._queryset(
+            specification, offset=offset, limit=limit, order_by=order_by
+        ).values(*select)
+
     def count(self, specification: Optional[Specification] = None) -> int:
         if _filter := DjangoOrmSpecificationBuilder.build(specification):
             queryset = self.django_model.objects.filter(_filter)
@@ -1,4 +1,4 @@
-from typing import Iterator, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import duckdb
 from fractal_specifications.contrib.duckdb.specifications import (
@@ -6,7 +6,9 @@ from fractal_specifications.contrib.duckdb.specifications import (
 )
 from fractal_specifications.generic.specification import Specification
 
+from fractal_repositories.core.pagination import Position, keyset_sql
 from fractal_repositories.core.repositories import EntityType, Repository
+from fractal_repositories.utils.iterables import batched, last_by_key
 
 
 class DuckDBRepositoryMixin(Repository[EntityType]):
@@ -121,6 +123,82 @@ class DuckDBRepositoryMixin(Repository[EntityType]):
         query = f"DELETE FROM {self.table_name} WHERE {where_clause}"
         self.connection.execute(query, params)
 
+    def _insert_many(self, entities: List[EntityType]) -> None:
+        rows = [entity.asdict() for entity in entities]
+        columns = ", ".join(rows[0].keys())
+        placeholders = ", ".join(["?" for _ in rows[0]])
+        self.connection.executemany(
+            f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})",
+            [list(row.values()) for row in rows],
+        )
+
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        """Add entities with one executemany per batch inside a single transaction."""
+        count = 0
+        self.connection.begin()
+        try:
+            for batch in batched(entities, batch_size):
+                self._insert_many(batch)
+                count += len(batch)
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert: bool = False, batch_size=1000
+    ) -> int:
+        """Update entities (adding missing ones with upsert) in one transaction."""
+        count = 0
+        self.connection.begin()
+        try:
+            for batch in batched(entities, batch_size):
+                count += self._update_batch(batch, upsert)
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        return count
+
+    def _update_batch(self, batch: List[EntityType], upsert: bool) -> int:
+        rows = [entity.asdict() for entity in batch]
+        placeholders = ", ".join(["?" for _ in rows])
+        existing = {
+            r[0]
+            for r in self.connection.execute(
+                f"SELECT id FROM {self.table_name} WHERE id IN ({placeholders})",
+                [row["id"] for row in rows],
+            ).fetchall()
+        }
+        updates = [row for row in rows if row["id"] in existing]
+        if updates:
+            set_clause = ", ".join([f"{k} = ?" for k in updates[0] if k != "id"])
+            self.connection.executemany(
+                f"UPDATE {self.table_name} SET {set_clause} WHERE id = ?",
+                [
+                    [v for k, v in row.items() if k != "id"] + [row["id"]]
+                    for row in updates
+                ],
+            )
+        if not upsert:
+            return len(updates)
+        missing = [e for e in batch if e.id not in existing]
+        if missing:
+            # Inserted once each, as the last given for the id.
+            self._insert_many(last_by_key(missing, key=lambda e: e.id))
+        return len(batch)
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        """Remove every entity matching the specification; returns the row count."""
+        query = f"DELETE FROM {self.table_name}"
+        params: list = []
+        if specification:
+            where_clause, params = self._build_where_clause(specification)
+            query += f" WHERE {where_clause}"
+        result = self.connection.execute(query, params).fetchone()
+        return result[0] if result else 0
+
     def find_one(self, specification: Specification) -> EntityType:
         """Find a single entity matching the specification."""
         where_clause, params = self._build_where_clause(specification)
@@ -131,16 +209,26 @@ class DuckDBRepositoryMixin(Repository[EntityType]):
             return self._row_to_domain(result)
         raise self._object_not_found()
 
-    def find(
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        """Fetch one chunk of ids with a single ``IN`` query."""
+        placeholders = ", ".join(["?" for _ in ids])
+        query = f"SELECT * FROM {self.table_name} WHERE id IN ({placeholders})"
+        return [
+            self._row_to_domain(row)
+            for row in self.connection.execute(query, ids).fetchall()
+        ]
+
+    def _select_query(
         self,
-        specification: Optional[Specification] = None,
+        specification: Optional[Specification],
+        columns: str,
         *,
-        offset: int = 0,
-        limit: int = 0,
-        order_by: str = "",
-    ) -> Iterator[EntityType]:
-        """Find multiple entities matching the specification."""
-        query = f"SELECT * FROM {self.table_name}"
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> tuple[str, list]:
+        """Build a SELECT of ``columns`` with filtering, ordering and pagination."""
+        query = f"SELECT {columns} FROM {self.table_name}"
         params: list = []
 
         if specification:
@@ -165,11 +253,76 @@ class DuckDBRepositoryMixin(Repository[EntityType]):
             query += f" LIMIT {limit}"
             if offset > 0:
                 query += f" OFFSET {offset}"
+        return query, params
 
+    def find(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "",
+    ) -> Iterator[EntityType]:
+        """Find multiple entities matching the specification."""
+        query, params = self._select_query(
+            specification, "*", offset=offset, limit=limit, order_by=order_by
+        )
         result = self.connection.execute(query, params)
         for row in result.fetchall():
             yield self._row_to_domain(row)
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        """Select only the requested columns; no entities are constructed."""
+        query, params = self._select_query(
+            specification,
+            ", ".join(select),
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+        )
+        for row in self.connection.execute(query, params).fetchall():
+            yield dict(zip(select, row, strict=True))
+
+    def _find_after(
+        self,
+        specification: Optional[Specification],
+        position: Optional[Position],
+        *,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[EntityType]:
+        """Find the next keyset page with a row-value comparison in the WHERE."""
+        conditions = []
+        params: list = []
+        if specification:
+            where_clause, params = self._build_where_clause(specification)
+            conditions.append(f"({where_clause})")
+        if position is not None:
+            keyset_clause, keyset_params = keyset_sql(order_by, position, "?")
+            conditions.append(keyset_clause)
+            params = [*params, *keyset_params]
+
+        query = f"SELECT * FROM {self.table_name}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        column = order_by.lstrip("-")
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+        query += f" ORDER BY {column} {direction}"
+        if column != "id":
+            query += ", id ASC"
+        query += f" LIMIT {limit}"
+
+        for row in self.connection.execute(query, params).fetchall():
+            yield self._row_to_domain(row)
+
     def count(self, specification: Optional[Specification] = None) -> int:
         """Count entities matching the specification."""
         query = f"SELECT COUNT(*) FROM {self.table_name}"
@@ -1,4 +1,4 @@
-from typing import Iterable, Iterator, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from fractal_specifications.contrib.google_firestore.specifications import (
     FirestoreSpecificationBuilder,
@@ -8,7 +8,10 @@ from google.cloud.firestore_v1 import Client, DocumentSnapshot, FieldFilter, Que
 from google.cloud.firestore_v1.base_collection import BaseCollectionReference
 from google.cloud.firestore_v1.base_query import BaseQuery
 
+from fractal_repositories.core.pagination import Position
 from fractal_repositories.core.repositories import EntityType, Repository
+from fractal_repositories.utils.iterables import batched
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 
 class FirestoreClient(object):
@@ -56,12 +59,16 @@ class FirestoreRepositoryMixin(Repository[EntityType]):
     https://github.com/GoogleCloudPlatform/python-docs-samples/blob/46fa5a588858021ea32350584a4ee178cd7c1f33/firestore/cloud-client/snippets.py#L62-L66
     """
 
+    # Firestore rejects a batched write with more than 500 operations.
+    max_batch_size = 500
+
     def __init__(self, collection: str = "", *, collection_prefix: str = "", **kwargs):
         super(FirestoreRepositoryMixin, self).__init__(
             collection=collection, collection_prefix=collection_prefix, **kwargs
         )
 
         client: Client = FirestoreClient().get_firestore_client()
+        self.client = client
         if not collection and self.entity:
             collection = self.entity.__name__  # type: ignore
         if collection_prefix:
@@ -87,6 +94,50 @@ class FirestoreRepositoryMixin(Repository[EntityType]):
         if entity := self.find_one(specification):
             self.collection.document(entity.id).delete()
 
+    def _write_batches(
+        self, entities: Iterable[EntityType], batch_size: int, *, delete=False
+    ) -> int:
+        count = 0
+        for chunk in batched(entities, min(batch_size, self.max_batch_size)):
+            batch = self.client.batch()
+            for entity in chunk:
+                doc_ref = self.collection.document(entity.id)
+                if delete:
+                    batch.delete(doc_ref)
+                else:
+                    batch.set(doc_ref, entity.asdict())
+            batch.commit()
+            count += len(chunk)
+        return count
+
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        return self._write_batches(entities, batch_size)
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        if upsert:
+            return self._write_batches(entities, batch_size)
+        count = 0
+        for chunk in batched(entities, min(batch_size, self.max_batch_size)):
+            # One get_all round trip to learn which documents exist, instead
+            # of a get() per entity.
+            existing = {
+                doc.id
+                for doc in self.client.get_all(
+                    [self.collection.document(e.id) for e in chunk]
+                )
+                if doc.exists
+            }
+            count += self._write_batches(
+                [e for e in chunk if e.id in existing], batch_size
+            )
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        matching: List[EntityType] = list(self.find(specification))
+        return self._write_batches(matching, self.max_batch_size, delete=True)
+
     @staticmethod
     def _get_collection_stream(collection) -> Iterable[DocumentSnapshot]:
         for i in collection.stream():
@@ -102,9 +153,11 @@ class FirestoreRepositoryMixin(Repository[EntityType]):
             else:
                 collection = collection.where(filter=FieldFilter(*_filter))
 
+        is_match = compile_specification(specification)
+
         def _spec_filter(i: DocumentSnapshot):
             if data := i.to_dict():
-                return specification.is_satisfied_by(AttrDict(**data))
+                return is_match(AttrDict(**data))
 
         for doc in filter(
             _spec_filter,
@@ -113,14 +166,21 @@ class FirestoreRepositoryMixin(Repository[EntityType]):
             return self.entity.from_dict(doc.to_dict())
         raise self._object_not_found()
 
-    def find(
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        # Documents are keyed by entity id, so one get_all round trip replaces
+        # a query per id (and sidesteps the size limit on "in" filters).
+        for doc in self.client.get_all([self.collection.document(id) for id in ids]):
+            if doc.exists and (data := doc.to_dict()):
+                yield self.entity.from_dict(data)
+
+    def _query(
         self,
-        specification: Optional[Specification] = None,
+        specification: Optional[Specification],
         *,
-        offset: int = 0,
-        limit: int = 0,
-        order_by: str = "",
-    ) -> Iterator[EntityType]:
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Union[BaseCollectionReference, BaseQuery]:
         _filter = FirestoreSpecificationBuilder.build(specification)
         direction = Query.ASCENDING
         order_by = order_by or self.order_by
@@ -145,9 +205,70 @@ class FirestoreRepositoryMixin(Repository[EntityType]):
                 ).limit(limit)
             else:
                 collection = collection.limit(limit)
+        return collection
+
+    def find(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "",
+    ) -> Iterator[EntityType]:
+        collection = self._query(
+            specification, offset=offset, limit=limit, order_by=order_by
+        )
         for doc in self._get_collection_stream(collection):
             yield self.entity.from_dict(doc.to_dict())
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        collection = self._query(
+            specification, offset=offset, limit=limit, order_by=order_by
+        )
+        # A projection query: the server only sends the selected fields.
+        for doc in self._get_collection_stream(collection.select(select)):
+            data = doc.to_dict() or {}
+            yield {field: data.get(field) for field in select}
+
+    def _find_after(
+        self,
+        specification: Optional[Specification],
+        position: Optional[Position],
+        *,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[EntityType]:
+        _filter = FirestoreSpecificationBuilder.build(specification)
+        collection: Union[BaseCollectionReference, BaseQuery] = self.collection
+        if _filter:
+            if isinstance(_filter, list):
+                for f in _filter:
+                    collection = collection.where(filter=FieldFilter(*f))
+            else:
+                collection = collection.where(filter=FieldFilter(*_filter))
+
+        field = order_by.lstrip("-")
+        direction = Query.DESCENDING if order_by.startswith("-") else Query.ASCENDING
+        collection = collection.order_by(field, direction=direction)
+        if field != "id":
+            collection = collection.order_by("id")
+        if position is not None:
+            # start_after resumes from the cursor values on the server, unlike
+            # find()'s offset, which streams and discards every earlier document.
+            value, id = position
+            collection = collection.start_after({field: value, "id": id})
+
+        for doc in self._get_collection_stream(collection.limit(limit)):
+            yield self.entity.from_dict(doc.to_dict())
+
     def count(self, specification: Optional[Specification] = None) -> int:
         _filter = FirestoreSpecificationBuilder.build(specification)
         collection: Union[BaseCollectionReference, BaseQuery] = self.collection
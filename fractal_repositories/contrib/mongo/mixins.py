@@ -1,14 +1,15 @@
-from typing import Iterator, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from fractal_specifications.contrib.mongo.specifications import (
     MongoSpecificationBuilder,
 )
 from fractal_specifications.generic.specification import Specification
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.database import Database
 from pymongo.server_api import ServerApi
 
 from fractal_repositories.core.repositories import EntityType, Repository
+from fractal_repositories.utils.iterables import batched
 
 
 def setup_mongo_connection(
@@ -84,19 +85,52 @@ class MongoRepositoryMixin(Repository[EntityType]):
     def remove_one(self, specification: Specification):
         self.collection.delete_one(MongoSpecificationBuilder.build(specification))
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        for batch in batched(entities, batch_size):
+            result = self.collection.insert_many([e.asdict() for e in batch])
+            count += len(result.inserted_ids)
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        count = 0
+        for batch in batched(entities, batch_size):
+            # $set merges into the stored document, preserving fields the
+            # entity doesn't know about — the same as update().
+            result = self.collection.bulk_write(
+                [
+                    UpdateOne({"id": e.id}, {"$set": e.asdict()}, upsert=upsert)
+                    for e in batch
+                ]
+            )
+            count += result.matched_count + result.upserted_count
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        return self.collection.delete_many(
+            MongoSpecificationBuilder.build(specification) or {}
+        ).deleted_count
+
     def find_one(self, specification: Specification) -> EntityType:
         for obj in self.collection.find(MongoSpecificationBuilder.build(specification)):
             return self._obj_to_domain(obj)
         raise self._object_not_found()
 
-    def find(
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        for obj in self.collection.find({"id": {"$in": ids}}):
+            yield self._obj_to_domain(obj)
+
+    def _cursor(
         self,
-        specification: Optional[Specification] = None,
+        specification: Optional[Specification],
         *,
-        offset: int = 0,
-        limit: int = 0,
-        order_by: str = "",
-    ) -> Iterator[EntityType]:
+        offset: int,
+        limit: int,
+        order_by: str,
+        projection: Optional[dict] = None,
+    ):
         order_by = order_by or self.order_by
         direction = 1
         if order_by.startswith("-"):
@@ -104,7 +138,7 @@ class MongoRepositoryMixin(Repository[EntityType]):
             direction = -1
 
         collection = self.collection.find(
-            MongoSpecificationBuilder.build(specification)
+            MongoSpecificationBuilder.build(specification), projection
         )
 
         if order_by:
@@ -119,10 +153,40 @@ class MongoRepositoryMixin(Repository[EntityType]):
 
         if limit:
             collection = collection.skip(offset).limit(limit)
+        return collection
 
-        for obj in collection:
+    def find(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "",
+    ) -> Iterator[EntityType]:
+        for obj in self._cursor(
+            specification, offset=offset, limit=limit, order_by=order_by
+        ):
             yield self._obj_to_domain(obj)
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        projection = {"_id": 0, **dict.fromkeys(select, 1)}
+        for obj in self._cursor(
+            specification,
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+            projection=projection,
+        ):
+            yield {field: obj.get(field) for field in select}
+
     def count(self, specification: Optional[Specification] = None) -> int:
         return self.collection.count_documents(
             MongoSpecificationBuilder.build(specification) or {}
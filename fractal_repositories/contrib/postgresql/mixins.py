@@ -1,4 +1,4 @@
-from typing import Iterator, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import psycopg2
 import psycopg2.extras
@@ -7,13 +7,31 @@ from fractal_specifications.contrib.postgresql.specifications import (
 )
 from fractal_specifications.generic.specification import Specification
 
+from fractal_repositories.contrib.postgresql.pool import ConnectionPool, get_pool
+from fractal_repositories.core.pagination import Position, keyset_sql
 from fractal_repositories.core.repositories import (
     EntityType,
     Repository,
 )
+from fractal_repositories.utils.iterables import batched, last_by_key
 
 
 class PostgresRepositoryMixin(Repository[EntityType]):
+    """Repository backed by a PostgreSQL table with a column per field.
+
+    ``connection`` sets how connections are made:
+
+    - ``"connect"`` (default): a new connection (TCP and authentication
+      handshake included) for every operation.
+    - ``"pool"``: connections are checked out of a ``ConnectionPool`` shared
+      by every repository with the same connection parameters and
+      ``pool_options`` (``min_size``, ``max_size``, ``max_lifetime``,
+      ``timeout``, ``check_after``), and returned after each operation. Its
+      statistics are ``repository.pool.stats()``.
+    """
+
+    _CONNECTIONS = ("connect", "pool")
+
     def __init__(
         self,
         postgres_db: str,
@@ -22,9 +40,16 @@ class PostgresRepositoryMixin(Repository[EntityType]):
         postgres_port: str,
         postgres_user: str,
         *args,
+        connection: str = "connect",
+        pool_options: Optional[Dict[str, Any]] = None,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
+        if connection not in self._CONNECTIONS:
+            raise ValueError(
+                f"Unknown connection {connection!r}, expected one of {self._CONNECTIONS}"
+            )
+        self.connection = connection
         self.connection_params = {
             "host": postgres_host,
             "port": postgres_port,
@@ -36,7 +61,18 @@ class PostgresRepositoryMixin(Repository[EntityType]):
             "table", self.entity.__name__.lower() if self.entity else "entities"  # type: ignore[attr-defined]
         )
 
+        self.pool: Optional[ConnectionPool] = None
+        if connection == "pool":
+            self.pool = get_pool(self.connection_params, **(pool_options or {}))
+
     def _get_connection(self):
+        """A connection to use as a context manager for one operation.
+
+        Either way the block is committed if it completes and rolled back if
+        it raises; a pooled connection is then returned to the pool.
+        """
+        if self.pool is not None:
+            return self.pool.connection()
         return psycopg2.connect(**self.connection_params)
 
     def add(self, entity: EntityType) -> EntityType:
@@ -65,12 +101,14 @@ class PostgresRepositoryMixin(Repository[EntityType]):
                 query = f"UPDATE {self.table_name} SET {set_clause} WHERE id = %s"
                 cur.execute(query, values)
 
-                if cur.rowcount == 0:
-                    if upsert:
-                        return self.add(entity)
+                if cur.rowcount == 0 and not upsert:
                     raise self._object_not_found()
+                updated = cur.rowcount != 0
 
                 conn.commit()
+        if not updated:
+            # Outside the block, so a pool of one is not waiting on itself.
+            return self.add(entity)
         return entity
 
     def remove_one(self, specification: Specification):
@@ -81,6 +119,85 @@ class PostgresRepositoryMixin(Repository[EntityType]):
                 cur.execute(query, params)
                 conn.commit()
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        with self._get_connection() as conn:
+            with conn.cursor() as cur:
+                for batch in batched(entities, batch_size):
+                    rows = [entity.asdict() for entity in batch]
+                    columns = ", ".join(rows[0].keys())
+                    # execute_values sends the whole batch as one multi-row
+                    # INSERT instead of a round trip per entity.
+                    psycopg2.extras.execute_values(
+                        cur,
+                        f"INSERT INTO {self.table_name} ({columns}) VALUES %s",
+                        [list(row.values()) for row in rows],
+                        page_size=batch_size,
+                    )
+                    count += len(rows)
+                conn.commit()
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        count = 0
+        with self._get_connection() as conn:
+            with conn.cursor() as cur:
+                for batch in batched(entities, batch_size):
+                    rows = [entity.asdict() for entity in batch]
+                    keys = list(rows[0].keys())
+                    if upsert:
+                        set_clause = ", ".join(
+                            [f"{k} = EXCLUDED.{k}" for k in keys if k != "id"]
+                        )
+                        # ON CONFLICT cannot update a row twice in one statement.
+                        psycopg2.extras.execute_values(
+                            cur,
+                            f"INSERT INTO {self.table_name} ({', '.join(keys)}) "
+                            f"VALUES %s ON CONFLICT (id) DO UPDATE SET {set_clause}",
+                            [
+                                list(row.values())
+                                for row in last_by_key(rows, key=lambda r: r["id"])
+                            ],
+                            page_size=batch_size,
+                        )
+                        count += len(rows)
+                        continue
+                    cur.execute(
+                        f"SELECT id FROM {self.table_name} WHERE id = ANY(%s)",
+                        [[row["id"] for row in rows]],
+                    )
+                    existing = {r[0] for r in cur.fetchall()}
+                    rows = [row for row in rows if row["id"] in existing]
+                    if not rows:
+                        continue
+                    set_clause = ", ".join([f"{k} = %s" for k in keys if k != "id"])
+                    psycopg2.extras.execute_batch(
+                        cur,
+                        f"UPDATE {self.table_name} SET {set_clause} WHERE id = %s",
+                        [
+                            [v for k, v in row.items() if k != "id"] + [row["id"]]
+                            for row in rows
+                        ],
+                        page_size=batch_size,
+                    )
+                    count += len(rows)
+                conn.commit()
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        with self._get_connection() as conn:
+            with conn.cursor() as cur:
+                query = f"DELETE FROM {self.table_name}"
+                params: list = []
+                if specification:
+                    where_clause, params = self._build_where_clause(specification)
+                    query += f" WHERE {where_clause}"
+                cur.execute(query, params)
+                conn.commit()
+                return cur.rowcount
+
     def find_one(self, specification: Specification) -> EntityType:
         with self._get_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
@@ -92,6 +209,49 @@ class PostgresRepositoryMixin(Repository[EntityType]):
                     return self._row_to_domain(dict(row))
                 raise self._object_not_found()
 
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        with self._get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                # The ids travel as a single array parameter.
+                cur.execute(
+                    f"SELECT * FROM {self.table_name} WHERE id = ANY(%s)", [ids]
+                )
+                return [self._row_to_domain(dict(row)) for row in cur.fetchall()]
+
+    def _select_query(
+        self,
+        specification: Optional[Specification],
+        columns: str,
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> tuple[str, list]:
+        query = f"SELECT {columns} FROM {self.table_name}"
+        params: list = []
+
+        if specification:
+            where_clause, params = self._build_where_clause(specification)
+            query += f" WHERE {where_clause}"
+
+        order_by = order_by or self.order_by
+        if order_by:
+            direction = "DESC" if order_by.startswith("-") else "ASC"
+            column = order_by[1:] if order_by.startswith("-") else order_by
+            query += f" ORDER BY {column} {direction}"
+            if column != "id":
+                # Tiebreaker: without a deterministic secondary key,
+                # ties on the sort column have no guaranteed order
+                # across separate LIMIT/OFFSET queries, so pagination
+                # can duplicate or drop rows between pages.
+                query += ", id ASC"
+
+        if limit > 0:
+            query += f" LIMIT {limit}"
+            if offset > 0:
+                query += f" OFFSET {offset}"
+        return query, params
+
     def find(
         self,
         specification: Optional[Specification] = None,
@@ -101,43 +261,74 @@ class PostgresRepositoryMixin(Repository[EntityType]):
         order_by: str = "",
         select: Optional[list[str]] = None,
     ) -> Iterator[EntityType]:
-        select_clause: str
-        if select:
-            select_clause = ", ".join(select)
-        else:
-            select_clause = "*"
+        query, params = self._select_query(
+            specification,
+            ", ".join(select) if select else "*",
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+        )
         with self._get_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                query = f"SELECT {select_clause} FROM {self.table_name}"
-                params: list = []
+                cur.execute(query, params)
+                for row in cur:
+                    yield self._row_to_domain(dict(row))
 
-                if specification:
-                    where_clause, params = self._build_where_clause(specification)
-                    query += f" WHERE {where_clause}"
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        query, params = self._select_query(
+            specification,
+            ", ".join(select),
+            offset=offset,
+            limit=limit,
+            order_by=order_by,
+        )
+        with self._get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(query, params)
+                for row in cur:
+                    yield dict(row)
 
-                order_by = order_by or self.order_by
-                if order_by:
-                    direction = "DESC" if order_by.startswith("-") else "ASC"
-                    column = order_by[1:] if order_by.startswith("-") else order_by
-                    query += f" ORDER BY {column} {direction}"
-                    if column != "id":
-                        # Tiebreaker: without a deterministic secondary key,
-                        # ties on the sort column have no guaranteed order
-                        # across separate LIMIT/OFFSET queries, so pagination
-                        # can duplicate or drop rows between pages.
-                        query += ", id ASC"
-
-                if limit > 0:
-                    query += f" LIMIT {limit}"
-                    if offset > 0:
-                        query += f" OFFSET {offset}"
+    def _find_after(
+        self,
+        specification: Optional[Specification],
+        position: Optional[Position],
+        *,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[EntityType]:
+        conditions = []
+        params: list = []
+        if specification:
+            where_clause, params = self._build_where_clause(specification)
+            conditions.append(f"({where_clause})")
+        if position is not None:
+            keyset_clause, keyset_params = keyset_sql(order_by, position)
+            conditions.append(keyset_clause)
+            params = [*params, *keyset_params]
 
+        query = f"SELECT * FROM {self.table_name}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        column = order_by.lstrip("-")
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+        query += f" ORDER BY {column} {direction}"
+        if column != "id":
+            query += ", id ASC"
+        query += f" LIMIT {limit}"
+
+        with self._get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 cur.execute(query, params)
                 for row in cur:
-                    if select_clause == "*":
-                        yield self._row_to_domain(dict(row))
-                    else:
-                        yield self._row_to_domain(dict(row))  # type: ignore[misc]
+                    yield self._row_to_domain(dict(row))
 
     def count(self, specification: Optional[Specification] = None) -> int:
         with self._get_connection() as conn:
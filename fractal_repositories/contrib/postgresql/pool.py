@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Set, Tuple
+
+import psycopg2
+import psycopg2.pool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections made by ``connect``.
+
+    At most ``max_size`` connections are open at once; the first checkout
+    opens ``min_size`` of them. A checkout waits up to ``timeout`` seconds for
+    one to be returned once all are in use, then raises ``PoolTimeout``.
+    Connections older than ``max_lifetime`` seconds are closed (and replaced
+    on demand) when they come back or are checked out, and a connection
+    idle for more than ``check_after`` seconds is checked with ``SELECT 1``
+    before it is handed out, so one the server dropped is replaced instead
+    of failing the caller's query; other checkouts go on meanwhile. After a fork the child opens its own.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 3600.0,
+        timeout: float = 30.0,
+        check_after: float = 30.0,
+    ):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}"
+            )
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_after = check_after
+        self._lock = threading.Condition()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        # (connection, opened at, returned at), most recently returned last.
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        # Open connections (idle or checked out) by id, with when they opened.
+        self._opened_at: Dict[int, float] = {}
+        # Connections being opened, and checked-out ones close() retired.
+        self._pending = 0
+        self._retired: Set[int] = set()
+        self._waiting = 0
+        self._counters = dict.fromkeys(
+            ("opened", "closed", "checkouts", "timeouts", "failed_checks"), 0
+        )
+
+    @property
+    def size(self) -> int:
+        """The number of open connections, idle or checked out."""
+        return len(self._opened_at) + self._pending
+
+    def stats(self) -> Dict[str, int]:
+        """Current sizes and counters since the pool was created."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self.size - len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._counters,
+            }
+
+    def _open(self) -> Any:
+        # Called with the lock held: the slot is taken before connecting, but
+        # other threads are not held up by the handshake.
+        self._pending += 1
+        self._lock.release()
+        try:
+            conn = self.connect()
+        finally:
+            self._lock.acquire()
+            self._pending -= 1
+            self._lock.notify()
+        self._opened_at[id(conn)] = time.monotonic()
+        self._counters["opened"] += 1
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        self._opened_at.pop(id(conn), None)
+        self._counters["closed"] += 1
+        self._lock.notify()
+        try:
+            conn.close()
+        except Exception:  # already broken; it is gone either way
+            pass
+
+    def _expired(self, opened_at: float, now: float) -> bool:
+        return now - opened_at > self.max_lifetime
+
+    def _healthy(self, conn: Any) -> bool:
+        # Called with the lock held, like _open, and released for the round
+        # trip: conn is out of the idle list, so no other thread can take it.
+        self._lock.release()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            healthy = True
+        except Exception:
+            healthy = False
+        finally:
+            self._lock.acquire()
+        if not healthy:
+            self._counters["failed_checks"] += 1
+            logger.warning("Discarding a pooled connection that failed its check")
+        return healthy
+
+    def getconn(self) -> Any:
+        """Check a connection out; give it back with ``putconn``.
+
+        Raises:
+            PoolTimeout: If none is free within ``timeout`` seconds
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()  # the parent's connections are not ours to use
+            while self.size < self.min_size:
+                self._idle.append((self._open(), time.monotonic(), time.monotonic()))
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    conn, opened_at, returned_at = self._idle.pop()
+                    if conn.closed or self._expired(opened_at, now):
+                        self._discard(conn)
+                    elif now - returned_at > self.check_after and not self._healthy(
+                        conn
+                    ):
+                        self._discard(conn)
+                        now = time.monotonic()  # the check took a while
+                    else:
+                        self._counters["checkouts"] += 1
+                        return conn
+                if self.size < self.max_size:
+                    conn = self._open()
+                    self._counters["checkouts"] += 1
+                    return conn
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No connection free within {self.timeout}s "
+                        f"({self.max_size} in use)"
+                    )
+                self._waiting += 1
+                try:
+                    self._lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def putconn(self, conn: Any, *, discard: bool = False) -> None:
+        """Return a checked-out connection, or close it if ``discard``."""
+        with self._lock:
+            opened_at = self._opened_at.get(id(conn))
+            if opened_at is None:
+                return  # opened before a fork, by the parent's pool
+            now = time.monotonic()
+            if (
+                discard
+                or conn.closed
+                or self._expired(opened_at, now)
+                or id(conn) in self._retired
+            ):
+                self._retired.discard(id(conn))
+                self._discard(conn)
+                return
+            self._idle.append((conn, opened_at, now))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """A checked-out connection, committed (or rolled back) and returned.
+
+        A connection that raised a connection-level error is closed rather
+        than returned.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as exc:
+            discard = isinstance(
+                exc, (psycopg2.OperationalError, psycopg2.InterfaceError)
+            )
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def close(self) -> None:
+        """Close the idle connections; checked-out ones close when returned."""
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+            self._retired.update(self._opened_at)
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(connection_params: Dict[str, Any], **options) -> ConnectionPool:
+    """The pool shared by every caller with these connection parameters and options."""
+    key = (
+        tuple(sorted(connection_params.items())),
+        tuple(sorted(options.items())),
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                lambda: psycopg2.connect(**connection_params), **options
+            )
+        return pool
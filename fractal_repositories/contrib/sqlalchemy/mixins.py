@@ -8,6 +8,7 @@ from typing import (
     Dict,
     Generator,
     Generic,
+    Iterable,
     List,
     Optional,
     Type,
@@ -20,14 +21,17 @@ from fractal_specifications.contrib.sqlalchemy.specifications import (
 )
 from fractal_specifications.generic.operators import EqualsSpecification
 from fractal_specifications.generic.specification import Specification
-from sqlalchemy import MetaData, Table, create_engine  # type: ignore
+from sqlalchemy import MetaData, Table, create_engine, inspect  # type: ignore
 from sqlalchemy.engine import Engine  # type: ignore
 from sqlalchemy.exc import ArgumentError, DBAPIError  # type: ignore
-from sqlalchemy.orm import Session, registry, sessionmaker  # type: ignore
+from sqlalchemy.orm import ONETOMANY, Session, registry, sessionmaker  # type: ignore
 from sqlalchemy.sql.elements import BooleanClauseList  # type: ignore
 
+from fractal_repositories.core.pagination import Position
 from fractal_repositories.core.repositories import Entity, EntityType, Repository
 from fractal_repositories.exceptions import ObjectNotFoundException
+from fractal_repositories.utils.iterables import batched
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 
 class UnknownListItemTypeException(Exception):
@@ -163,6 +167,21 @@ class SqlAlchemyRepositoryMixin(
                 raise SqlAlchemyException(e) from e
         return entity
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        for batch in batched(entities, batch_size):
+            # One session and one commit per batch instead of per entity.
+            with self:
+                try:
+                    self.session.add_all(
+                        [self.entity_dao.from_domain(e) for e in batch]
+                    )
+                    self.commit()
+                except DBAPIError as e:
+                    raise SqlAlchemyException(e) from e
+            count += len(batch)
+        return count
+
     def update(self, entity: EntityType, *, upsert=False) -> EntityType:
         return self.__update(entity, self.entity_dao, upsert=upsert)
 
@@ -246,6 +265,44 @@ class SqlAlchemyRepositoryMixin(
             self.session.delete(entity)
             self.commit()
 
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        filters = self._get_filters(self.entity_dao, specification)
+        with self:
+            query = self.session.query(self.entity_dao)  # type: ignore[call-overload]
+            if type(filters) is dict:
+                query = query.filter_by(**filters)
+            elif type(filters) is BooleanClauseList:
+                query = query.where(filters)
+            elif specification is not None:
+                # No SQL filter for it: match in Python, delete by id.
+                is_match = compile_specification(specification)
+                ids = [e.id for e in self._find_raw(specification) if is_match(e)]
+                query = query.filter(self.entity_dao.id.in_(ids))
+            count = self.__delete_rows(query, self.entity_dao)
+            self.commit()
+        return count
+
+    def __delete_rows(self, query, entity_dao_class: EntityDao) -> int:
+        """Delete the rows ``query`` selects in one statement, and do to the
+        rows related to them what ``session.delete`` would: delete them too if
+        the relationship cascades deletes, else clear their foreign key."""
+        for relationship in inspect(entity_dao_class).relationships:
+            if relationship.direction is not ONETOMANY or relationship.passive_deletes:
+                continue
+            related = self.session.query(relationship.mapper)
+            for local, remote in relationship.local_remote_pairs:
+                related = related.filter(
+                    remote.in_(query.with_entities(local).scalar_subquery())
+                )
+            if "delete" in relationship.cascade:
+                self.__delete_rows(related, relationship.mapper.class_)
+            else:
+                related.update(
+                    {remote: None for _, remote in relationship.local_remote_pairs},
+                    synchronize_session="fetch",
+                )
+        return query.delete(synchronize_session="fetch")
+
     def find_one(self, specification: Specification) -> EntityType:
         try:
             entity = self._find_one_raw(specification)
@@ -253,6 +310,12 @@ class SqlAlchemyRepositoryMixin(
             raise
         return self._dao_to_domain(entity)
 
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        with self:
+            ret = self.session.query(self.entity_dao)  # type: ignore[call-overload]
+        for entity in ret.filter(self.entity_dao.id.in_(ids)):
+            yield self._dao_to_domain(entity)
+
     def find(
         self,
         specification: Optional[Specification] = None,
@@ -272,6 +335,52 @@ class SqlAlchemyRepositoryMixin(
         for entity in entities:
             yield self._dao_to_domain(entity)
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Generator[Dict[str, Any], None, None]:
+        ret = self._find_raw(
+            specification=specification,
+            offset=offset,
+            limit=limit,
+            order_by=order_by or self.order_by,
+        )
+        columns = [getattr(self.entity_dao, field) for field in select]
+        for row in ret.with_entities(*columns):  # type: ignore[attr-defined]
+            yield dict(zip(select, row, strict=True))
+
+    def _find_after(
+        self,
+        specification: Optional[Specification],
+        position: Optional[Position],
+        *,
+        limit: int,
+        order_by: str,
+    ) -> Generator[EntityType, None, None]:
+        ret = self._find_raw(specification=specification, order_by=order_by)
+        if position is not None:
+            from sqlalchemy import and_, or_, tuple_
+
+            value, id = position
+            column = getattr(self.entity_dao, order_by.lstrip("-"))
+            if order_by.lstrip("-") == "id":
+                keyset = column < id if order_by.startswith("-") else column > id
+            elif order_by.startswith("-"):
+                keyset = or_(
+                    column < value, and_(column == value, self.entity_dao.id > id)
+                )
+            else:
+                keyset = tuple_(column, self.entity_dao.id) > tuple_(value, id)
+            ret = ret.filter(keyset)  # type: ignore[attr-defined]
+
+        for entity in ret.limit(limit):  # type: ignore[attr-defined]
+            yield self._dao_to_domain(entity)
+
     def _dao_to_domain(self, entity: EntityType) -> EntityType:
         return self.__dao_to_domain(entity, self.entity, self.entity_dao)
 
@@ -303,7 +412,7 @@ class SqlAlchemyRepositoryMixin(
     ) -> EntityType:
         entities = self._find_raw(specification, entity_dao_class=entity_dao_class)
 
-        for entity in filter(lambda i: specification.is_satisfied_by(i), entities):
+        for entity in filter(compile_specification(specification), entities):
             return entity
         raise self._object_not_found()
 
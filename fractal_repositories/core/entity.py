@@ -2,9 +2,112 @@ from dataclasses import dataclass, fields
 from datetime import date, datetime, time
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Callable, Dict, FrozenSet
 from uuid import UUID
 
+# Exact types asdict() returns unchanged; checked first because they are by
+# far the most common field values.
+_PASSTHROUGH_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+class _ModelCodec:
+    """Field-name sets for one Model class, computed once and cached on it.
+
+    Model.asdict and Model.clean used to derive these from ``fields()`` on
+    every call. Only the sets are cached; values are still converted by their
+    runtime type, exactly as before.
+    """
+
+    __slots__ = ("asdict_fields", "clean_fields", "clean_dated_fields")
+
+    def __init__(self, cls):
+        calculated = set(cls.calculated_fields())
+        self.asdict_fields: FrozenSet[str] = frozenset(
+            f.name for f in fields(cls) if f.name not in calculated
+        )
+        # clean() only passes date/datetime fields on when they have a value.
+        self.clean_fields: FrozenSet[str] = frozenset(
+            f.name for f in fields(cls) if f.type not in (date, datetime)
+        )
+        self.clean_dated_fields: FrozenSet[str] = frozenset(
+            f.name for f in fields(cls) if f.type in (date, datetime)
+        )
+
+
+def _model_codec(cls) -> _ModelCodec:
+    # Looked up in the class's own __dict__ so a subclass never reuses the
+    # field sets of its parent.
+    codec = cls.__dict__.get("_model_codec")
+    if codec is None:
+        codec = _ModelCodec(cls)
+        cls._model_codec = codec
+    return codec
+
+
+def _serialize_value(v, skip_types, use_timezone_z):
+    """Convert one value for asdict(), honouring skip_types and use_timezone_z."""
+    if v is None:
+        return None
+    if isinstance(v, Model):
+        return v.asdict(skip_types=skip_types, use_timezone_z=use_timezone_z)
+    elif isinstance(v, dict) and dict not in skip_types:
+        return {
+            k: _serialize_value(val, skip_types, use_timezone_z) for k, val in v.items()
+        }
+    elif isinstance(v, (list, tuple)) and type(v) not in skip_types:
+        result = [_serialize_value(i, skip_types, use_timezone_z) for i in v]
+        return type(v)(result) if isinstance(v, tuple) else result
+    elif isinstance(v, Decimal) and Decimal not in skip_types:
+        return f"{v:.2f}"
+        # Important: Check datetime BEFORE date (datetime is subclass of date)
+    elif type(v) is datetime and datetime not in skip_types:
+        return v.isoformat().replace("+00:00", "Z") if use_timezone_z else v.isoformat()
+    elif type(v) is date and date not in skip_types:
+        return v.strftime("%Y-%m-%d")
+    elif type(v) is time and time not in skip_types:
+        return v.isoformat()
+    elif isinstance(v, UUID) and UUID not in skip_types:
+        return str(v)
+    elif isinstance(v, Enum) and Enum not in skip_types:
+        return v.value
+    return v
+
+
+def _serialize(v):
+    """asdict() conversion for the default options, dispatched on exact type.
+
+    Same result as ``_serialize_value(v, (), False)``; Models and subclasses
+    of the builtin types fall through to it.
+    """
+    t = type(v)
+    if t in _PASSTHROUGH_TYPES:
+        return v
+    converter = _SERIALIZERS.get(t)
+    if converter is not None:
+        return converter(v)
+    if issubclass(t, Enum) and not issubclass(t, (Model, Decimal, UUID)):
+        # Enum classes are registered on first sight, so later values skip
+        # the isinstance chain.
+        converter = _SERIALIZERS[t] = _enum_value
+        return converter(v)
+    return _serialize_value(v, (), False)
+
+
+def _enum_value(v):
+    return v.value
+
+
+_SERIALIZERS: Dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.isoformat,
+    date: lambda v: v.strftime("%Y-%m-%d"),
+    time: time.isoformat,
+    Decimal: lambda v: f"{v:.2f}",
+    UUID: str,
+    list: lambda v: [_serialize(i) for i in v],
+    tuple: lambda v: tuple([_serialize(i) for i in v]),
+    dict: lambda v: {k: _serialize(val) for k, val in v.items()},
+}
+
 
 @dataclass
 class Model:
@@ -51,12 +154,14 @@ class Model:
             user = User.clean(name="John", email="john@example.com", extra="ignored")
             # user.name == "John", user.email == "john@example.com"
         """
-        field_names = {
-            f.name
-            for f in fields(cls)
-            if f.type not in (date, datetime) or kwargs.get(f.name)
-        }
-        return cls(**{k: v for k, v in kwargs.items() if k in field_names})  # NOQA
+        codec = _model_codec(cls)
+        return cls(
+            **{
+                k: v
+                for k, v in kwargs.items()
+                if k in codec.clean_fields or (v and k in codec.clean_dated_fields)
+            }
+        )  # NOQA
 
     @classmethod
     def from_dict(cls, data):
@@ -133,44 +238,19 @@ class Model:
             user_dict = user.asdict(use_timezone_z=True)
             # {"name": "John", "created_at": "2023-01-01T12:00:00Z"}
         """
+        field_names = _model_codec(type(self)).asdict_fields
+        if not skip_types and not use_timezone_z:
+            return {
+                k: _serialize(v) for k, v in self.__dict__.items() if k in field_names
+            }
         if skip_types is None:
             skip_types = []
-        field_names = {
-            f.name for f in fields(self) if f.name not in self.calculated_fields()
+        return {
+            k: _serialize_value(v, skip_types, use_timezone_z)
+            for k, v in self.__dict__.items()
+            if k in field_names
         }
 
-        def _asdict(v):
-            if v is None:
-                return None
-            if isinstance(v, (Model, Entity)):
-                return v.asdict(skip_types=skip_types, use_timezone_z=use_timezone_z)
-            elif isinstance(v, dict) and dict not in skip_types:
-                return {k: _asdict(val) for k, val in v.items()}
-            elif isinstance(v, (list, tuple)) and type(v) not in skip_types:
-                result = [_asdict(i) for i in v]
-                return type(v)(result) if isinstance(v, tuple) else result
-            elif isinstance(v, Decimal) and Decimal not in skip_types:
-                return f"{v:.2f}"
-                # Important: Check datetime BEFORE date (datetime is subclass of date)
-            elif type(v) is datetime and datetime not in skip_types:
-                return (
-                    v.isoformat().replace("+00:00", "Z")
-                    if use_timezone_z
-                    else v.isoformat()
-                )
-            elif type(v) is date and date not in skip_types:
-                return v.strftime("%Y-%m-%d")
-            elif type(v) is time and time not in skip_types:
-                return v.isoformat()
-            elif isinstance(v, UUID) and UUID not in skip_types:
-                return str(v)
-            elif isinstance(v, Enum) and Enum not in skip_types:
-                return v.value
-            return v
-
-        ret = {k: _asdict(v) for k, v in self.__dict__.items() if k in field_names}
-        return ret
-
     @staticmethod
     def calculated_fields():
         """
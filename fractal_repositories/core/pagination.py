@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Generic, Iterator, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from fractal_specifications.generic.operators import (
+    EqualsSpecification,
+    GreaterThanSpecification,
+    LessThanSpecification,
+)
+from fractal_specifications.generic.specification import Specification
+
+from fractal_repositories.exceptions import InvalidCursorException
+
+T = TypeVar("T")
+
+# Keyset position: the order_by column's value and the id of the last entity
+# of a page.
+Position = Tuple[Any, Any]
+
+# Values that JSON would flatten to strings are tagged, so a cursor decodes
+# back to the exact type the backend compares against.
+_TAGGED_TYPES = (
+    ("datetime", datetime, datetime.fromisoformat),
+    ("date", date, date.fromisoformat),
+    ("time", time, time.fromisoformat),
+    ("decimal", Decimal, Decimal),
+    ("uuid", UUID, UUID),
+)
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    One page of a keyset-paginated query.
+
+    Attributes:
+        entities: The entities on this page, in query order
+        next_cursor: Opaque token for the next page (None on the last page)
+
+    Example:
+        page = repo.find_page(limit=100, order_by="created_at")
+        while page.next_cursor:
+            page = repo.find_page(
+                limit=100, order_by="created_at", after=page.next_cursor
+            )
+    """
+
+    entities: List[T]
+    next_cursor: Optional[str] = None
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.entities)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+
+def _encode_value(value: Any) -> Any:
+    for tag, type_, _ in _TAGGED_TYPES:
+        if isinstance(value, type_):
+            return {f"${tag}": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and len(value) == 1:
+        (key, raw), *_ = value.items()
+        for tag, _, parse in _TAGGED_TYPES:
+            if key == f"${tag}":
+                return parse(raw)
+    return value
+
+
+def encode_cursor(order_by: str, value: Any, id: Any) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    payload = json.dumps(
+        [order_by, _encode_value(value), _encode_value(id)], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, order_by: str) -> Position:
+    """
+    Decode a cursor produced by ``encode_cursor`` for the same ``order_by``.
+
+    Raises:
+        InvalidCursorException: If the cursor is malformed or was issued for a
+            different ordering
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_order_by, value, id = payload
+        position = (_decode_value(value), _decode_value(id))
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise InvalidCursorException() from e
+    if cursor_order_by != order_by:
+        raise InvalidCursorException(
+            f"Cursor was issued for order_by={cursor_order_by!r}, not {order_by!r}"
+        )
+    return position
+
+
+def keyset_specification(order_by: str, position: Position) -> Specification:
+    """
+    Specification matching everything after ``position`` in ``order_by`` order.
+
+    Follows the ordering the mixins use in ``find``: the ``order_by`` column in
+    the requested direction, ties broken by ``id`` ascending.
+    """
+    value, id = position
+    field = order_by.lstrip("-")
+    past = (
+        LessThanSpecification if order_by.startswith("-") else GreaterThanSpecification
+    )
+    if field == "id":
+        return past("id", id)
+    return past(field, value) | (
+        EqualsSpecification(field, value) & GreaterThanSpecification("id", id)
+    )
+
+
+def keyset_sql(
+    order_by: str, position: Position, placeholder: str = "%s"
+) -> Tuple[str, List[Any]]:
+    """
+    SQL condition (and its parameters) equivalent to ``keyset_specification``.
+
+    Ascending orders use a row-value comparison, which the database can answer
+    with a range scan on a ``(column, id)`` index.
+    """
+    value, id = position
+    column = order_by.lstrip("-")
+    descending = order_by.startswith("-")
+    if column == "id":
+        return f"id {'<' if descending else '>'} {placeholder}", [id]
+    if descending:
+        return (
+            f"({column} < {placeholder} OR "
+            f"({column} = {placeholder} AND id > {placeholder}))",
+            [value, value, id],
+        )
+    return f"({column}, id) > ({placeholder}, {placeholder})", [value, id]
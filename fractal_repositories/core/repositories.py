@@ -1,11 +1,34 @@
+import dataclasses
 from abc import ABC, abstractmethod
-from typing import Any, Generic, Iterator, Optional, Type, TypeVar
-
-from fractal_specifications.generic.operators import EqualsSpecification
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+from fractal_specifications.generic.operators import (
+    EqualsSpecification,
+    InSpecification,
+)
 from fractal_specifications.generic.specification import Specification
 
 from fractal_repositories.core.entity import Entity
+from fractal_repositories.core.pagination import (
+    Page,
+    Position,
+    decode_cursor,
+    encode_cursor,
+    keyset_specification,
+)
 from fractal_repositories.exceptions import ObjectNotFoundException, RepositoryException
+from fractal_repositories.utils.iterables import batched
 
 EntityType = TypeVar("EntityType", bound=Entity)
 
@@ -21,6 +44,8 @@ class ReadRepository(Generic[EntityType], ABC):
         entity: The entity class this repository manages (must be set by subclass)
         object_not_found_exception_class: Custom exception class for not found errors
         order_by: Default ordering for queries (e.g., "-created_at" for descending)
+        get_many_chunk_size: Maximum number of ids per ``get_many`` query, keeping
+            each query within the backend's bound-parameter limits (0 = no chunking)
 
     Example:
         @dataclass
@@ -42,6 +67,7 @@ class ReadRepository(Generic[EntityType], ABC):
     entity: EntityType
     object_not_found_exception_class: Optional[Type[ObjectNotFoundException]] = None
     order_by: str = ""
+    get_many_chunk_size: int = 500
 
     def __init__(self, *args, **kwargs) -> None:
         if not hasattr(self, "entity"):
@@ -87,6 +113,73 @@ class ReadRepository(Generic[EntityType], ABC):
         """
         return self.find_one(specification=EqualsSpecification("id", id))
 
+    def get_many(
+        self,
+        ids: Iterable[Any],
+        *,
+        preserve_order: bool = True,
+        missing: str = "skip",
+    ) -> List[Optional[EntityType]]:
+        """
+        Find multiple entities by their IDs.
+
+        Issues one query per ``get_many_chunk_size`` unique ids instead of one
+        ``get`` per id.
+
+        Args:
+            ids: The entity IDs to look up (duplicates are fetched once)
+            preserve_order: If True, return one result per requested id, in the
+                order of ``ids``. If False, return each found entity once, in the
+                order the backend produced them.
+            missing: What to do with ids that don't exist: ``"skip"`` leaves them
+                out, ``"raise"`` raises ObjectNotFoundException, ``"none"`` puts
+                ``None`` in their place (appended at the end when
+                ``preserve_order`` is False)
+
+        Returns:
+            List of the matching entities
+
+        Raises:
+            ObjectNotFoundException: If ``missing="raise"`` and any id doesn't exist
+            ValueError: If ``missing`` is not one of the options above
+
+        Example:
+            authors = repo.get_many(post.author_id for post in posts)
+            a, b = repo.get_many(["a", "b"], missing="raise")
+        """
+        if missing not in ("skip", "raise", "none"):
+            raise ValueError(
+                f"missing must be 'skip', 'raise' or 'none', got {missing!r}"
+            )
+        ids = list(ids)
+        wanted = dict.fromkeys(ids)
+        found: Dict[Any, EntityType] = {}
+        for chunk in batched(wanted, self.get_many_chunk_size):
+            for entity in self._get_many(chunk):
+                if entity.id in wanted and entity.id not in found:
+                    found[entity.id] = entity
+
+        if missing == "raise" and len(found) < len(wanted):
+            raise self._object_not_found()
+        if preserve_order:
+            if missing == "none":
+                return [found.get(id) for id in ids]
+            return [found[id] for id in ids if id in found]
+        result: List[Optional[EntityType]] = list(found.values())
+        if missing == "none":
+            result.extend(None for id in wanted if id not in found)
+        return result
+
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        """
+        Fetch the entities for one chunk of unique ids, in any order.
+
+        The default issues a single ``find`` with an ``InSpecification`` on ``id``.
+        Storage mixins override it with a native primary-key lookup. Ids that
+        don't exist are simply absent from the result.
+        """
+        return self.find(InSpecification("id", ids))
+
     @abstractmethod
     def find(
         self,
@@ -122,6 +215,164 @@ class ReadRepository(Generic[EntityType], ABC):
         """
         raise NotImplementedError
 
+    def find_values(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        select: Sequence[str],
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Find only some fields of the matching entities, as dicts.
+
+        Storage mixins push the projection down to the backend (a column list in
+        SQL, a projection in Mongo/Firestore, ``json_extract`` in SQLite,
+        ``.values()`` in Django), so unselected fields are neither transferred
+        nor deserialized and no entities are constructed. Values are returned as
+        the backend stores them, which for types a backend serializes (e.g.
+        ``Decimal`` or ``datetime`` in a JSON store) is the serialized form.
+
+        Args:
+            specification: Optional filter criteria (None returns all entities)
+            select: Names of the entity fields to return
+            offset: Number of results to skip (for pagination)
+            limit: Maximum number of results to return (0 = no limit)
+            order_by: Field to order by (prefix with "-" for descending); it
+                doesn't need to be selected
+
+        Returns:
+            Iterator of ``{field: value}`` dicts with exactly the selected fields
+
+        Raises:
+            ValueError: If ``select`` is empty or names a field the entity doesn't have
+
+        Example:
+            for row in repo.find_values(
+                Specification.parse(active=True), select=["id", "email"]
+            ):
+                send(row["email"])
+        """
+        select = list(select)
+        if not select:
+            raise ValueError("select must name at least one field")
+        field_names = {f.name for f in dataclasses.fields(self.entity)}
+        if unknown := [f for f in select if f not in field_names]:
+            raise ValueError(
+                f"{self.entity.__name__} has no field(s) {', '.join(unknown)}"  # type: ignore[attr-defined]
+            )
+        return self._find_values(
+            specification, select, offset=offset, limit=limit, order_by=order_by
+        )
+
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the ``select``ed fields of each matching entity.
+
+        ``select`` has already been validated against the entity's fields, so
+        overrides may interpolate the names into a query. The default projects
+        the entities returned by ``find``.
+        """
+        for entity in self.find(
+            specification, offset=offset, limit=limit, order_by=order_by
+        ):
+            yield {field: getattr(entity, field) for field in select}
+
+    def find_page(
+        self,
+        specification: Optional[Specification] = None,
+        *,
+        limit: int,
+        order_by: str = "",
+        after: Optional[str] = None,
+    ) -> Page[EntityType]:
+        """
+        Find one page of entities using keyset (cursor) pagination.
+
+        Instead of skipping ``offset`` rows, each page resumes strictly after the
+        last entity of the previous one, so deep pages cost the same as the first.
+        Entities are ordered by ``order_by`` with ``id`` as tiebreaker, the same
+        order ``find`` uses.
+
+        Args:
+            specification: Optional filter criteria (None pages through all entities)
+            limit: Maximum number of entities per page
+            order_by: Field to order by (prefix with "-" for descending); defaults
+                to the repository's ``order_by``, then to "id". The field must not
+                be None on any entity.
+            after: Cursor from a previous page's ``next_cursor`` (None for the
+                first page); only valid with the same ``order_by``
+
+        Returns:
+            Page with the entities and the cursor for the next page (None when
+            this is the last page)
+
+        Raises:
+            InvalidCursorException: If ``after`` is malformed or was issued for a
+                different ``order_by``
+
+        Example:
+            page = repo.find_page(Specification.parse(active=True), limit=100)
+            while True:
+                export(page.entities)
+                if not page.next_cursor:
+                    break
+                page = repo.find_page(
+                    Specification.parse(active=True),
+                    limit=100,
+                    after=page.next_cursor,
+                )
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        order_by = order_by or self.order_by or "id"
+        position = decode_cursor(after, order_by) if after else None
+
+        # One extra entity tells whether another page follows, so the last page
+        # never hands out a cursor that leads to an empty page.
+        entities = list(
+            self._find_after(
+                specification, position, limit=limit + 1, order_by=order_by
+            )
+        )
+        if len(entities) <= limit:
+            return Page(entities)
+        entities = entities[:limit]
+        last = entities[-1]
+        return Page(
+            entities,
+            encode_cursor(order_by, getattr(last, order_by.lstrip("-")), last.id),
+        )
+
+    def _find_after(
+        self,
+        specification: Optional[Specification],
+        position: Optional[Position],
+        *,
+        limit: int,
+        order_by: str,
+    ) -> Iterable[EntityType]:
+        """
+        Find up to ``limit`` entities ordered by ``order_by`` after ``position``.
+
+        The default adds the keyset condition to the specification and calls
+        ``find``. Storage mixins override it where the backend has a native
+        form (a row-value comparison in SQL, ``start_after`` in Firestore).
+        """
+        if position is not None:
+            keyset = keyset_specification(order_by, position)
+            specification = specification & keyset if specification else keyset
+        return self.find(specification, limit=limit, order_by=order_by)
+
     @abstractmethod
     def count(self, specification: Optional[Specification] = None) -> int:
         """
@@ -262,6 +513,101 @@ class WriteRepository(Generic[EntityType], ABC):
         """
         self.remove_one(specification=EqualsSpecification("id", id))
 
+    def add_many(
+        self, entities: Iterable[EntityType], *, batch_size: int = 1000
+    ) -> int:
+        """
+        Add multiple entities to the repository.
+
+        The default implementation calls ``add`` once per entity. Storage mixins
+        override it with a native batched write (one round trip or commit per
+        ``batch_size`` entities instead of one per entity).
+
+        Args:
+            entities: The entities to add (any iterable, consumed lazily)
+            batch_size: Maximum number of entities written per round trip
+
+        Returns:
+            Number of entities added
+
+        Example:
+            added = repo.add_many(
+                User(id=str(i), name=f"user-{i}", email="") for i in range(10_000)
+            )
+        """
+        count = 0
+        for entity in entities:
+            self.add(entity)
+            count += 1
+        return count
+
+    def update_many(
+        self,
+        entities: Iterable[EntityType],
+        *,
+        upsert: bool = False,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Update multiple existing entities in the repository.
+
+        Unlike ``update``, entities that don't exist are skipped rather than
+        raising (unless ``upsert`` is True, in which case they are inserted), so
+        one missing row doesn't abort a bulk write halfway through.
+
+        Args:
+            entities: The entities to update (any iterable, consumed lazily)
+            upsert: If True, insert entities that don't exist (default: False)
+            batch_size: Maximum number of entities written per round trip
+
+        Returns:
+            Number of the given entities that were written (updated, or
+            inserted with upsert). An id given more than once counts every
+            time, like repeated ``update`` calls, and the last entity given
+            for it is the one stored.
+
+        Example:
+            updated = repo.update_many(users, upsert=True)
+        """
+        count = 0
+        for entity in entities:
+            try:
+                self.update(entity, upsert=upsert)
+            except ObjectNotFoundException:
+                continue
+            count += 1
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        """
+        Remove all entities matching the specification.
+
+        The default implementation collects the matching ids with ``find`` and
+        calls ``remove_one`` for each; a write-only repository without ``find``
+        must override it. Storage mixins override it with a native bulk delete.
+
+        Args:
+            specification: Filter criteria (None removes every entity)
+
+        Returns:
+            Number of entities removed (0 if nothing matched; never raises
+            ObjectNotFoundException)
+
+        Example:
+            removed = repo.remove_many(Specification.parse(active=False))
+        """
+        find = getattr(self, "find", None)
+        if find is None:
+            raise NotImplementedError(
+                f"{type(self).__name__} has no find() to remove_many with"
+            )
+        # Collect the matching ids first (so removals can't disturb the
+        # iteration), then remove them one by one.
+        ids = [entity.id for entity in find(specification)]
+        for id in ids:
+            self.remove_one(EqualsSpecification("id", id))
+        return len(ids)
+
     @abstractmethod
     def is_healthy(self) -> bool:
         """
@@ -316,8 +662,6 @@ class Repository(ReadRepository[EntityType], WriteRepository[EntityType], ABC):
         repo.remove_one(Specification.parse(id="1"))        # Delete
     """
 
-    pass
-
 
 class FileRepository(Generic[EntityType], ABC):
     """
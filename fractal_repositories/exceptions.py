@@ -6,3 +6,13 @@ class RepositoryException(Exception):
 class ObjectNotFoundException(Exception):
     def __init__(self, message: str = "Object not found"):
         super(ObjectNotFoundException, self).__init__(message)
+
+
+class InvalidCursorException(ValueError):
+    def __init__(self, message: str = "Invalid pagination cursor"):
+        super(InvalidCursorException, self).__init__(message)
+
+
+class IncompatibleCodecException(RepositoryException):
+    def __init__(self, message: str = "Codec is incompatible with stored data"):
+        super(IncompatibleCodecException, self).__init__(message)
@@ -1,18 +1,24 @@
-import json
 from dataclasses import asdict
-from typing import Dict, List, Tuple, Type
+from typing import Dict, List, Optional, Tuple, Type, Union
 
 from fractal_repositories.core.repositories import EntityType
 from fractal_repositories.mixins.inmemory_repository_mixin import (
     InMemoryRepositoryMixin,
 )
-from fractal_repositories.utils.json_encoder import EnhancedEncoder
+from fractal_repositories.utils.codecs import JsonCodec, get_codec
 
 
 class ExternalDataInMemoryRepositoryMixin(InMemoryRepositoryMixin[EntityType]):
-    def __init__(self, klass: Type[EntityType], *args, **kwargs):
+    def __init__(
+        self,
+        klass: Type[EntityType],
+        *args,
+        codec: Optional[Union[str, JsonCodec]] = None,
+        **kwargs,
+    ):
         super(ExternalDataInMemoryRepositoryMixin, self).__init__(*args, **kwargs)
         self.klass = klass
+        self.codec = get_codec(codec)
 
     def load_data_dict(self, data: Dict):
         key = self.klass.__name__.lower()
@@ -24,9 +30,9 @@ class ExternalDataInMemoryRepositoryMixin(InMemoryRepositoryMixin[EntityType]):
     def load_data_json(self, data: Dict):
         key = self.klass.__name__.lower()
         self.entities = {
-            e["id"]: self.klass(**e) for e in json.loads(data.get(key, []))
+            e["id"]: self.klass(**e) for e in self.codec.loads(data.get(key, []))
         }
 
     def dump_data_json(self) -> Tuple[str, str]:
         _, data = self.dump_data_dict()
-        return self.klass.__name__.lower(), json.dumps(data, cls=EnhancedEncoder)
+        return self.klass.__name__.lower(), self.codec.dumps(data)
@@ -1,11 +1,34 @@
+import atexit
+import contextlib
+import functools
 import json
 import logging
+import mmap
 import os
 import tempfile
+import threading
+import time
 import uuid
-from typing import Iterator
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from fractal_specifications.generic.operators import NotSpecification
+from fractal_specifications.generic.collections import AndSpecification
+from fractal_specifications.generic.operators import (
+    EqualsSpecification,
+    InSpecification,
+)
 from fractal_specifications.generic.specification import Specification
 
 from fractal_repositories.core.repositories import EntityType, FileRepository
@@ -13,10 +36,111 @@ from fractal_repositories.exceptions import ObjectNotFoundException
 from fractal_repositories.mixins.inmemory_repository_mixin import (
     InMemoryRepositoryMixin,
 )
+from fractal_repositories.utils.codecs import JsonCodec, check_codec, get_codec
+from fractal_repositories.utils.compression import (
+    BLOCK_MAGIC,
+    Compressor,
+    block_lines,
+    get_compressor,
+    pack_block,
+    read_blocks,
+    unpack_blocks,
+)
+from fractal_repositories.utils.file_tail import FileTail
+from fractal_repositories.utils.indexes import IndexedEntities, _equality_values
+from fractal_repositories.utils.iterables import batched, last_by_key
 from fractal_repositories.utils.json_encoder import EnhancedEncoder
+from fractal_repositories.utils.offset_index import OffsetIndex
+from fractal_repositories.utils.partitions import (
+    hash_segment,
+    partition_predicate,
+    prunable_field,
+    segment_name,
+    segment_value,
+    stored_values,
+)
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 logger = logging.getLogger(__name__)
 
+Line = Union[str, bytes]
+
+# A stored line as ``(id, entity)``; the entity is None for a tombstone.
+Record = Tuple[Any, Optional[Any]]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _exclusive(method: F) -> F:
+    """Run a writing method under the repository's exclusive lock (``locking``)."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.locking:
+            return method(self, *args, **kwargs)
+        with self._locked(exclusive=True):
+            return method(self, *args, **kwargs)
+
+    return cast(F, wrapper)
+
+
+# Repositories holding appends buffered by ``durability="batch"``, flushed when
+# the interpreter exits (the flush timers are daemon threads, which do not get
+# to run then).
+_buffering: "weakref.WeakSet[FileRepositoryMixin]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_buffers() -> None:
+    for repository in list(_buffering):
+        try:
+            repository.flush()
+        except Exception:
+            logger.exception("Could not flush %s at exit", repository._filename)
+
+
+def _apply(live: Dict[Any, Any], record: Record) -> None:
+    # Last write wins, and moves the id to the end like an update does.
+    id, entity = record
+    live.pop(id, None)
+    if entity is not None:
+        live[id] = entity
+
+
+class _EntityCache(FileTail):
+    """The entities a repository's file holds, followed from its tail."""
+
+    def __init__(self, repository: "FileRepositoryMixin", path: str):
+        self.repository = repository
+        super(_EntityCache, self).__init__(
+            path, blocks=repository._compressor is not None
+        )
+
+    def _reset(self) -> None:
+        super(_EntityCache, self)._reset()
+        self.records = 0
+        # File order for the default format; resolved for the log-structured.
+        self.entities: List[Any] = []
+        self.live: Dict[Any, Any] = {}
+
+    def _add(self, offset: int, line: bytes) -> None:
+        raw = line.strip().replace(b"\x00", b"")
+        if not raw:
+            return
+        record = self.repository._record(self.path, self.lines, raw)
+        if record is None:
+            return
+        self.records += 1
+        if self.repository.log_structured:
+            _apply(self.live, record)
+        else:
+            self.entities.append(record[1])
+
+    def partial_record(self) -> Optional[Record]:
+        """The unterminated last line, which a full read would also parse."""
+        raw = self.partial.strip().replace(b"\x00", b"")
+        return self.repository._record(self.path, self.lines + 1, raw) if raw else None
+
 
 class RootDirMixin(object):
     def __init__(self, *, root_dir: str, **kwargs):
@@ -35,70 +159,879 @@ class FileRepositoryMixin(RootDirMixin, InMemoryRepositoryMixin[EntityType]):
     and updates) go through an atomic temp-file-plus-rename so a crash leaves
     either the old complete file or the new one, never a truncated table.
 
-    Single-writer only: there is no file locking, so two processes writing
-    concurrently can still clobber each other on the rewrite path.
+    By default it is single-writer only: there is no file locking, so two
+    processes writing concurrently can clobber each other on the rewrite path.
+    Set ``locking = True`` (POSIX only) to share the file between processes,
+    e.g. several gunicorn workers: writes hold an exclusive ``fcntl.flock`` on
+    a ``.lock`` file beside the table for the whole read-modify-write, reads a
+    shared one. Each process then keeps the entities it has read and checks
+    the file's inode, size and mtime on every read, so it only parses lines
+    other processes appended since, and re-reads the file only after a
+    rewrite.
+
+    ``durability`` sets when appends reach the disk:
+
+    - ``"os"`` (default): each append is written at once and the OS decides
+      when it is persisted.
+    - ``"always"``: each append (one per ``add``, one per ``add_many`` batch)
+      is fsynced before the call returns.
+    - ``"batch"``: appends collect in a buffer that is written with one
+      ``write`` and one fsync (a group commit) once it holds
+      ``flush_entities`` lines or its oldest line is ``flush_ms`` old. A
+      timer flushes the buffer ``flush_ms`` after its first line even if no
+      other write follows, and whatever is still buffered is flushed when
+      the interpreter exits. ``flush`` (or leaving the repository as a
+      context manager) commits at once. Reads flush first, so they always
+      see every write. A crash, or ``os._exit``, loses at most the last
+      ``flush_ms`` of appends.
+
+    Every policy writes whole lines, so the torn-write guarantee holds, and
+    rewrites are always fsynced.
+
+    ``codec`` picks the JSON library (``"json"``, ``"orjson"``, ``"msgspec"``
+    or a ``JsonCodec`` instance). Every codec reads what the others wrote; on
+    construction the first stored line is decoded as a compatibility check.
+
+    Set ``log_structured = True`` to make updates and deletes appends as well:
+    an update appends the new version, a delete appends a tombstone line, and
+    readers resolve the log with last-write-wins per id. Nothing is rewritten
+    until superseded records and tombstones exceed ``compaction_threshold`` of
+    a log of at least ``compaction_min_records`` records; then ``compact``
+    rewrites the live entities through the same atomic rewrite. ``add`` of an
+    id that is already stored replaces it, where the default format would keep
+    both lines. The log always keeps the offset index below (in memory, unless
+    ``persist_offset_index``): it tells writes which ids are live and serves
+    reads by id, following the file's tail, so neither replays the log.
+
+    Set ``offset_index = True`` to keep an id → byte offset index of the file:
+    ``get``, ``get_many`` and specifications constraining ``id`` then seek to
+    and parse only the matching lines, and ``count()`` without a specification
+    reads no lines at all. The index follows appends by reading the new tail
+    and rebuilds after rewrites (see ``OffsetIndex``); with
+    ``persist_offset_index = True`` it is also saved beside the file so a new
+    process does not re-read what was already indexed.
+
+    Set ``memory_map = True`` to scan the file through a read-only memory map
+    instead of a text file object. The map is copied out a window of whole
+    lines (about 1 MiB, ``_MAP_WINDOW``) at a time and each window is split
+    into lines in one call. With a codec that ``decodes_bytes`` (orjson,
+    msgspec) the lines are passed to it as bytes; otherwise each window is
+    decoded to str once, rather than line by line.
+
+    Set ``partitions = N`` or ``partition_by = "<field>"`` to split the table
+    into files under ``db/<ClassName>/``: one per hash of the id (``N`` of
+    them), or one per value of the field, e.g. a date. Appends go to the
+    entity's partition and rewrites (deletes, updates, compaction) replace
+    only the partitions they touch; a partition left empty is deleted.
+    Specifications with an equality, ``in`` or range on the partition field
+    (for hash partitions: equality or ``in`` on the id) skip the partitions
+    that cannot match without opening them. Pruning on a field needs it
+    annotated as str, int, float, date, UUID or an Enum, whose stored values
+    compare like the values themselves. Without ``order_by``, entities come
+    out partition by partition. Partition values become file names, so keep
+    them short. ``update`` moves an entity whose partition field changed, but
+    ``add`` of an id stored in another partition keeps both.
+
+    Set ``compression = "gzip"`` (stdlib) or ``"zstd"`` (``pip install
+    zstandard``) to store the files as checksummed compressed blocks (see
+    ``utils.compression``). Every append is one block and rewrites pack about
+    ``compression_block_size`` bytes of lines per block, so appends stay
+    appends and, with ``offset_index``, a ``get`` decompresses one block. A
+    torn or damaged block is skipped like a malformed line. A single ``add``
+    makes a small block that compresses poorly: batch with ``add_many`` or
+    ``durability="batch"``, or ``compact`` now and then. Files stored in the
+    other format are rewritten on construction, so compression can be
+    switched on or off for an existing table. ``memory_map`` does not apply
+    to compressed files.
     """
 
+    # Log-structured mode (see the class docstring).
+    log_structured = False
+    compaction_threshold = 0.5
+    compaction_min_records = 1000
+
+    # Byte offset index (see the class docstring).
+    offset_index = False
+    persist_offset_index = False
+
+    # Share the file between processes (see the class docstring).
+    locking = False
+
+    # Scan through mmap (see the class docstring).
+    memory_map = False
+    _MAP_WINDOW = 1 << 20
+
+    # Partitioned layout (see the class docstring): a number of hash
+    # partitions of the id, or the field whose value picks the partition.
+    partitions = 0
+    partition_by = ""
+
+    # Block compression (see the class docstring).
+    compression = ""
+    compression_block_size = 1 << 16
+
+    # Key of a tombstone record: ``{"$deleted": <id>}``. Not a valid field name,
+    # so no entity line can be mistaken for one.
+    _TOMBSTONE = "$deleted"
+
     # Deserialization errors that mean "this line is corrupt/stale data" rather
     # than "from_dict has a bug": malformed JSON, JSON that is not a mapping, or
     # an object missing required fields. Anything else propagates loudly so a
     # genuine bug can't silently delete every row from every read.
     _CORRUPT_LINE_ERRORS = (json.JSONDecodeError, TypeError, ValueError)
 
+    _DURABILITY = ("os", "always", "batch")
+
+    def __init__(
+        self,
+        *,
+        codec: Optional[Union[str, JsonCodec]] = None,
+        durability: str = "os",
+        flush_entities: int = 1000,
+        flush_ms: float = 100,
+        **kwargs,
+    ):
+        super(FileRepositoryMixin, self).__init__(**kwargs)
+
+        if durability not in self._DURABILITY:
+            raise ValueError(
+                f"Unknown durability {durability!r}, expected one of {self._DURABILITY}"
+            )
+        if self.partitions and self.partition_by:
+            raise ValueError("Set either partitions or partition_by, not both")
+        self.codec = get_codec(codec)
+        self.durability = durability
+        self.flush_entities = flush_entities
+        self.flush_ms = flush_ms
+        self._compressor: Optional[Compressor] = (
+            get_compressor(self.compression) if self.compression else None
+        )
+        # Lines waiting for a ``durability="batch"`` flush, per file.
+        self._buffer: Dict[str, List[str]] = {}
+        self._buffered = 0
+        self._buffered_at = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._partitioned = bool(self.partitions or self.partition_by)
+        self._prunable = bool(self.partition_by) and prunable_field(
+            self.entity, self.partition_by
+        )
+        # Records in the log and how many of them are live, as of the last full
+        # read and the appends since; None until the log has been read.
+        self._log_stats: Optional[Tuple[int, int]] = None
+        # Entity caches (``locking``) and offset indexes, per file.
+        self._caches: Dict[str, _EntityCache] = {}
+        self._offset_indexes: Dict[str, OffsetIndex] = {}
+        self._thread_lock = threading.RLock()
+        self._lock_fd: Optional[int] = None
+        self._lock_pid = 0
+        self._lock_held: Optional[int] = None
+        # Rewrites seen, per the counter writers keep in the lock file.
+        self._generation = b""
+        self._check_format()
+        self._check_codec()
+
+    def _check_format(self) -> None:
+        """Rewrite files stored compressed while ``compression`` is off, or the
+        other way round, in the configured format."""
+        for path in self._segments():
+            try:
+                with open(path, "rb") as fp:
+                    head = fp.read(len(BLOCK_MAGIC))
+            except FileNotFoundError:
+                continue
+            blocks = head == BLOCK_MAGIC
+            if not head or blocks == (self._compressor is not None):
+                continue
+            logger.info("Converting %s to compression=%r", path, self.compression)
+            lines = [
+                (raw.decode("utf-8") if isinstance(raw, bytes) else raw) + "\n"
+                for _, raw in self._read_lines(path, blocks=blocks)
+            ]
+            # Line for line, so tombstones and duplicates are kept as well.
+            self._atomic_write(lines, path)
+
+    def _check_codec(self) -> None:
+        for path in self._segments()[:1]:
+            if not os.path.exists(path):
+                return
+            for _, raw in self._read_lines(path):
+                check_codec(self.codec, raw, path)
+                return
+
     @property
     def _filename(self) -> str:
         return os.path.join(self.root_dir, "db", f"{self.__class__.__name__}.jsonl")
 
     @property
-    def _get_entities(self) -> Iterator[EntityType]:
-        if not os.path.exists(self._filename):
+    def _segment_dir(self) -> str:
+        return os.path.join(self.root_dir, "db", self.__class__.__name__)
+
+    def _segments(self, specification: Optional[Specification] = None) -> List[str]:
+        """The files of the table, without the partitions ``specification`` rules out.
+
+        Unpartitioned, that is always the one table file. Partitions are listed
+        from the directory and pruned by their names alone, so a pruned
+        partition is never opened.
+        """
+        if not self._partitioned:
+            return [self._filename]
+        self.flush()  # a buffered append can start a partition
+        try:
+            names = [
+                name[: -len(".jsonl")]
+                for name in os.listdir(self._segment_dir)
+                if name.endswith(".jsonl")
+            ]
+        except FileNotFoundError:
+            return []
+        if specification is not None:
+            names = self._prune(names, specification)
+        if self.partition_by:
+            try:
+                names.sort(key=segment_value)
+            except TypeError:
+                names.sort()  # values of mixed types: by name, stable at least
+        else:
+            names.sort()
+        return [os.path.join(self._segment_dir, name + ".jsonl") for name in names]
+
+    def _prune(self, names: List[str], specification: Specification) -> List[str]:
+        if self.partition_by:
+            predicate = (
+                partition_predicate(specification, self.partition_by)
+                if self._prunable
+                else None
+            )
+            if predicate is None:
+                return names
+            return [name for name in names if predicate(segment_value(name))]
+        values = stored_values(specification, "id")
+        if values is None:
+            return names
+        try:
+            wanted = {hash_segment(value, self.partitions) for value in values}
+        except TypeError:
+            return names
+        return [name for name in names if name in wanted]
+
+    def _segment_for(self, data: Dict[str, Any]) -> str:
+        """The file an entity, as its ``asdict``, is stored in."""
+        if self.partition_by:
+            name = segment_name(data.get(self.partition_by))
+        elif self.partitions:
+            name = hash_segment(data.get("id"), self.partitions)
+        else:
+            return self._filename
+        return os.path.join(self._segment_dir, name + ".jsonl")
+
+    def _segment_of(self, entity: EntityType) -> str:
+        return (
+            self._segment_for(entity.asdict()) if self._partitioned else self._filename
+        )
+
+    def _lines_by_segment(self, entities: Iterable[EntityType]) -> Dict[str, List[str]]:
+        """Serialized lines of ``entities``, grouped by the file they belong in."""
+        if not self._partitioned:
+            return {
+                self._filename: [self.codec.dumps(e.asdict()) + "\n" for e in entities]
+            }
+        segments: Dict[str, List[str]] = {}
+        for entity in entities:
+            data = entity.asdict()
+            segments.setdefault(self._segment_for(data), []).append(
+                self.codec.dumps(data) + "\n"
+            )
+        return segments
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool = False) -> Iterator[None]:
+        """Hold the lock file, shared or exclusive, when ``locking`` is set.
+
+        Re-entrant: a nested request for an exclusive lock upgrades a shared
+        one for its duration; any other nested request is already covered.
+        """
+        if not self.locking:
+            yield
+            return
+        import fcntl
+
+        with self._thread_lock:
+            held = self._lock_held
+            wanted = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            if held == fcntl.LOCK_EX or held == wanted:
+                yield
+                return
+            fd = self._lock_file()
+            fcntl.flock(fd, wanted)
+            self._lock_held = wanted
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN if held is None else held)
+                self._lock_held = held
+
+    def _lock_file(self) -> int:
+        # flock locks belong to the open file description, which a forked
+        # child shares with its parent: every process opens its own.
+        if self._lock_pid != os.getpid():
             os.makedirs(os.path.dirname(self._filename), exist_ok=True)
-            open(self._filename, "a").close()
-        with open(self._filename, "r", encoding="utf-8") as fp:
+            self._lock_fd = os.open(self._filename + ".lock", os.O_RDWR | os.O_CREAT)
+            self._lock_pid = os.getpid()
+            weakref.finalize(self, os.close, self._lock_fd)
+        return cast(int, self._lock_fd)
+
+    def _tails(self) -> List[FileTail]:
+        return [*self._caches.values(), *self._offset_indexes.values()]
+
+    def _check_generation(self) -> None:
+        # Inode numbers are reused, so another process's rewrite can pass for
+        # an append; the counter in the lock file tells for sure. Called with
+        # the lock held.
+        generation = os.pread(self._lock_file(), 8, 0)
+        if generation != self._generation:
+            self._generation = generation
+            for tail in self._tails():
+                tail.invalidate()
+
+    def _rewritten(self, path: str) -> None:
+        """Record a rewrite of a file for this and (``locking``) other processes."""
+        for tail in self._tails():
+            if tail.path == path:
+                tail.invalidate()
+        if self.locking:
+            count = int.from_bytes(os.pread(self._lock_file(), 8, 0), "big") + 1
+            self._generation = count.to_bytes(8, "big")
+            os.pwrite(self._lock_file(), self._generation, 0)
+
+    def _sync(self, tail: FileTail) -> None:
+        """Bring an entity cache or offset index up to date with its file."""
+        self.flush()
+        with self._locked():
+            if self.locking:
+                self._check_generation()
+            tail.sync()
+
+    def _synced_cache(self, path: str) -> _EntityCache:
+        cache = self._caches.get(path)
+        if cache is None:
+            cache = self._caches[path] = _EntityCache(self, path)
+        self._sync(cache)
+        return cache
+
+    def _offset_index(self, path: str) -> OffsetIndex:
+        index = self._offset_indexes.get(path)
+        if index is None:
+            index = self._offset_indexes[path] = OffsetIndex(
+                path,
+                self._index_record,
+                last_wins=self.log_structured,
+                persist=self.persist_offset_index,
+                blocks=self._compressor is not None,
+            )
+        return index
+
+    def _read_lines(
+        self, path: str, blocks: Optional[bool] = None
+    ) -> Iterator[Tuple[int, Line]]:
+        """Yield ``(line number, line)`` for every non-blank line of a file.
+
+        ``blocks`` tells whether the file is block-compressed; by default it
+        is as configured by ``compression``.
+        """
+        self.flush()
+        if not self._partitioned and not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "a").close()
+        if self._compressor is not None if blocks is None else blocks:
+            yield from self._block_lines(path)
+            return
+        if self.memory_map:
+            yield from self._map_lines(path)
+            return
+        try:
+            fp = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return  # a partition removed since it was listed
+        with fp:
             for line_number, line in enumerate(fp, start=1):
                 raw = line.strip().replace("\x00", "")
-                if not raw:
-                    continue
-                try:
-                    yield self.entity.from_dict(json.loads(raw))
-                except self._CORRUPT_LINE_ERRORS as exc:
-                    logger.warning(
-                        "Skipping malformed line %d in %s: %s — %r",
-                        line_number,
-                        self._filename,
-                        exc,
-                        raw[:120],
+                if raw:
+                    yield line_number, raw
+
+    def _map_lines(self, path: str) -> Iterator[Tuple[int, Line]]:
+        """``_read_lines`` over a memory map of the file.
+
+        The map is split into lines a window of whole lines at a time, so at
+        most one window is copied out of the page cache at once. Lines are
+        bytes for codecs that ``decodes_bytes``, otherwise each window is
+        decoded to str once.
+        """
+        try:
+            fp = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with fp:
+            if not os.fstat(fp.fileno()).st_size:
+                return  # an empty file cannot be mapped
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size, start, line_number = len(mm), 0, 0
+                while start < size:
+                    end = size
+                    if start + self._MAP_WINDOW < size:
+                        # Up to the last line break in the window, or past the
+                        # first one if a single line is longer than the window.
+                        end = mm.rfind(b"\n", start, start + self._MAP_WINDOW) + 1
+                        if end <= start:
+                            end = mm.find(b"\n", start + self._MAP_WINDOW) + 1 or size
+                    window = mm[start:end]
+                    start = end
+                    if b"\x00" in window:
+                        window = window.replace(b"\x00", b"")
+                    lines: List[Any] = (
+                        window.split(b"\n")
+                        if self.codec.decodes_bytes
+                        else window.decode("utf-8").split("\n")
                     )
+                    if not lines[-1]:
+                        lines.pop()  # after the window's last line break
+                    first, line_number = line_number + 1, line_number + len(lines)
+                    for number, line in enumerate(lines, first):
+                        # The codecs skip surrounding whitespace themselves.
+                        if line and not line.isspace():
+                            yield number, line
+
+    def _block_lines(self, path: str) -> Iterator[Tuple[int, Line]]:
+        """``_read_lines`` over a block-compressed file.
+
+        Damaged blocks are skipped (``read_blocks`` logs them), and so is an
+        incomplete last block, which is still being written or was torn.
+        Lines are bytes for codecs that ``decodes_bytes``, otherwise str.
+        """
+        try:
+            fp = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with fp:
+            line_number = 0
+            for _, _, data in read_blocks(fp):
+                if data is None:
                     continue
+                if b"\x00" in data:
+                    data = data.replace(b"\x00", b"")
+                lines: List[Any] = block_lines(data)
+                if not self.codec.decodes_bytes:
+                    lines = [line.decode("utf-8") for line in lines]
+                for line in lines:
+                    line_number += 1
+                    if line and not line.isspace():
+                        yield line_number, line
+
+    def _skip_line(
+        self, path: str, line_number: int, raw: Line, exc: Exception
+    ) -> None:
+        logger.warning(
+            "Skipping malformed line %d in %s: %s — %r",
+            line_number,
+            path,
+            exc,
+            raw.strip()[:120],
+        )
+
+    def _record(self, path: str, line_number: int, raw: Line) -> Optional[Record]:
+        """Parse a stored line, or log it and return None if it is corrupt."""
+        try:
+            data = self.codec.loads(raw)
+            if self.log_structured and isinstance(data, dict):
+                if self._TOMBSTONE in data:
+                    return data[self._TOMBSTONE], None
+            entity = self.entity.from_dict(data)
+        except self._CORRUPT_LINE_ERRORS as exc:
+            self._skip_line(path, line_number, raw, exc)
+            return None
+        return entity.id, entity
+
+    @property
+    def _get_entities(self) -> Iterator[EntityType]:
+        yield from self._scan(self._segments())
+
+    def _scan(self, segments: List[str]) -> Iterator[EntityType]:
+        """The entities stored in ``segments``, one file after the other."""
+        if self.log_structured:
+            yield from list(self._resolve_segments(segments)[0].values())
+            return
+        for path in segments:
+            if self.locking:
+                cache = self._synced_cache(path)
+                yield from cache.entities
+                if record := cache.partial_record():
+                    yield record[1]
+                continue
+            for line_number, raw in self._read_lines(path):
+                if record := self._record(path, line_number, raw):
+                    yield record[1]
+
+    def _resolve_log(
+        self, specification: Optional[Specification] = None
+    ) -> Dict[Any, EntityType]:
+        """Replay the log: the latest version of every id without a tombstone.
+
+        A rewritten id moves to the end, the position the default format gives
+        an updated entity. Only the partitions ``specification`` can match are
+        read. Callers must not modify the returned dict.
+        """
+        live, records = self._resolve_segments(self._segments(specification))
+        if specification is None or not self._partitioned:
+            self._log_stats = (records, len(live))
+        return live
+
+    def _live(self, specification: Specification) -> Dict[Any, EntityType]:
+        """The live entities ``specification`` may match, by id.
+
+        Read through the offset index when it constrains ``id``; otherwise the
+        log is replayed.
+        """
+        return {entity.id: entity for entity in self._candidates(specification)}
+
+    def _resolve_segments(self, segments: List[str]) -> Tuple[Dict[Any, Any], int]:
+        """The live entities of the logs in ``segments`` and their record count."""
+        resolved = [self._resolve_segment(path) for path in segments]
+        if len(resolved) == 1:
+            return resolved[0]
+        live: Dict[Any, Any] = {}
+        for segment_live, _ in resolved:
+            live.update(segment_live)
+        return live, sum(records for _, records in resolved)
+
+    def _resolve_segment(self, path: str) -> Tuple[Dict[Any, Any], int]:
+        if self.locking:
+            cache = self._synced_cache(path)
+            live, records = cache.live, cache.records
+            if record := cache.partial_record():
+                live, records = dict(live), records + 1
+                _apply(live, record)
+            return live, records
+        live, records = {}, 0
+        for line_number, raw in self._read_lines(path):
+            if record := self._record(path, line_number, raw):
+                _apply(live, record)
+                records += 1
+        return live, records
+
+    def _index_record(self, raw: bytes) -> Optional[Tuple[bool, Any]]:
+        """``(deleted, stored id)`` of a line for the offset index, None if corrupt."""
+        try:
+            data = self.codec.loads(raw)
+            if self.log_structured and isinstance(data, dict):
+                if self._TOMBSTONE in data:
+                    return True, data[self._TOMBSTONE]
+            # Validated like a read would, so the index skips the same lines.
+            self.entity.from_dict(data)
+            return False, data["id"]
+        except self._CORRUPT_LINE_ERRORS + (KeyError,):
+            return None
+
+    def _read_ids(self, ids: Iterable[Any]) -> Optional[List[EntityType]]:
+        """The entities stored under ``ids`` read through the offset index.
+
+        Returns None if there is no index or an id has no JSON form to look up.
+        """
+        if not (self.offset_index or self.log_structured):
+            return None
+        try:
+            # The index is keyed by ids as they are stored: as JSON values.
+            keys = [json.loads(json.dumps(id, cls=EnhancedEncoder)) for id in ids]
+            hash(tuple(keys))
+        except (TypeError, ValueError):
+            return None
+        wanted: Dict[str, List[Any]] = {}
+        if self.partitions:
+            for key in keys:
+                path = self._segment_for({"id": key})
+                wanted.setdefault(path, []).append(key)
+        else:
+            wanted = dict.fromkeys(self._segments(), keys)
+        lines = []
+        self.flush()
+        with self._locked():
+            for path, segment_keys in wanted.items():
+                index = self._offset_index(path)
+                self._sync(index)
+                lines += index.read(segment_keys)
+        entities = []
+        for raw in lines:
+            try:
+                entities.append(self.entity.from_dict(self.codec.loads(raw)))
+            except self._CORRUPT_LINE_ERRORS:
+                continue
+        return entities
+
+    def _candidates(self, specification: Specification) -> Iterable[EntityType]:
+        children = (
+            specification.specifications
+            if isinstance(specification, AndSpecification)
+            else [specification]
+        )
+        for child in children:
+            equality = _equality_values(child)
+            if equality and equality[0] == "id":
+                entities = self._read_ids(equality[1])
+                if entities is not None:
+                    return entities
+        return self._scan(self._segments(specification))
+
+    def count(self, specification: Optional[Specification] = None) -> int:
+        if specification or not (self.offset_index or self.log_structured):
+            return super().count(specification)
+        count = 0
+        for path in self._segments():
+            index = self._offset_index(path)
+            self._sync(index)
+            count += index.count
+        return count
+
+    @property
+    def _index(self) -> Optional[IndexedEntities]:
+        # The file, not the in-process dict and its indexes, is the source of
+        # truth for reads.
+        return None
 
-    def _atomic_write(self, lines: list) -> None:
-        """Replace the file's contents atomically.
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        # The file, not the in-process dict, is the source of truth: one pass
+        # over it serves every requested id.
+        entities = self._read_ids(ids)
+        if entities is not None:
+            return entities
+        wanted = set(ids)
+        return [e for e in self._get_entities if e.id in wanted]
+
+    def _atomic_write(self, lines: list, path: Optional[str] = None) -> None:
+        """Replace a file's contents (by default the table's) atomically.
 
         Writes to a temp file in the same directory (so the rename stays on one
         filesystem), fsyncs it, then ``os.replace``s it over the original. A
         reader or a crash sees either the old complete file or the new one,
         never a partially rewritten table.
         """
-        directory = os.path.dirname(self._filename)
+        path = path or self._filename
+        directory = os.path.dirname(path)
         os.makedirs(directory, exist_ok=True)
+        mode, encoding = "w", "utf-8"
+        if self._compressor is not None:
+            lines, mode, encoding = self._pack(lines), "wb", None
         fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            with os.fdopen(fd, mode, encoding=encoding) as fp:
                 fp.writelines(lines)
                 fp.flush()
                 os.fsync(fp.fileno())
-            os.replace(tmp, self._filename)  # atomic on POSIX and Windows
+            os.replace(tmp, path)  # atomic on POSIX and Windows
         except BaseException:
             os.unlink(tmp)
             raise
+        self._rewritten(path)
+
+    def _pack(self, lines: List[str]) -> List[bytes]:
+        """``lines`` compressed into blocks of about ``compression_block_size``."""
+        assert self._compressor is not None
+        blocks, chunk, size = [], [], 0
+        for line in lines:
+            chunk.append(line)
+            size += len(line)
+            if size >= self.compression_block_size:
+                blocks.append(
+                    pack_block("".join(chunk).encode("utf-8"), self._compressor)
+                )
+                chunk, size = [], 0
+        if chunk:
+            blocks.append(pack_block("".join(chunk).encode("utf-8"), self._compressor))
+        return blocks
+
+    def _rewrite(self, path: str, entities: List[EntityType]) -> None:
+        """Atomically replace a file with ``entities``; drop an emptied partition."""
+        if entities or not self._partitioned:
+            self._atomic_write(
+                [self.codec.dumps(e.asdict()) + "\n" for e in entities], path
+            )
+            return
+        for stale in (path, path + ".idx"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stale)
+        self._rewritten(path)
+
+    def _append(self, lines: List[str], path: Optional[str] = None) -> None:
+        """Append serialized lines to a file under the ``durability`` policy."""
+        path = path or self._filename
+        if self.durability != "batch":
+            self._write(lines, path)
+            return
+        # The flush timer's thread takes the buffer under the same lock.
+        with self._thread_lock:
+            if not self._buffered:
+                self._buffered_at = time.monotonic()
+                self._flush_timer = threading.Timer(self.flush_ms / 1000, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                _buffering.add(self)
+            self._buffer.setdefault(path, []).extend(lines)
+            self._buffered += len(lines)
+            if (
+                self._buffered >= self.flush_entities
+                or (time.monotonic() - self._buffered_at) * 1000 >= self.flush_ms
+            ):
+                self.flush()
+
+    def _write(self, lines: List[str], path: str) -> None:
+        # One write per call: every line lands whole or, at the very end of
+        # a torn write, as a single malformed trailing line (or block).
+        data: Union[str, bytes] = "".join(lines)
+        mode, encoding = "a", "utf-8"
+        if self._compressor is not None:
+            data, mode, encoding = b"".join(self._pack(lines)), "ab", None
+        try:
+            fp = open(path, mode, encoding=encoding)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)  # a new partition
+            fp = open(path, mode, encoding=encoding)
+        with fp:
+            fp.write(data)
+            if self.durability != "os":
+                fp.flush()
+                os.fsync(fp.fileno())
+
+    def flush(self) -> None:
+        """Write and fsync the appends buffered by ``durability="batch"``."""
+        with self._thread_lock:
+            if self._buffer:
+                with self._locked(exclusive=True):
+                    for path in list(self._buffer):
+                        self._write(self._buffer.pop(path), path)
+            self._buffered = 0
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            _buffering.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def _append_log(
+        self,
+        entities: List[EntityType],
+        removed: List[EntityType],
+        created: int = 0,
+    ) -> None:
+        """Append new versions and tombstones, then compact if it is due.
+
+        ``created`` counts the records that add a live entity: entities that
+        were not stored before, and ones moving to another partition (whose
+        old copy is among ``removed``).
+        """
+        segments = self._lines_by_segment(entities) if entities else {}
+        for entity in removed:
+            segments.setdefault(self._segment_of(entity), []).append(
+                self.codec.dumps({self._TOMBSTONE: entity.id}) + "\n"
+            )
+        if not segments:
+            return
+        if self._log_stats is None:
+            # From the offset indexes, which only read what was appended since
+            # they last synced.
+            indexes = [self._offset_index(path) for path in self._segments()]
+            for index in indexes:
+                self._sync(index)
+            self._log_stats = (
+                sum(index.records for index in indexes),
+                sum(len(index.offsets) for index in indexes),
+            )
+        for path, lines in segments.items():
+            self._append(lines, path)
+        if self._log_stats is not None:
+            records, live = self._log_stats
+            appended = sum(len(lines) for lines in segments.values())
+            self._log_stats = (records + appended, live + created - len(removed))
+            self._compact_if_due()
+
+    def _compact_if_due(self) -> None:
+        records, live = self._log_stats or (0, 0)
+        if (
+            records >= self.compaction_min_records
+            and records - live > self.compaction_threshold * records
+        ):
+            self.compact()
+
+    def _moved(
+        self, live: Dict[Any, EntityType], entities: List[EntityType]
+    ) -> List[EntityType]:
+        """The stored versions of ``entities`` that an update moves to another
+        ``partition_by`` partition."""
+        if not self.partition_by:
+            return []
+        return [
+            live[e.id]
+            for e in entities
+            if e.id in live and self._segment_of(live[e.id]) != self._segment_of(e)
+        ]
+
+    def _remove_matching(
+        self, specification: Optional[Specification]
+    ) -> List[EntityType]:
+        """Rewrite the files ``specification`` can match without its matches.
 
+        Only files holding a match are rewritten. Returns the removed entities.
+        """
+        is_match = compile_specification(specification) if specification else None
+        removed = []
+        for path in self._segments(specification):
+            kept: List[EntityType] = []
+            dropped: List[EntityType] = []
+            for entity in self._scan([path]):
+                (dropped if is_match is None or is_match(entity) else kept).append(
+                    entity
+                )
+            if dropped:
+                self._rewrite(path, kept)
+                removed += dropped
+        return removed
+
+    @_exclusive
+    def compact(self) -> None:
+        """Rewrite every file with only its live entities.
+
+        Drops superseded versions, tombstones and corrupt lines in one atomic
+        rewrite per file. Runs automatically in log-structured mode; safe to
+        call in either mode.
+        """
+        count = 0
+        for path in self._segments():
+            entities = list(self._scan([path]))
+            self._rewrite(path, entities)
+            count += len(entities)
+        self._log_stats = (count, count)
+
+    @_exclusive
     def add(self, entity: EntityType) -> EntityType:
-        serialized = json.dumps(entity.asdict(), cls=EnhancedEncoder)
-        with open(self._filename, "a", encoding="utf-8") as fp:
-            fp.write(serialized + "\n")
+        data = entity.asdict()
+        self._append([self.codec.dumps(data) + "\n"], self._segment_for(data))
+        if self.log_structured and self._log_stats is not None:
+            # Counted as a new live entity; a replaced one is found dead by
+            # the next full read.
+            records, live = self._log_stats
+            self._log_stats = (records + 1, live + 1)
         return super().add(entity)
 
+    @_exclusive
     def update(self, entity: EntityType, *, upsert=False) -> EntityType:
+        if self.log_structured:
+            live = self._live(EqualsSpecification("id", entity.id))
+            if entity.id not in live and not upsert:
+                raise self._object_not_found()
+            moved = self._moved(live, [entity])
+            created = int(entity.id not in live) + len(moved)
+            self._append_log([entity], moved, created=created)
+            return super().add(entity)
         try:
             current = self.find_one(Specification.parse(id=entity.id))
         except ObjectNotFoundException:
@@ -109,29 +1042,141 @@ class FileRepositoryMixin(RootDirMixin, InMemoryRepositoryMixin[EntityType]):
             return self.add(entity)
         raise self._object_not_found()
 
+    @_exclusive
     def remove_one(self, specification: Specification):
+        if self.log_structured:
+            is_match = compile_specification(specification)
+            live = self._live(specification)
+            removed = [e for e in live.values() if is_match(e)]
+            if not removed:
+                raise self._object_not_found()
+            self._append_log([], removed)
+            for entity in removed:
+                self.entities.pop(entity.id, None)
+            return
         super().remove_one(specification)
-        entities = list(self.find(NotSpecification(specification)))
-        self._atomic_write(
-            [json.dumps(e.asdict(), cls=EnhancedEncoder) + "\n" for e in entities]
-        )
+        self._remove_matching(specification)
+
+    @_exclusive
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        # One append per batch (and partition) instead of per entity.
+        for batch in batched(entities, batch_size):
+            for path, lines in self._lines_by_segment(batch).items():
+                self._append(lines, path)
+            for entity in batch:
+                self.entities[entity.id] = entity
+            count += len(batch)
+        return count
+
+    @_exclusive
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        entities = list(entities)
+        # Each id is written once, as the last entity given for it, but every
+        # entity given counts (see WriteRepository.update_many).
+        updates = last_by_key(entities, key=lambda e: e.id)
+        if self.log_structured:
+            live = self._live(InSpecification("id", [e.id for e in updates]))
+            written = [e for e in updates if e.id in live or upsert]
+            moved = self._moved(live, written)
+            created = sum(e.id not in live for e in written) + len(moved)
+            self._append_log(written, moved, created=created)
+            for entity in written:
+                self.entities[entity.id] = entity
+            return sum(e.id in live or upsert for e in entities)
+        segments = {path: list(self._scan([path])) for path in self._segments()}
+        existing = {e.id: path for path, stored in segments.items() for e in stored}
+        written = [e for e in updates if e.id in existing or upsert]
+        if not written:
+            return 0
+        # Same ordering as repeated update(): replaced rows move to the end. A
+        # single atomic rewrite per affected file replaces one per entity.
+        written_ids = {e.id for e in written}
+        targets: Dict[str, List[EntityType]] = {}
+        for entity in written:
+            targets.setdefault(self._segment_of(entity), []).append(entity)
+        affected = [existing[e.id] for e in written if e.id in existing]
+        for path in dict.fromkeys([*affected, *targets]):
+            kept = [e for e in segments.get(path, []) if e.id not in written_ids]
+            self._rewrite(path, kept + targets.get(path, []))
+        for entity in written:
+            self.entities[entity.id] = entity
+        return sum(e.id in existing or upsert for e in entities)
+
+    @_exclusive
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        if self.log_structured:
+            live = self._live(specification) if specification else self._resolve_log()
+            if specification:
+                is_match = compile_specification(specification)
+                removed = [e for e in live.values() if is_match(e)]
+            else:
+                removed = list(live.values())
+            self._append_log([], removed)
+        else:
+            removed = self._remove_matching(specification)
+        for entity in removed:
+            self.entities.pop(entity.id, None)
+        return len(removed)
 
 
 class FileFileRepositoryMixin(RootDirMixin, FileRepository):
+    """Stores files under ``<root_dir>/media``.
+
+    Set ``compression`` (``"gzip"`` or ``"zstd"``, as for
+    ``FileRepositoryMixin``) to store uploads as compressed blocks, under
+    ``<root_dir>/compressed_media`` instead, unless that does not make them
+    smaller, as with already compressed media. ``get_file`` unpacks only the
+    files found there, so any upload, whatever its bytes, reads back as it
+    was, including files stored before compression was switched on or off.
+    """
+
+    compression = ""
+
+    def _media_path(self, reference: str) -> str:
+        return os.path.join(self.root_dir, "media", reference)
+
+    def _compressed_path(self, reference: str) -> str:
+        return os.path.join(self.root_dir, "compressed_media", reference)
+
     def upload_file(self, data: bytes, content_type: str, reference: str = "") -> str:
         if not reference:
             reference = str(uuid.uuid4())
-        with open(os.path.join(self.root_dir, "media", reference), "wb") as fp:
+        path, stale = self._media_path(reference), self._compressed_path(reference)
+        if self.compression:
+            packed = pack_block(data, get_compressor(self.compression))
+            if len(packed) < len(data):
+                data, path, stale = packed, stale, path
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fp:
             fp.write(data)
+        # The reference may have been stored the other way before.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(stale)
         return reference
 
     def get_file(self, reference: str) -> bytes:
-        with open(os.path.join(self.root_dir, "media", reference), "rb") as fp:
-            return fp.read()
+        """The file as uploaded, unpacked if it was stored compressed.
+
+        Raises:
+            ValueError: If the file was stored compressed and is damaged
+        """
+        compressed = self._compressed_path(reference)
+        if not os.path.isfile(compressed):
+            with open(self._media_path(reference), "rb") as fp:
+                return fp.read()
+        with open(compressed, "rb") as fp:
+            data = unpack_blocks(fp.read())
+        if data is None:
+            raise ValueError(f"Compressed file {reference!r} is damaged")
+        return data
 
     def delete_file(self, reference: str) -> bool:
-        try:
-            os.remove(os.path.join(self.root_dir, "media", reference))
-            return True
-        except FileNotFoundError:
-            return False
+        deleted = False
+        for path in (self._compressed_path(reference), self._media_path(reference)):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+                deleted = True
+        return deleted
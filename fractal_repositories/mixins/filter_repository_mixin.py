@@ -5,6 +5,7 @@ from typing import Callable, Generic, Iterator, Optional
 from fractal_specifications.generic.specification import Specification
 
 from fractal_repositories.core.repositories import EntityType, Repository
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 
 class FilterRepositoryMixin(Repository[EntityType], Generic[EntityType], ABC):
@@ -21,9 +22,7 @@ class FilterRepositoryMixin(Repository[EntityType], Generic[EntityType], ABC):
         entities = self.find(
             specification, offset=offset, limit=limit, order_by=order_by
         )
-        return filter(
-            lambda e: sub_specification.is_satisfied_by(
-                pre_processor(deepcopy(e)) if pre_processor else e
-            ),
-            entities,
-        )
+        is_match = compile_specification(sub_specification)
+        if not pre_processor:
+            return filter(is_match, entities)
+        return filter(lambda e: is_match(pre_processor(deepcopy(e))), entities)
@@ -1,5 +1,6 @@
+import itertools
 import uuid
-from typing import Dict, Iterator, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 from fractal_specifications.generic.specification import Specification
 
@@ -8,13 +9,64 @@ from fractal_repositories.core.repositories import (
     FileRepository,
     Repository,
 )
+from fractal_repositories.utils.indexes import IndexDeclaration, IndexedEntities
+from fractal_repositories.utils.sorting import order_entities
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 
 class InMemoryRepositoryMixin(Repository[EntityType]):
+    """Repository keeping its entities in a dict keyed by id.
+
+    ``get``/``find_one`` by id and ``id`` equality or ``in`` specifications are
+    dict lookups. Declare ``indexes`` to have equality and ``in``
+    specifications on other fields answered by a hash index instead of a
+    scan; a tuple declares a composite index, used when every one of its
+    fields is constrained::
+
+        class UserRepository(InMemoryRepositoryMixin[User]):
+            entity = User
+            indexes = ["email", ("tenant_id", "status")]
+
+    ``sorted_indexes`` declares fields kept in sorted order. They answer
+    ``<``/``<=``/``>``/``>=`` specifications on that field, and ``find``
+    ordered by it walks the index instead of sorting, stopping once
+    ``offset + limit`` matches are found::
+
+        sorted_indexes = ["created_at"]
+
+    Without a sorted index, ``find`` with ``order_by`` and ``limit`` selects
+    the first ``offset + limit`` matches with a heap instead of sorting all.
+
+    Indexes are kept current on add, update and remove, so an entity changed
+    in place must be passed to ``update`` before indexed queries see it.
+    """
+
+    # Dict lookups have no parameter limit to chunk around.
+    get_many_chunk_size = 0
+    indexes: Sequence[IndexDeclaration] = ()
+    sorted_indexes: Sequence[str] = ()
+
     def __init__(self, *args, **kwargs) -> None:
         super(InMemoryRepositoryMixin, self).__init__(*args, **kwargs)
 
-        self.entities: Dict[str, EntityType] = {}
+        self.entities = {}
+
+    @property
+    def entities(self) -> Dict[Any, EntityType]:
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities: Dict[Any, EntityType]) -> None:
+        # Any dict assigned here is indexed, so subclasses can load data by
+        # assignment.
+        self._entities = IndexedEntities(
+            self.indexes, entities, sorted_indexes=self.sorted_indexes
+        )
+
+    @property
+    def _index(self) -> Optional[IndexedEntities]:
+        """The indexes queries may use, or None if reads must scan."""
+        return self._entities
 
     def add(self, entity: EntityType) -> EntityType:
         self.entities[entity.id] = entity
@@ -30,22 +82,63 @@ class InMemoryRepositoryMixin(Repository[EntityType]):
             if obj.id in self.entities:
                 del self.entities[obj.id]
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        for entity in entities:
+            self.entities[entity.id] = entity
+            count += 1
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        count = 0
+        for entity in entities:
+            if entity.id in self.entities or upsert:
+                self.entities[entity.id] = entity
+                count += 1
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        if specification:
+            ids = [
+                e.id
+                for e in self._filter_entities(
+                    specification, self._candidates(specification)
+                )
+            ]
+        else:
+            ids = list(self.entities)
+        for id in ids:
+            self.entities.pop(id, None)
+        return len(ids)
+
     @property
     def _get_entities(self) -> Iterator[EntityType]:
         for value in self.entities.values():
             yield value
 
+    def _candidates(self, specification: Specification) -> Iterable[EntityType]:
+        """The entities that may satisfy the spec, narrowed by an index if possible."""
+        ids = self._index.plan(specification) if self._index is not None else None
+        if ids is None:
+            return self._get_entities
+        return [self.entities[id] for id in ids]
+
     def find_one(self, specification: Specification) -> EntityType:
         for entity in filter(
-            lambda i: specification.is_satisfied_by(i), self._get_entities
+            compile_specification(specification), self._candidates(specification)
         ):
             return entity
         raise self._object_not_found()
 
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        return [self.entities[id] for id in ids if id in self.entities]
+
     def _filter_entities(
-        self, specification: Specification, entities: Iterator[EntityType]
+        self, specification: Specification, entities: Iterable[EntityType]
     ) -> List[EntityType]:
-        return list(filter(lambda i: specification.is_satisfied_by(i), entities))
+        return list(filter(compile_specification(specification), entities))
 
     def find(
         self,
@@ -55,30 +148,34 @@ class InMemoryRepositoryMixin(Repository[EntityType]):
         limit: int = 0,
         order_by: str = "",
     ) -> Iterator[EntityType]:
-        if specification:
-            entities = self._filter_entities(specification, self._get_entities)
-        else:
-            entities = list(self._get_entities)
-
         order_by = order_by or self.order_by
-        reverse = False
-        if order_by.startswith("-"):
-            order_by = order_by[1:]
-            reverse = True
-
-        if order_by:
-            entities = sorted(
-                entities, key=lambda i: getattr(i, order_by), reverse=reverse
-            )
+        ids = self._index.ordered(order_by) if self._index is not None else None
+        if ids is not None and (
+            not specification or self._index.plan(specification) is None
+        ):
+            # Walking a sorted index yields entities already in order, so a
+            # limited query stops after offset + limit matches.
+            entities: Iterable[EntityType] = map(self.entities.__getitem__, ids)
+            if specification:
+                entities = filter(compile_specification(specification), entities)
+            if limit:
+                entities = itertools.islice(entities, offset, offset + limit)
+            yield from list(entities)
+            return
 
-        if limit:
-            entities = list(entities)[offset : offset + limit]
-        for entity in entities:
-            yield entity
+        if specification:
+            entities = self._filter_entities(
+                specification, self._candidates(specification)
+            )
+        else:
+            entities = self._get_entities
+        yield from order_entities(entities, order_by, offset=offset, limit=limit)
 
     def count(self, specification: Optional[Specification] = None) -> int:
         if specification:
-            entities = self._filter_entities(specification, self._get_entities)
+            entities = self._filter_entities(
+                specification, self._candidates(specification)
+            )
         else:
             entities = list(self._get_entities)
         return len(entities)
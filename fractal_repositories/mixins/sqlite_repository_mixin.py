@@ -1,9 +1,28 @@
+import dataclasses
+import hashlib
+import itertools
 import json
 import logging
 import os
+import re
 import sqlite3
+import threading
+import weakref
 from contextlib import contextmanager
-from typing import Iterator, List, Optional
+from datetime import date, datetime
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_type_hints,
+)
 
 from fractal_specifications.contrib.sqlite.specifications import (
     SpecificationNotMappedToSqlite,
@@ -12,14 +31,93 @@ from fractal_specifications.contrib.sqlite.specifications import (
 from fractal_specifications.generic.operators import EqualsSpecification
 from fractal_specifications.generic.specification import Specification
 
+from fractal_repositories.core.entity import _serialize
 from fractal_repositories.core.repositories import EntityType, Repository
 from fractal_repositories.mixins.file_repository_mixin import RootDirMixin
-from fractal_repositories.utils.json_encoder import EnhancedEncoder
+from fractal_repositories.utils.codecs import JsonCodec, check_codec, get_codec
+from fractal_repositories.utils.indexes import IndexDeclaration
+from fractal_repositories.utils.iterables import batched
+from fractal_repositories.utils.sorting import order_entities
+from fractal_repositories.utils.specification_compiler import compile_specification
 
 logger = logging.getLogger(__name__)
 
 _NO_ID_MATCH = object()
 
+# Named ``pragmas`` settings for SqliteRepositoryMixin.
+PRAGMA_PRESETS: Dict[str, Dict[str, Any]] = {
+    # SQLite's defaults: rollback journal, full sync on every commit.
+    "default": {},
+    # Readers no longer block behind a writer (or the other way round), and a
+    # commit appends to the write-ahead log without syncing; a power loss can
+    # lose the last commits, never corrupt the database.
+    "wal": {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000},
+    # WAL plus a 64 MiB page cache, 256 MiB of memory-mapped I/O and
+    # temporary tables in memory.
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,
+        "mmap_size": 1 << 28,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Pragmas ``pragmas`` may set, in the order they are applied.
+_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+)
+
+_PRAGMA_VALUE = re.compile(r"-?\w+")
+
+# Field types whose stored (JSON) values SQLite sorts exactly as Python sorts
+# the values: numbers (and bools) numerically, strings and ISO dates by code
+# point. Not datetime (offsets), Decimal (fixed-point strings), Enum or UUID.
+_SQL_SORTABLE_TYPES = (str, int, float, date)
+
+# What SqliteSpecificationBuilder binds a field's JSON path after.
+_EXTRACT = "json_extract(data, "
+
+# Indexed JSON paths are written into SQL, so they may only hold identifiers.
+_INDEXABLE_PATH = re.compile(r"\$(\.\w+)+")
+
+
+def _jsonb_supported() -> bool:
+    """Whether the runtime SQLite has the JSONB functions (3.45.0 and later)."""
+    return sqlite3.sqlite_version_info >= (3, 45, 0)
+
+
+def _guarded_extract(row: str, path: str) -> str:
+    """SQL for the value at ``path`` in ``row``'s data (``new.``, ``old.`` or
+    ``""``), or NULL where SQLite cannot parse the document.
+
+    The json codec writes non-finite floats as ``Infinity`` and ``NaN``, which
+    ``json_extract`` rejects before SQLite 3.42 (and JSONB is never text, so
+    ``json_valid`` rejects it). Unguarded, such a row fails every write that
+    evaluates the expression, and the creation of an index over it.
+    """
+    data = f"{row}data"
+    return (
+        f"CASE WHEN typeof({data}) = 'blob' OR json_valid({data}) "
+        f"THEN json_extract({data}, '{path}') END"
+    )
+
+
+def _json_path(field: str) -> str:
+    """A field's JSON path, as SqliteSpecificationBuilder writes it."""
+    return "$." + field.replace("__", ".")
+
+
+class _Connection(sqlite3.Connection):
+    """A connection that can be weakly referenced (``sqlite3.Connection``
+    itself cannot), so a repository can track its open connections."""
+
 
 class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
     """SQLite-backed repository — a self-contained drop-in for ``FileRepositoryMixin``.
@@ -54,13 +152,21 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
     always identical to the other repositories — pushdown only ever changes
     performance, never the result. (One deliberate refinement: a range
     comparison against a row whose field is ``null`` excludes that row in SQL,
-    where the in-memory path would raise ``TypeError``.) Ordering and pagination
-    are applied in Python over the matched rows, because ``Decimal`` (stored as a
+    where the in-memory path would raise ``TypeError``.)
+
+    Ordering and pagination are pushed down too (``ORDER BY json_extract(data,
+    '$.field'), id LIMIT ? OFFSET ?``) when the entity declares both the
+    ``order_by`` field and ``id`` as ``str``, ``int``, ``float``, ``bool`` or
+    ``date`` (not ``Optional``), whose stored values sort in SQL exactly as in
+    Python; a row missing the field sorts by the field's default. Otherwise
+    they are applied in Python over the matched rows (a heap selects the first
+    ``offset + limit`` when limited), because ``Decimal`` (stored as a
     fixed-point string) and other serialized types do not sort naturally in SQL.
 
     Note that ``count`` reflects stored rows matching the predicate; a row that
     cannot deserialize into the current entity (which ``find`` skips) may still
-    be counted until it is rewritten.
+    be counted until it is rewritten, and likewise takes its place in an
+    ``offset`` pushed down to SQL.
 
     Drop-in with ``FileRepositoryMixin``: same ``root_dir`` constructor, same
     query results. Swapping the base class is the only change an application
@@ -70,6 +176,81 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
     provides ACID atomicity, crash-safety, and concurrent-writer locking, so the
     torn-write and corrupt-file handling the file mixin needs does not apply
     here.
+
+    ``codec`` picks the JSON library used for the ``data`` column, exactly as
+    for ``FileRepositoryMixin``; the stored text is JSON either way, so SQL
+    pushdown is unaffected.
+
+    ``connection`` sets how connections are made:
+
+    - ``"operation"`` (default): a fresh connection per operation, which
+      creates the table if needed and is closed afterwards. Nothing is tied to
+      a thread, so a repository can be handed between threads freely.
+    - ``"thread"``: each thread (and forked process) keeps one connection
+      open for the repository's lifetime, and the table is created once, when
+      it is opened. Operations only pay for their own statements, and
+      ``cached_statements`` prepared statements stay cached across them.
+      ``close`` closes them; they are also closed when the repository, or the
+      thread, goes away.
+
+    ``cached_statements`` is passed to ``sqlite3.connect`` in both modes.
+
+    ``fetch_size`` makes reads stream: ``find`` (unless it sorts in Python)
+    reads the matching ids first, then fetches and deserializes the rows that
+    many at a time as they are consumed, instead of holding every matching
+    document in memory at once. Its connection stays open until the
+    iteration ends or the iterator is closed (or dropped). The repository can
+    be written while iterating: a row removed meanwhile is skipped and one
+    updated is read as updated.
+
+    ``pragmas`` configures every connection when it is opened: a
+    ``PRAGMA_PRESETS`` name (``"default"``, ``"wal"``, ``"throughput"``) or a
+    dict of ``journal_mode``, ``synchronous``, ``busy_timeout``,
+    ``cache_size``, ``mmap_size`` and ``temp_store`` values. ``"wal"`` lets
+    readers run while a writer commits and makes commits much cheaper, at the
+    cost of possibly losing the last commits (never the database) on power
+    loss. Combine with ``connection="thread"`` so they are applied once per
+    thread rather than once per operation.
+
+    ``storage="jsonb"`` stores ``data`` in SQLite's binary JSONB format
+    (SQLite 3.45.0+), which ``json_extract`` reads without parsing the whole
+    document again for every row a pushed-down query looks at; entities are
+    read back as JSON text with ``json(data)``, so the codec is unaffected.
+    On an older SQLite it logs a warning and stores text. Rows written in the
+    other format stay readable; ``migrate_storage`` converts them in place.
+
+    Declare ``indexes`` to index fields queried often; a tuple declares a
+    composite index, as for ``InMemoryRepositoryMixin``::
+
+        class UserRepository(SqliteRepositoryMixin[User]):
+            entity = User
+            indexes = ["email", ("tenant_id", "status")]
+
+    Each becomes an index on the ``json_extract`` expressions (created with
+    the table), and the indexed fields' JSON paths are written into queries
+    rather than bound, since SQLite only uses an expression index when the
+    query spells out the same expression. The expressions are NULL for a row
+    SQLite cannot parse (the json codec writes non-finite floats as
+    ``Infinity`` and ``NaN``), so such a row is stored and indexed, but not
+    matched or ordered by its indexed fields in SQL. Equality, ``in`` and range
+    specifications on them, and ``find`` ordered by one, are then answered by
+    searching the index instead of scanning the table. An index is named
+    after the table and its fields, plus a digest of its expressions (e.g.
+    ``<table>_email_<digest>``); declaring the same fields twice raises
+    ``ValueError``. Indexes are never dropped: drop an index no longer
+    declared by hand.
+
+    Declare ``search_fields`` to make text fields searchable with ``search``::
+
+        search_fields = ["title", "description"]
+
+    They are indexed in an FTS5 table (``<table>_fts``) kept in sync by
+    triggers on every write, so ``search`` answers a full-text query from
+    that index, best match first, instead of scanning every row. The table is
+    created, and filled from the existing rows, with the table; declaring
+    other fields rebuilds it. A row SQLite cannot parse (see ``indexes``) is
+    stored, but not indexed for ``search``. A ``VACUUM`` may renumber rows: call
+    ``rebuild_search_index`` after one.
     """
 
     # Deserialization errors that mean "this row is stale relative to the current
@@ -78,6 +259,93 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
     # loudly so a genuine bug can't silently hide every row from every read.
     _STALE_ROW_ERRORS = (json.JSONDecodeError, TypeError, ValueError)
 
+    _CONNECTIONS = ("operation", "thread")
+    _STORAGES = ("text", "jsonb")
+
+    indexes: Sequence[IndexDeclaration] = ()
+    search_fields: Sequence[str] = ()
+
+    def __init__(
+        self,
+        *,
+        codec: Optional[Union[str, JsonCodec]] = None,
+        connection: str = "operation",
+        cached_statements: int = 128,
+        pragmas: Union[str, Dict[str, Any]] = "default",
+        fetch_size: int = 0,
+        storage: str = "text",
+        **kwargs,
+    ):
+        super(SqliteRepositoryMixin, self).__init__(**kwargs)
+
+        if connection not in self._CONNECTIONS:
+            raise ValueError(
+                f"Unknown connection {connection!r}, expected one of {self._CONNECTIONS}"
+            )
+        if storage not in self._STORAGES:
+            raise ValueError(
+                f"Unknown storage {storage!r}, expected one of {self._STORAGES}"
+            )
+        if storage == "jsonb" and not _jsonb_supported():
+            logger.warning(
+                "SQLite %s has no JSONB (3.45.0+), storing %s as text",
+                sqlite3.sqlite_version,
+                self._filename,
+            )
+            storage = "text"
+        self.storage = storage
+        # How the data column is written, and read back as JSON text. Where
+        # JSONB exists either format may be stored (storage was switched
+        # without migrate_storage), so reads convert whatever they find.
+        self._data_value = "jsonb(?)" if storage == "jsonb" else "?"
+        self._data = (
+            "CASE WHEN typeof(data) = 'blob' THEN json(data) ELSE data END"
+            if _jsonb_supported()
+            else "data"
+        )
+        self.pragmas = self._check_pragmas(pragmas)
+        # Indexed JSON path -> its indexed expression, and the (name, columns)
+        # of each index.
+        self._indexed_paths: Dict[str, str] = {}
+        self._index_definitions: List[Tuple[str, str]] = []
+        for declaration in self.indexes:
+            fields = [declaration] if isinstance(declaration, str) else declaration
+            paths = [_json_path(field) for field in fields]
+            for path in paths:
+                if not _INDEXABLE_PATH.fullmatch(path):
+                    raise ValueError(f"Cannot index {path!r} of {declaration!r}")
+                self._indexed_paths[path] = _guarded_extract("", path)
+            columns = ", ".join(self._indexed_paths[path] for path in paths)
+            if any(columns == existing for _, existing in self._index_definitions):
+                raise ValueError(f"Index on {declaration!r} declared twice")
+            # Readable, but only the digest of the columns keeps "a_b",
+            # ("a", "b") and "a__b" apart.
+            digest = hashlib.sha1(columns.encode()).hexdigest()[:8]
+            name = "_".join([self._table, *(path[2:] for path in paths), digest])
+            self._index_definitions.append((name.replace(".", "_"), columns))
+        for field in self.search_fields:
+            if not _INDEXABLE_PATH.fullmatch(_json_path(field)):
+                raise ValueError(f"Cannot search {field!r}")
+        self.codec = get_codec(codec)
+        self.connection = connection
+        self.cached_statements = cached_statements
+        self.fetch_size = fetch_size
+        self._local = threading.local()
+        # Every open thread connection, so close() reaches all threads'.
+        self._connections: "weakref.WeakSet[sqlite3.Connection]" = weakref.WeakSet()
+        self._sort_columns: Dict[str, Optional[Tuple[str, List[Any]]]] = {}
+        self._check_codec()
+
+    def _check_codec(self) -> None:
+        if not os.path.exists(self._filename):
+            return
+        with self._connect() as conn:
+            row = conn.execute(
+                f'SELECT {self._data} FROM "{self._table}" LIMIT 1'
+            ).fetchone()
+        if row is not None:
+            check_codec(self.codec, row[0], self._filename)
+
     @property
     def _filename(self) -> str:
         return os.path.join(self.root_dir, "db", f"{self.__class__.__name__}.sqlite")
@@ -88,26 +356,243 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         # identifier regardless.
         return self.__class__.__name__
 
+    @staticmethod
+    def _check_pragmas(pragmas: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(pragmas, str):
+            try:
+                return PRAGMA_PRESETS[pragmas]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown pragmas preset {pragmas!r}, "
+                    f"expected one of {sorted(PRAGMA_PRESETS)}"
+                ) from None
+        for name, value in pragmas.items():
+            # Both end up in the statement text: PRAGMA takes no parameters.
+            if name not in _PRAGMAS:
+                raise ValueError(f"Unknown pragma {name!r}, expected one of {_PRAGMAS}")
+            if not _PRAGMA_VALUE.fullmatch(str(value)):
+                raise ValueError(f"Invalid value {value!r} for pragma {name!r}")
+        return dict(pragmas)
+
+    def _open(self, **kwargs) -> sqlite3.Connection:
+        """A new connection, configured by ``pragmas``, with the table created."""
+        os.makedirs(os.path.dirname(self._filename), exist_ok=True)
+        conn = sqlite3.connect(
+            self._filename, cached_statements=self.cached_statements, **kwargs
+        )
+        try:
+            for name in _PRAGMAS:
+                if name in self.pragmas:
+                    conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
+            self._create_table(conn)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self._table}" '
+            "(id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        for name, columns in self._index_definitions:
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{self._table}" ({columns})'
+            )
+        if self.search_fields:
+            self._create_search_table(conn)
+
+    @property
+    def _search_table(self) -> str:
+        return f"{self._table}_fts"
+
+    @property
+    def _search_columns(self) -> str:
+        return ", ".join(f'"{field}"' for field in self.search_fields)
+
+    def _search_values(self, row: str) -> str:
+        """The search fields' values in ``row`` (``new``, ``old`` or ``data``'s)."""
+        return ", ".join(
+            _guarded_extract(row, _json_path(field)) for field in self.search_fields
+        )
+
+    def _create_search_table(self, conn: sqlite3.Connection) -> None:
+        fts = self._search_table
+        definition = f'CREATE VIRTUAL TABLE "{fts}" USING fts5({self._search_columns})'
+        find = "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?"
+        if conn.execute(find, (fts,)).fetchone() == (definition,):
+            return
+        # Once, under the write lock, so no write can slip in unindexed.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(find, (fts,)).fetchone()
+            if row != (definition,):
+                if row is not None:
+                    conn.execute(f'DROP TABLE "{fts}"')
+                conn.execute(definition)
+                self._create_search_triggers(conn)
+                self._fill_search_table(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _create_search_triggers(self, conn: sqlite3.Connection) -> None:
+        table, fts = self._table, self._search_table
+        insert = (
+            f'INSERT INTO "{fts}" (rowid, {self._search_columns}) '
+            f"VALUES (new.rowid, {self._search_values('new.')});"
+        )
+        triggers = {
+            # INSERT OR REPLACE deletes the row it replaces without firing
+            # delete triggers (unless recursive_triggers is on).
+            "before_insert": (
+                f'BEFORE INSERT ON "{table}" BEGIN DELETE FROM "{fts}" WHERE rowid '
+                f'IN (SELECT rowid FROM "{table}" WHERE id = new.id); END'
+            ),
+            "insert": f'AFTER INSERT ON "{table}" BEGIN {insert} END',
+            "update": (
+                f'AFTER UPDATE ON "{table}" BEGIN '
+                f'DELETE FROM "{fts}" WHERE rowid = old.rowid; {insert} END'
+            ),
+            "delete": (
+                f'AFTER DELETE ON "{table}" BEGIN '
+                f'DELETE FROM "{fts}" WHERE rowid = old.rowid; END'
+            ),
+        }
+        for name, trigger in triggers.items():
+            conn.execute(f'DROP TRIGGER IF EXISTS "{fts}_{name}"')
+            conn.execute(f'CREATE TRIGGER "{fts}_{name}" {trigger}')
+
+    def _fill_search_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            f'INSERT INTO "{self._search_table}" (rowid, {self._search_columns}) '
+            f'SELECT rowid, {self._search_values("")} FROM "{self._table}"'
+        )
+
+    def migrate_storage(self) -> int:
+        """Convert the rows stored in the other format to ``storage``, in place.
+
+        Rows that are not valid JSON are left as they are (and skipped on
+        read as before). Returns the number of rows converted.
+        """
+        if self.storage == "jsonb":
+            convert = "jsonb(data) WHERE typeof(data) != 'blob' AND json_valid(data)"
+        elif _jsonb_supported():
+            convert = "json(data) WHERE typeof(data) = 'blob'"
+        else:
+            return 0  # no JSONB here, so nothing stored as JSONB either
+        with self._connect() as conn:
+            return conn.execute(f'UPDATE "{self._table}" SET data = {convert}').rowcount
+
+    def rebuild_search_index(self) -> None:
+        """Index every row for ``search`` anew, e.g. after a ``VACUUM``."""
+        if not self.search_fields:
+            raise ValueError(f"{type(self).__name__} declares no search_fields")
+        with self._connect() as conn:
+            conn.execute(f'DELETE FROM "{self._search_table}"')
+            self._fill_search_table(conn)
+
+    def _where(self, specification: Optional[Specification]) -> Tuple[str, List[Any]]:
+        """The specification's WHERE clause, with indexed paths written in.
+
+        Raises:
+            SpecificationNotMappedToSqlite: If the builder cannot map it
+        """
+        where, params = SqliteSpecificationBuilder.build(specification)
+        if not self._indexed_paths:
+            return where, params
+        # The builder binds every value, so each "?" is one of params.
+        pieces = where.split("?")
+        clause, bound = pieces[0], []
+        for param, piece in zip(params, pieces[1:], strict=True):
+            if (
+                clause.endswith(_EXTRACT)
+                and piece.startswith(")")
+                and param in self._indexed_paths
+            ):
+                clause = clause[: -len(_EXTRACT)] + self._indexed_paths[param]
+                clause += piece[1:]
+            else:
+                clause += "?" + piece
+                bound.append(param)
+        return clause, bound
+
     @contextmanager
     def _connect(self) -> Iterator[sqlite3.Connection]:
-        os.makedirs(os.path.dirname(self._filename), exist_ok=True)
+        """A connection for one operation, committed if it completes.
+
+        With ``connection="thread"`` it is the thread's open connection, and
+        an operation that raises is rolled back instead. Inside
+        ``transaction`` it is the transaction's, committed when it ends.
+        """
+        conn = getattr(self._local, "transaction", None)
+        if conn is not None:
+            yield conn
+            return
+        if self.connection == "thread":
+            conn = self._thread_connection()
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            return
         # A fresh connection per operation sidesteps sqlite3's thread-affinity
         # rules; SQLite serializes concurrent access through its own file locks.
-        conn = sqlite3.connect(self._filename)
+        conn = self._open()
         try:
-            conn.execute(
-                f'CREATE TABLE IF NOT EXISTS "{self._table}" '
-                "(id TEXT PRIMARY KEY, data TEXT NOT NULL)"
-            )
             yield conn
             conn.commit()
         finally:
             conn.close()
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run the operations in the block in one transaction.
+
+        They share one connection and a single commit when the block ends;
+        if it raises, none of their writes is kept. A ``transaction`` inside
+        another joins it. Only operations made by this thread take part::
+
+            with repository.transaction():
+                repository.add(order)
+                repository.remove_one(Specification.parse(id=draft.id))
+        """
+        if getattr(self._local, "transaction", None) is not None:
+            yield
+            return
+        with self._connect() as conn:
+            self._local.transaction = conn
+            try:
+                yield
+            finally:
+                self._local.transaction = None
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        local = self._local
+        # A connection must not be used across fork, so a child opens its own.
+        if getattr(local, "pid", None) != os.getpid():
+            # Only ever used by this thread; check_same_thread=False just lets
+            # close() close it from another one.
+            conn = self._open(check_same_thread=False, factory=_Connection)
+            conn.commit()
+            local.conn, local.pid = conn, os.getpid()
+            self._connections.add(conn)
+        return local.conn
+
+    def close(self) -> None:
+        """Close the connections kept open by ``connection="thread"``."""
+        for conn in list(self._connections):
+            conn.close()
+        self._connections = weakref.WeakSet()
+        self._local = threading.local()
+
     def _row_to_entity(self, row_id: str, data: str) -> Optional[EntityType]:
         """Deserialize one row, returning None (with a warning) for stale rows."""
         try:
-            return self.entity.from_dict(json.loads(data))
+            return self.entity.from_dict(self.codec.loads(data))
         except self._STALE_ROW_ERRORS as exc:
             logger.warning(
                 "Skipping stale row %r in %s: %s",
@@ -117,14 +602,57 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
             )
             return None
 
+    def _select(
+        self, clause: str = "", params: Sequence[Any] = ()
+    ) -> Iterator[EntityType]:
+        """Yield the entities of the rows ``SELECT ... FROM <table> <clause>`` finds.
+
+        All rows are fetched up front, or, with ``fetch_size``, only their ids
+        are: the documents are then fetched ``fetch_size`` at a time as the
+        generator is consumed, on a connection kept open until it finishes or
+        is closed. No cursor stays open between batches, so writes made while
+        iterating neither block nor reappear (``INSERT OR REPLACE`` moves a
+        row to a new rowid); a row removed in between is skipped, and one
+        updated is read as updated.
+        """
+        if not self.fetch_size:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f'SELECT id, {self._data} FROM "{self._table}" {clause}', params
+                ).fetchall()
+            for row_id, data in rows:
+                entity = self._row_to_entity(row_id, data)
+                if entity is not None:
+                    yield entity
+            return
+        with self._connect() as conn:
+            ids = [
+                row[0]
+                for row in conn.execute(
+                    f'SELECT id FROM "{self._table}" {clause}', params
+                )
+            ]
+            # Bound-parameter limits cap a batch, as for get_many.
+            size = min(self.fetch_size, self.get_many_chunk_size or self.fetch_size)
+            for batch in batched(ids, size):
+                placeholders = ", ".join("?" for _ in batch)
+                documents = dict(
+                    conn.execute(
+                        f'SELECT id, {self._data} FROM "{self._table}" '
+                        f"WHERE id IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                )
+                for row_id in batch:
+                    if row_id not in documents:
+                        continue  # removed since the ids were read
+                    entity = self._row_to_entity(row_id, documents[row_id])
+                    if entity is not None:
+                        yield entity
+
     @property
     def _get_entities(self) -> Iterator[EntityType]:
-        with self._connect() as conn:
-            rows = conn.execute(f'SELECT id, data FROM "{self._table}"').fetchall()
-        for row_id, data in rows:
-            entity = self._row_to_entity(row_id, data)
-            if entity is not None:
-                yield entity
+        return self._select()
 
     @staticmethod
     def _id_lookup(specification: Optional[Specification]):
@@ -146,27 +674,18 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         cannot be translated to SQL, so the result is identical either way.
         """
         try:
-            where, params = SqliteSpecificationBuilder.build(specification)
+            where, params = self._where(specification)
         except SpecificationNotMappedToSqlite:
-            for entity in self._get_entities:
-                if specification.is_satisfied_by(entity):
-                    yield entity
+            yield from filter(compile_specification(specification), self._get_entities)
             return
-        with self._connect() as conn:
-            rows = conn.execute(
-                f'SELECT id, data FROM "{self._table}" WHERE {where}', params
-            ).fetchall()
-        for row_id, data in rows:
-            entity = self._row_to_entity(row_id, data)
-            if entity is not None:
-                yield entity
+        yield from self._select(f"WHERE {where}", params)
 
     def find_one(self, specification: Specification) -> EntityType:
         looked_up = self._id_lookup(specification)
         if looked_up is not _NO_ID_MATCH:
             with self._connect() as conn:
                 row = conn.execute(
-                    f'SELECT id, data FROM "{self._table}" WHERE id = ?',
+                    f'SELECT id, {self._data} FROM "{self._table}" WHERE id = ?',
                     (str(looked_up),),
                 ).fetchone()
             if row is not None:
@@ -179,6 +698,111 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
             return entity
         raise self._object_not_found()
 
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        # The base class keeps chunks below SQLite's bound-parameter limit
+        # (999 on older builds) and only accepts entities whose id equals a
+        # requested one, so a cross-type id doesn't match the text PK.
+        placeholders = ", ".join("?" for _ in ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT id, {self._data} FROM "{self._table}" WHERE id IN ({placeholders})',
+                [str(id) for id in ids],
+            ).fetchall()
+        for row_id, data in rows:
+            entity = self._row_to_entity(row_id, data)
+            if entity is not None:
+                yield entity
+
+    def _sort_column(self, field: str) -> Optional[Tuple[str, List[Any]]]:
+        """SQL (and its parameters) sorting rows as Python sorts ``field``.
+
+        None unless the entity declares ``field`` with a type in
+        ``_SQL_SORTABLE_TYPES``.
+        """
+        if field not in self._sort_columns:
+            self._sort_columns[field] = self._build_sort_column(field)
+        return self._sort_columns[field]
+
+    def _build_sort_column(self, field: str) -> Optional[Tuple[str, List[Any]]]:
+        try:
+            declared = {f.name: f for f in dataclasses.fields(self.entity)}[field]
+            field_type = get_type_hints(self.entity)[field]
+        except (KeyError, NameError, TypeError):
+            return None
+        if (
+            not isinstance(field_type, type)
+            or not issubclass(field_type, _SQL_SORTABLE_TYPES)
+            or issubclass(field_type, (datetime, Enum))
+        ):
+            return None
+        if field == "id" and field_type is str:
+            return "id", []  # the primary key holds the same strings
+        path = _json_path(field)
+        if path in self._indexed_paths:
+            column, params = self._indexed_paths[path], []
+        else:
+            column, params = f"{_EXTRACT}?)", [path]
+        if declared.default is not dataclasses.MISSING:
+            # from_dict fills a missing field in with its default.
+            column = f"COALESCE({column}, ?)"
+            params.append(_serialize(declared.default))
+        elif declared.default_factory is not dataclasses.MISSING:
+            return None
+        return column, params
+
+    def _order_clause(self, order_by: str) -> Optional[Tuple[str, List[Any]]]:
+        """An ``ORDER BY`` matching ``order_entities``, or None if SQL can't."""
+        descending = order_by.startswith("-")
+        field = order_by[1:] if descending else order_by
+        column, tiebreaker = self._sort_column(field), self._sort_column("id")
+        if column is None or tiebreaker is None:
+            return None
+        clause = f"ORDER BY {column[0]}{' DESC' if descending else ''}"
+        params = list(column[1])
+        if field != "id":
+            # Ties are in ascending id order either way.
+            clause += f", {tiebreaker[0]}"
+            params += tiebreaker[1]
+        return clause, params
+
+    def _find_ordered(
+        self,
+        specification: Optional[Specification],
+        order_by: str,
+        *,
+        offset: int,
+        limit: int,
+    ) -> Optional[Iterable[EntityType]]:
+        """``find`` with filter, order and page all in SQL, or None if SQL can't."""
+        order = self._order_clause(order_by)
+        if order is None:
+            return None
+        try:
+            where, params = self._where(specification)
+        except SpecificationNotMappedToSqlite:
+            return None
+        params += order[1]
+        if not limit:
+            return self._select(f"WHERE {where} {order[0]}", params)
+        query = f'SELECT id, {self._data} FROM "{self._table}" WHERE {where} {order[0]}'
+
+        entities: List[EntityType] = []
+        with self._connect() as conn:
+            # A stale row (skipped) leaves the page short: fetch the rows after
+            # it until the page is full or the rows run out.
+            while True:
+                wanted = limit - len(entities)
+                rows = conn.execute(
+                    f"{query} LIMIT ? OFFSET ?", [*params, wanted, offset]
+                ).fetchall()
+                for row_id, data in rows:
+                    entity = self._row_to_entity(row_id, data)
+                    if entity is not None:
+                        entities.append(entity)
+                if len(rows) < wanted or len(entities) == limit:
+                    return entities
+                offset += wanted
+
     def find(
         self,
         specification: Optional[Specification] = None,
@@ -187,31 +811,131 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         limit: int = 0,
         order_by: str = "",
     ) -> Iterator[EntityType]:
+        order_by = order_by or self.order_by
+        if order_by:
+            ordered = self._find_ordered(
+                specification, order_by, offset=offset, limit=limit
+            )
+            if ordered is not None:
+                yield from ordered
+                return
         if specification:
-            entities: List[EntityType] = list(self._matching(specification))
+            entities: Iterable[EntityType] = self._matching(specification)
         else:
-            entities = list(self._get_entities)
+            entities = self._get_entities
+        if not order_by:
+            # Unordered: stream, stopping after the page when limited. As in
+            # order_entities, offset only applies together with limit.
+            if limit:
+                entities = itertools.islice(entities, offset, offset + limit)
+            yield from entities
+            return
+        # With a limit only the first offset + limit entities are selected (a
+        # heap), instead of sorting every match.
+        yield from order_entities(entities, order_by, offset=offset, limit=limit)
 
-        order_by = order_by or self.order_by
-        reverse = order_by.startswith("-")
-        if reverse:
-            order_by = order_by[1:]
-        if order_by:
-            entities = sorted(
-                entities, key=lambda i: getattr(i, order_by), reverse=reverse
+    def search(
+        self,
+        query: str,
+        specification: Optional[Specification] = None,
+        *,
+        offset: int = 0,
+        limit: int = 0,
+    ) -> Iterator[EntityType]:
+        """Entities whose ``search_fields`` match a full-text query, best first.
+
+        ``query`` is an FTS5 query: words, ``"phrases"``, ``prefix*``,
+        ``AND``/``OR``/``NOT`` and column filters like ``title: word``.
+        Matches are ranked by bm25, ties in id order; ``specification``
+        narrows them further. As in ``find``, ``offset`` only applies
+        together with ``limit``.
+
+        Raises:
+            ValueError: If ``search_fields`` is not declared, or ``query`` is
+                not a valid FTS5 query
+        """
+        if not self.search_fields:
+            raise ValueError(f"{type(self).__name__} declares no search_fields")
+        fts = self._search_table
+        clause = (
+            f'JOIN (SELECT rowid AS match_rowid, rank FROM "{fts}" '
+            f'WHERE "{fts}" MATCH ?) AS matches '
+            f'ON "{self._table}".rowid = matches.match_rowid'
+        )
+        is_match = None
+        try:
+            where, params = self._where(specification)
+        except SpecificationNotMappedToSqlite:
+            where, params = "1 = 1", []
+            is_match = compile_specification(specification)
+        clause += f" WHERE {where} ORDER BY matches.rank, id"
+        params = [query, *params]
+        if limit and is_match is None:
+            clause += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        entities: Iterable[EntityType] = self._select(clause, params)
+        if is_match is not None:
+            entities = filter(is_match, entities)
+            if limit:
+                entities = itertools.islice(entities, offset, offset + limit)
+        try:
+            yield from entities
+        except sqlite3.OperationalError as exc:
+            raise ValueError(f"Invalid search query {query!r}: {exc}") from None
+
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        try:
+            where, params = self._where(specification)
+        except SpecificationNotMappedToSqlite:
+            yield from super()._find_values(
+                specification, select, offset=offset, limit=limit, order_by=order_by
             )
+            return
+
+        order_by = order_by or self.order_by
+        field = order_by[1:] if order_by.startswith("-") else order_by
+        order = self._order_clause(order_by) if field else None
+        if order is None and field:
+            # The sort key and tiebreaker are extracted too, so ordering happens
+            # in Python with exactly the same comparisons as find().
+            keys = list(dict.fromkeys(select + [field, "id"]))
+        else:
+            keys = list(dict.fromkeys(select))
+        # json_object keeps every value's JSON type (nested objects included) in
+        # a single column per row; the rest of the document is never parsed.
+        projection = ", ".join("?, json_extract(data, ?)" for _ in keys)
+        query = f'SELECT json_object({projection}) FROM "{self._table}" WHERE {where}'
+        params = [arg for key in keys for arg in (key, f"$.{key}")] + params
+        if order is not None:
+            query += f" {order[0]}"
+            params += order[1]
+        if limit and (order is not None or not field):
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._connect() as conn:
+            rows = [self.codec.loads(row[0]) for row in conn.execute(query, params)]
 
-        if limit:
-            entities = entities[offset : offset + limit]
-        yield from entities
+        if order is None and field:
+            rows = order_entities(
+                rows, order_by, offset=offset, limit=limit, value=dict.__getitem__
+            )
+        for row in rows:
+            yield {key: row[key] for key in select}
 
     def count(self, specification: Optional[Specification] = None) -> int:
         try:
-            where, params = SqliteSpecificationBuilder.build(specification)
+            where, params = self._where(specification)
         except SpecificationNotMappedToSqlite:
-            return sum(
-                1 for e in self._get_entities if specification.is_satisfied_by(e)
-            )
+            is_match = compile_specification(specification)
+            return sum(1 for e in self._get_entities if is_match(e))
         with self._connect() as conn:
             row = conn.execute(
                 f'SELECT COUNT(*) FROM "{self._table}" WHERE {where}', params
@@ -219,12 +943,13 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         return row[0] if row else 0
 
     def add(self, entity: EntityType) -> EntityType:
-        serialized = json.dumps(entity.asdict(), cls=EnhancedEncoder)
+        serialized = self.codec.dumps(entity.asdict())
         with self._connect() as conn:
             # Last-write-wins on a duplicate id, matching the in-memory mixin's
             # dict-assignment semantics rather than raising on conflict.
             conn.execute(
-                f'INSERT OR REPLACE INTO "{self._table}" (id, data) VALUES (?, ?)',
+                f'INSERT OR REPLACE INTO "{self._table}" (id, data) '
+                f"VALUES (?, {self._data_value})",
                 (str(entity.id), serialized),
             )
         return entity
@@ -240,7 +965,7 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         if looked_up is not _NO_ID_MATCH:
             with self._connect() as conn:
                 row = conn.execute(
-                    f'SELECT id, data FROM "{self._table}" WHERE id = ?',
+                    f'SELECT id, {self._data} FROM "{self._table}" WHERE id = ?',
                     (str(looked_up),),
                 ).fetchone()
                 entity = self._row_to_entity(row[0], row[1]) if row else None
@@ -254,11 +979,11 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
         # Mirror the file/in-memory contract: raise if nothing matches, then
         # remove every row that satisfies the specification.
         try:
-            where, params = SqliteSpecificationBuilder.build(specification)
+            where, params = self._where(specification)
         except SpecificationNotMappedToSqlite:
-            matching = [
-                e for e in self._get_entities if specification.is_satisfied_by(e)
-            ]
+            matching = list(
+                filter(compile_specification(specification), self._get_entities)
+            )
             if not matching:
                 raise self._object_not_found() from None
             with self._connect() as conn:
@@ -274,6 +999,65 @@ class SqliteRepositoryMixin(RootDirMixin, Repository[EntityType]):
             if deleted == 0:
                 raise self._object_not_found()
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        count = 0
+        # One connection and one commit for the whole load instead of one per
+        # entity; executemany per batch keeps memory bounded.
+        with self._connect() as conn:
+            for batch in batched(entities, batch_size):
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO "{self._table}" (id, data) '
+                    f"VALUES (?, {self._data_value})",
+                    [(str(e.id), self.codec.dumps(e.asdict())) for e in batch],
+                )
+                count += len(batch)
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        if upsert:
+            return self.add_many(entities, batch_size=batch_size)
+        count = 0
+        with self._connect() as conn:
+            for batch in batched(entities, batch_size):
+                rows = []
+                for entity in batch:
+                    data = entity.asdict()
+                    rows.append(
+                        (
+                            self.codec.dumps(data),
+                            str(entity.id),
+                            data["id"],
+                        )
+                    )
+                # The stored JSON id is compared as well as the text PK, so a
+                # cross-type id doesn't match — the same rule as update().
+                count += conn.executemany(
+                    f'UPDATE "{self._table}" SET data = {self._data_value} '
+                    "WHERE id = ? AND json_extract(data, '$.id') = ?",
+                    rows,
+                ).rowcount
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        try:
+            where, params = self._where(specification)
+        except SpecificationNotMappedToSqlite:
+            matching = list(
+                filter(compile_specification(specification), self._get_entities)
+            )
+            with self._connect() as conn:
+                conn.executemany(
+                    f'DELETE FROM "{self._table}" WHERE id = ?',
+                    [(str(e.id),) for e in matching],
+                )
+            return len(matching)
+        with self._connect() as conn:
+            return conn.execute(
+                f'DELETE FROM "{self._table}" WHERE {where}', params
+            ).rowcount
+
     def is_healthy(self) -> bool:
         try:
             with self._connect() as conn:
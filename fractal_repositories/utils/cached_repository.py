@@ -1,4 +1,4 @@
-from typing import Iterator, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from fractal_specifications.generic.operators import NotSpecification
 from fractal_specifications.generic.specification import Specification
@@ -28,11 +28,40 @@ class CachedRepository(Repository[EntityType]):
         self.main_repository.remove_one(specification)
         self.cache_repository.remove_one(specification)
 
+    def add_many(self, entities: Iterable[EntityType], *, batch_size=1000) -> int:
+        entities = list(entities)
+        count = self.main_repository.add_many(entities, batch_size=batch_size)
+        self.cache_repository.add_many(entities, batch_size=batch_size)
+        return count
+
+    def update_many(
+        self, entities: Iterable[EntityType], *, upsert=False, batch_size=1000
+    ) -> int:
+        entities = list(entities)
+        count = self.main_repository.update_many(
+            entities, upsert=upsert, batch_size=batch_size
+        )
+        self.cache_repository.update_many(
+            entities, upsert=upsert, batch_size=batch_size
+        )
+        return count
+
+    def remove_many(self, specification: Optional[Specification] = None) -> int:
+        count = self.main_repository.remove_many(specification)
+        self.cache_repository.remove_many(specification)
+        return count
+
     def find_one(self, specification: Specification) -> EntityType:
         for entity in self.find(specification):
             return entity
         raise self._object_not_found()
 
+    # The cache repository chunks get_many itself.
+    get_many_chunk_size = 0
+
+    def _get_many(self, ids: List[Any]) -> Iterable[EntityType]:
+        return self.cache_repository.get_many(ids, preserve_order=False)
+
     def find(
         self,
         specification: Optional[Specification] = None,
@@ -46,6 +75,19 @@ class CachedRepository(Repository[EntityType]):
         ):
             yield entity
 
+    def _find_values(
+        self,
+        specification: Optional[Specification],
+        select: List[str],
+        *,
+        offset: int,
+        limit: int,
+        order_by: str,
+    ) -> Iterator[Dict[str, Any]]:
+        return self.cache_repository.find_values(
+            specification, select=select, offset=offset, limit=limit, order_by=order_by
+        )
+
     def load_cache(self):
         for entity in self.main_repository.find():
             self.cache_repository.add(entity)
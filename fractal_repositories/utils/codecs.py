@@ -0,0 +1,210 @@
+import json
+import math
+from typing import Any, Dict, Optional, Type, Union
+
+from fractal_repositories.exceptions import IncompatibleCodecException
+from fractal_repositories.utils.json_encoder import EnhancedEncoder
+
+# Every digit becomes "0", so a run of digits long enough to be an integer
+# outside the 64-bit range (which orjson reads as a float) is found with one
+# substring search, several times faster than a regular expression.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_NUMBER = b"0" * 19
+
+
+def _has_long_number(data: Union[str, bytes]) -> bool:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return _LONG_NUMBER in data.translate(_DIGITS_TO_ZERO)
+
+
+def _non_finite(obj: Any) -> bool:
+    """Whether ``obj`` holds a NaN or infinite float, however deeply nested."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_non_finite(value) for value in obj)
+    return False
+
+
+def _incompatible(codec: "JsonCodec", data: Union[str, bytes]):
+    text = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+    return IncompatibleCodecException(
+        f"Codec {codec.name!r} cannot read data the json codec wrote: "
+        f"{text.strip()[:120]!r}"
+    )
+
+
+def _check_unreadable(codec: "JsonCodec", data: Union[str, bytes]) -> None:
+    """Raise ``IncompatibleCodecException`` if the stdlib reads ``data``.
+
+    Called when ``codec`` failed to parse it: a line the stdlib reads (with
+    ``NaN`` or ``Infinity``, say) is stored data, not a corrupt line to skip.
+    """
+    try:
+        json.loads(data)
+    except ValueError:
+        return
+    raise _incompatible(codec, data) from None
+
+
+def _check_finite(codec: "JsonCodec", obj: Any, encoded: bytes) -> None:
+    # NaN and infinities are encoded as null; only then is the object walked.
+    if b"null" in encoded and _non_finite(obj):
+        raise ValueError(f"Codec {codec.name!r} cannot encode NaN or infinite floats")
+
+
+class JsonCodec:
+    """Serializes entity dicts to JSON text and back.
+
+    The default implementation uses the standard library with
+    ``EnhancedEncoder``. Faster codecs must produce JSON that decodes to the
+    same values, so a file or table written with one codec can be read with
+    any other. ``loads`` raises ``ValueError`` on malformed input, whatever
+    library is underneath, so callers can tell corrupt data from bugs.
+
+    ``decodes_bytes`` tells readers that ``loads`` parses UTF-8 bytes at least
+    as fast as str, so raw file contents can be passed to it undecoded.
+
+    The stdlib writes ``NaN``, ``Infinity`` and integers of any size, which
+    faster codecs cannot all read back. They raise
+    ``IncompatibleCodecException`` on data the stdlib reads but they cannot
+    (or would read differently), rather than the ``ValueError`` that marks
+    a corrupt line, and their ``dumps`` raises ``ValueError`` (or
+    ``TypeError``) on values they could not write so every codec reads them
+    back the same.
+    """
+
+    name = "json"
+    decodes_bytes = False
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, cls=EnhancedEncoder)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by ``orjson`` (``pip install orjson``)."""
+
+    name = "orjson"
+    decodes_bytes = True
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        # Datetimes and dataclasses go through EnhancedEncoder like they do
+        # with the stdlib codec, instead of orjson's own formatting.
+        self._option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        self._default = EnhancedEncoder().default
+
+    def dumps(self, obj: Any) -> str:
+        # orjson raises TypeError itself on integers beyond 64 bits.
+        encoded = self._orjson.dumps(obj, default=self._default, option=self._option)
+        _check_finite(self, obj, encoded)
+        return encoded.decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            value = self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            _check_unreadable(self, data)
+            raise
+        # orjson reads integers beyond 64 bits as floats, which may still
+        # compare equal (2**70 == 2.0**70): compare the reprs, types included.
+        if _has_long_number(data) and repr(value) != repr(json.loads(data)):
+            raise _incompatible(self, data)
+        return value
+
+
+class MsgspecCodec(JsonCodec):
+    """JSON codec backed by ``msgspec`` (``pip install msgspec``).
+
+    msgspec formats raw ``datetime``/``Decimal`` objects itself; the plain
+    values ``Model.asdict()`` produces encode the same as with the stdlib.
+    """
+
+    name = "msgspec"
+    decodes_bytes = True
+
+    def __init__(self):
+        import msgspec
+
+        self._decode_error = msgspec.DecodeError
+        self._encoder = msgspec.json.Encoder(enc_hook=EnhancedEncoder().default)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> str:
+        encoded = self._encoder.encode(obj)
+        _check_finite(self, obj, encoded)
+        return encoded.decode("utf-8")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as e:
+            _check_unreadable(self, data)
+            raise ValueError(str(e)) from e
+
+
+CODECS: Dict[str, Type[JsonCodec]] = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def get_codec(codec: Optional[Union[str, JsonCodec]] = None) -> JsonCodec:
+    """Resolve a codec instance from an instance, a registered name, or None.
+
+    Raises:
+        ValueError: If the name is not registered
+        ImportError: If the codec's library is not installed
+    """
+    if codec is None:
+        return JsonCodec()
+    if isinstance(codec, JsonCodec):
+        return codec
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown codec {codec!r}, expected one of {sorted(CODECS)}"
+        ) from None
+
+
+def check_codec(codec: JsonCodec, sample: Union[str, bytes], source: str = ""):
+    """Verify ``codec`` reads ``sample`` (stored data) like the stdlib does.
+
+    Both the decoded value and a re-encode/decode round trip must equal what
+    ``json.loads`` gives, otherwise switching codecs would change the data.
+    Samples the stdlib cannot parse either are corrupt, not incompatible, and
+    are left to the repository's own corrupt-data handling. The registered
+    codecs also check each later record they fail to read, or may misread.
+
+    Raises:
+        IncompatibleCodecException: If the codec reads the sample differently
+    """
+    try:
+        expected = json.loads(sample)
+    except ValueError:
+        return
+    try:
+        compatible = (
+            codec.loads(sample) == expected
+            and codec.loads(codec.dumps(expected)) == expected
+        )
+    except (TypeError, ValueError):
+        compatible = False
+    if not compatible:
+        raise IncompatibleCodecException(
+            f"Codec {codec.name!r} cannot round-trip the data stored in {source}"
+        )
@@ -0,0 +1,168 @@
+import gzip
+import logging
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
+
+logger = logging.getLogger(__name__)
+
+# Starts every block. 0xF5 never occurs in UTF-8, so no JSON-lines file can
+# start with it and a reader tells the formats apart from the first bytes.
+BLOCK_MAGIC = b"\xf5BLK"
+
+# Magic, compressor id, payload length, CRC-32 of the (compressed) payload.
+_HEADER = struct.Struct(">4sBII")
+
+
+class Compressor:
+    """Compresses the blocks of a block-compressed file with gzip (stdlib).
+
+    Every block records the ``id`` of the compressor that wrote it, so a file
+    can be read whatever compressor the reader is configured with.
+    """
+
+    name = "gzip"
+    id = 1
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # mtime=0 so the same data always compresses to the same bytes.
+        return gzip.compress(data, self.level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """Block compressor backed by ``zstandard`` (``pip install zstandard``)."""
+
+    name = "zstd"
+    id = 2
+
+    def __init__(self, level: int = 3):
+        import zstandard
+
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+COMPRESSORS: Dict[str, Type[Compressor]] = {
+    Compressor.name: Compressor,
+    ZstdCompressor.name: ZstdCompressor,
+}
+
+# Decompressors by block id, created on first use.
+_decompressors: Dict[int, Compressor] = {}
+
+
+def get_compressor(compressor: Union[str, Compressor]) -> Compressor:
+    """Resolve a compressor instance from an instance or a registered name.
+
+    Raises:
+        ValueError: If the name is not registered
+        ImportError: If the compressor's library is not installed
+    """
+    if isinstance(compressor, Compressor):
+        return compressor
+    try:
+        return COMPRESSORS[compressor]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown compression {compressor!r}, expected one of {sorted(COMPRESSORS)}"
+        ) from None
+
+
+def pack_block(data: bytes, compressor: Compressor) -> bytes:
+    """``data`` compressed into one self-describing block."""
+    payload = compressor.compress(data)
+    header = _HEADER.pack(BLOCK_MAGIC, compressor.id, len(payload), zlib.crc32(payload))
+    return header + payload
+
+
+def _decompress(compressor_id: int, payload: bytes) -> Optional[bytes]:
+    decompressor = _decompressors.get(compressor_id)
+    if decompressor is None:
+        for cls in COMPRESSORS.values():
+            if cls.id == compressor_id:
+                decompressor = _decompressors[compressor_id] = cls()
+                break
+        else:
+            return None
+    try:
+        return decompressor.decompress(payload)
+    except Exception:  # each library raises its own error type
+        return None
+
+
+def read_blocks(fp, offset: int = 0) -> Iterator[Tuple[int, int, Optional[bytes]]]:
+    """Yield ``(offset, length, data)`` for the blocks of a binary file object.
+
+    ``data`` is the decompressed block, or None for a damaged span (a torn
+    write followed by later appends, a checksum mismatch); reading resumes at
+    the next block after it, like a reader skips a malformed line. Stops
+    before an incomplete block at the end of the file, which may still be
+    being written.
+    """
+    fp.seek(offset)
+    while True:
+        header = fp.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        magic, compressor_id, length, crc = _HEADER.unpack(header)
+        if magic == BLOCK_MAGIC:
+            payload = fp.read(length)
+            if len(payload) < length:
+                return
+            if zlib.crc32(payload) == crc:
+                data = _decompress(compressor_id, payload)
+                if data is not None:
+                    yield offset, _HEADER.size + length, data
+                    offset += _HEADER.size + length
+                    continue
+        # Damaged: skip to the next block, or to the end of the file.
+        fp.seek(offset + 1)
+        rest = fp.read()
+        found = rest.find(BLOCK_MAGIC)
+        length = 1 + (found if found >= 0 else len(rest))
+        logger.warning("Skipping %d damaged bytes at offset %d", length, offset)
+        yield offset, length, None
+        offset += length
+        fp.seek(offset)
+
+
+def block_lines(data: bytes) -> List[bytes]:
+    """The lines (without line breaks) of a block of JSON lines."""
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()  # after the block's last line break
+    return lines
+
+
+def unpack_blocks(data: bytes) -> Optional[bytes]:
+    """The concatenated contents of ``data`` if it is a complete block file."""
+    if data[: len(BLOCK_MAGIC)] != BLOCK_MAGIC:
+        return None
+    chunks, offset = [], 0
+    while offset < len(data):
+        header = data[offset : offset + _HEADER.size]
+        if len(header) < _HEADER.size:
+            return None
+        magic, compressor_id, length, crc = _HEADER.unpack(header)
+        payload = data[offset + _HEADER.size : offset + _HEADER.size + length]
+        if magic != BLOCK_MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+            return None
+        chunk = _decompress(compressor_id, payload)
+        if chunk is None:
+            return None
+        chunks.append(chunk)
+        offset += _HEADER.size + length
+    return b"".join(chunks)
@@ -195,6 +195,44 @@ class FieldPermissionsRepository(Repository[EntityType]):
             self._apply_read_mask(e, self._field_permissions, roles) for e in results
         ]
 
+    def find_values(
+        self,
+        specification=None,
+        *,
+        select,
+        offset=0,
+        limit=0,
+        order_by="",
+        roles=None,
+    ):
+        """
+        Find only some fields of the matching entities, optionally masking restricted ones.
+
+        Args:
+            specification: Filter criteria for the query.
+            select: Names of the entity fields to return.
+            offset: Number of results to skip.
+            limit: Maximum number of results to return (0 = unlimited).
+            order_by: Field name to sort by.
+            roles: Caller's roles. Pass ``None`` to skip masking (internal use).
+
+        Returns:
+            An iterator or list of ``{field: value}`` dicts, with unreadable fields
+            set to None when roles are provided.
+        """
+        results = self._inner.find_values(
+            specification, select=select, offset=offset, limit=limit, order_by=order_by
+        )
+        if roles is None:
+            return results
+        hidden = [
+            field
+            for field, perms in self._field_permissions.items()
+            if perms.get("read_roles") is not None
+            and not any(role in perms["read_roles"] for role in roles)
+        ]
+        return [{**row, **{f: None for f in hidden if f in row}} for row in results]
+
     def count(self, specification=None):
         """
         Count entities matching the specification. Delegates directly to the inner repository.
@@ -225,6 +263,24 @@ class FieldPermissionsRepository(Repository[EntityType]):
         """
         return self.find_one(EqualsSpecification("id", id))
 
+    def get_many(self, ids, *, preserve_order=True, missing="skip"):
+        """
+        Find multiple entities by ID without read masking.
+
+        Delegates to the inner repository's ``get_many`` in one call, like
+        ``get`` this skips masking. Use ``find`` with ``roles`` if masking is
+        required.
+
+        Args:
+            ids: The entity IDs to look up.
+            preserve_order: Return results in the order of ``ids``.
+            missing: ``"skip"``, ``"raise"`` or ``"none"`` for ids that don't exist.
+
+        Returns:
+            The matching entities.
+        """
+        return self._inner.get_many(ids, preserve_order=preserve_order, missing=missing)
+
     def add(self, entity: EntityType, *, roles=None) -> EntityType:
         """
         Add a new entity, optionally enforcing write permissions.
@@ -0,0 +1,118 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from fractal_repositories.utils.compression import block_lines, read_blocks
+
+
+class FileTail(ABC):
+    """Follows a JSON-lines file that is appended to or atomically replaced.
+
+    ``sync`` compares the file's inode, size and mtime with what was read
+    before, and checks the last line read is still in place. An append is
+    read from where the last sync stopped; anything else (an atomic rewrite,
+    a truncation, an in-place edit) resets the state and reads the file again
+    from the start. Filesystems reuse inode numbers, so a rewrite can look
+    like an append that kept the last line by chance; writers that know they
+    rewrote the file call ``invalidate``.
+
+    Subclasses keep their state in ``_reset`` and take each complete
+    (newline-terminated) line in ``_add``; an unterminated last line, torn or
+    still being written, is left in ``partial`` and read as a complete line
+    once it is.
+
+    With ``blocks`` the file is block-compressed (see ``utils.compression``):
+    it is read a complete block at a time and ``_add_block`` gets each one,
+    by default handing its lines to ``_add``. An incomplete last block is
+    left for a later sync, like an unterminated line.
+    """
+
+    # Bytes from the end of the last block read that ``sync`` checks.
+    _BLOCK_CHECK = 64
+
+    def __init__(self, path: str, *, blocks: bool = False):
+        self.path = path
+        self.blocks = blocks
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # Byte offset just past the last complete line read.
+        self._end = 0
+        # Complete lines read, so the number of the line ``_add`` gets.
+        self.lines = 0
+        self.partial = b""
+        self._last_line = b""
+
+    def invalidate(self) -> None:
+        """Forget what was read, so the next ``sync`` reads the whole file."""
+        self._signature = None
+        self._reset()
+
+    @abstractmethod
+    def _add(self, offset: int, line: bytes) -> None:
+        """Take complete line number ``lines``, found at byte ``offset`` (with
+        ``blocks``, the offset of its block)."""
+        raise NotImplementedError
+
+    def _add_block(self, offset: int, length: int, lines: List[bytes]) -> None:
+        for line in lines:
+            self.lines += 1
+            self._add(offset, line)
+
+    def sync(self) -> bool:
+        """Bring the state up to date with the file; True if it was reset."""
+        try:
+            fp = open(self.path, "rb")
+        except FileNotFoundError:
+            reset = self._signature is not None
+            self._signature = None
+            self._reset()
+            return reset
+        with fp:
+            # From the open file, so a concurrent replace cannot slip in
+            # between the check and the read.
+            stat = os.fstat(fp.fileno())
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if signature == self._signature:
+                return False
+            reset = (
+                self._signature is None
+                or stat.st_ino != self._signature[0]
+                or stat.st_size <= self._signature[1]
+            )
+            if not reset and self._end:
+                # Appends leave the lines already read as they were.
+                fp.seek(self._end - len(self._last_line))
+                reset = fp.read(len(self._last_line)) != self._last_line
+            if reset:
+                self._reset()
+            self._read(fp)
+        self._signature = signature
+        return reset
+
+    def _read(self, fp) -> None:
+        if self.blocks:
+            self._read_blocks(fp)
+            return
+        fp.seek(self._end)
+        offset = self._end
+        self.partial = b""
+        for line in fp:
+            if not line.endswith(b"\n"):
+                self.partial = line
+                break
+            self.lines += 1
+            self._add(offset, line)
+            offset += len(line)
+            self._last_line = line
+        self._end = offset
+
+    def _read_blocks(self, fp) -> None:
+        for offset, length, data in read_blocks(fp, self._end):
+            if data is not None:
+                self._add_block(offset, length, block_lines(data))
+            self._end = offset + length
+        if self._end:
+            fp.seek(max(self._end - self._BLOCK_CHECK, 0))
+            self._last_line = fp.read(self._end - fp.tell())
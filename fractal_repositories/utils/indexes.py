@@ -0,0 +1,375 @@
+import bisect
+import itertools
+from operator import itemgetter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from fractal_specifications.generic.collections import (
+    AndSpecification,
+    OrSpecification,
+)
+from fractal_specifications.generic.operators import (
+    EqualsSpecification,
+    FieldValueSpecification,
+    GreaterThanEqualSpecification,
+    GreaterThanSpecification,
+    InSpecification,
+    LessThanEqualSpecification,
+    LessThanSpecification,
+)
+from fractal_specifications.generic.specification import Specification
+
+IndexDeclaration = Union[str, Sequence[str]]
+
+# Every FieldValueSpecification shares this default; an index can only answer
+# specifications that compare the raw field value.
+_IDENTITY = FieldValueSpecification.__init__.__defaults__[-1]  # type: ignore[index]
+
+
+def _field_value(entity: Any, field: str) -> Any:
+    # Same lookup as fractal_specifications, so "a.b" and "a__b" index the
+    # value a specification on that field compares.
+    separator = "__" if "__" in field else "."
+    for name in field.split(separator):
+        entity = getattr(entity, name)
+    return entity
+
+
+def _equality_values(specification: Specification) -> Optional[Tuple[str, List]]:
+    """The field and candidate values of an equality or ``in`` specification."""
+    if getattr(specification, "pre_processor", None) is not _IDENTITY:
+        return None
+    if type(specification) is EqualsSpecification:
+        return specification.field, [specification.value]
+    if type(specification) is InSpecification:
+        return specification.field, list(specification.value)
+    return None
+
+
+class HashIndex:
+    """Maps the values of one or more fields to the ids of matching entities.
+
+    Entities whose indexed fields are missing or unhashable are kept aside and
+    returned by every lookup, so a lookup always yields a superset of the
+    matches; callers re-check the full specification on the candidates.
+    """
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        self._buckets: Dict[Tuple, Dict[Any, None]] = {}
+        self._keys: Dict[Any, Optional[Tuple]] = {}
+        self._unindexed: Dict[Any, None] = {}
+
+    def _key(self, entity: Any) -> Optional[Tuple]:
+        try:
+            key = tuple(_field_value(entity, field) for field in self.fields)
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def add(self, id: Any, entity: Any) -> None:
+        key = self._key(entity)
+        self._keys[id] = key
+        if key is None:
+            self._unindexed[id] = None
+        else:
+            self._buckets.setdefault(key, {})[id] = None
+
+    def remove(self, id: Any) -> None:
+        key = self._keys.pop(id)
+        if key is None:
+            del self._unindexed[id]
+            return
+        bucket = self._buckets[key]
+        del bucket[id]
+        if not bucket:
+            del self._buckets[key]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._keys.clear()
+        self._unindexed.clear()
+
+    def lookup(self, values: Sequence[Sequence[Any]]) -> Optional[List[Any]]:
+        """Ids whose fields may equal one of ``values`` (one list per field).
+
+        Returns None if a value is unhashable and so cannot be looked up.
+        """
+        ids: List[Any] = list(self._unindexed)
+        try:
+            for key in itertools.product(*values):
+                ids.extend(self._buckets.get(key, ()))
+        except TypeError:
+            return None
+        return ids
+
+
+# Range operator → (bound side, inclusive).
+_RANGE_BOUNDS: Dict[type, Tuple[str, bool]] = {
+    GreaterThanSpecification: ("lower", False),
+    GreaterThanEqualSpecification: ("lower", True),
+    LessThanSpecification: ("upper", False),
+    LessThanEqualSpecification: ("upper", True),
+}
+
+Bound = Tuple[Any, bool]
+
+
+def _range_bound(specification: Specification) -> Optional[Tuple[str, str, Bound]]:
+    """The field, side and (value, inclusive) bound of a range specification."""
+    if not isinstance(specification, FieldValueSpecification):
+        return None
+    bound = _RANGE_BOUNDS.get(type(specification))
+    if bound is None or specification.pre_processor is not _IDENTITY:
+        return None
+    side, inclusive = bound
+    return specification.field, side, (specification.value, inclusive)
+
+
+_first = itemgetter(0)
+
+
+class SortedIndex:
+    """Keeps the ids of entities sorted by the value of one field.
+
+    Backed by a bisect-maintained list of ``(value, id)`` pairs, so range
+    lookups are two binary searches and walking the list yields entities in
+    ``order_by`` order, ties by id, without sorting. Entities whose value is
+    missing, ``None``, NaN or not comparable with the others are kept aside:
+    range lookups always include them, and ``ordered`` is unavailable while
+    there are any (sorting them would fail in a scan, too).
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._entries: List[Tuple[Any, Any]] = []
+        self._keys: Dict[Any, Optional[Any]] = {}
+        self._unindexed: Dict[Any, None] = {}
+
+    def add(self, id: Any, entity: Any) -> None:
+        try:
+            value = _field_value(entity, self.field)
+            if value is None or value != value:
+                raise TypeError
+            bisect.insort(self._entries, (value, id))
+        except (AttributeError, TypeError):
+            self._keys[id] = None
+            self._unindexed[id] = None
+            return
+        self._keys[id] = value
+
+    def remove(self, id: Any) -> None:
+        value = self._keys.pop(id)
+        if value is None:
+            del self._unindexed[id]
+            return
+        del self._entries[bisect.bisect_left(self._entries, (value, id))]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+        self._unindexed.clear()
+
+    def range(self, lower: Optional[Bound], upper: Optional[Bound]) -> List[Any]:
+        """Ids whose value lies between the bounds; each is ``(value, inclusive)``."""
+        start, end = 0, len(self._entries)
+        if lower is not None:
+            value, inclusive = lower
+            search = bisect.bisect_left if inclusive else bisect.bisect_right
+            start = search(self._entries, value, key=_first)
+        if upper is not None:
+            value, inclusive = upper
+            search = bisect.bisect_right if inclusive else bisect.bisect_left
+            end = search(self._entries, value, key=_first)
+        return list(self._unindexed) + [id for _, id in self._entries[start:end]]
+
+    def ordered(self, reverse: bool = False) -> Optional[Iterator[Any]]:
+        """Ids by value (descending if ``reverse``), ties by id ascending.
+
+        Returns None while some entity could not be indexed.
+        """
+        if self._unindexed:
+            return None
+        if not reverse:
+            return (id for _, id in self._entries)
+        return self._descending()
+
+    def _descending(self) -> Iterator[Any]:
+        # Walk backwards one run of equal values at a time, emitting each run
+        # forwards so ties stay in id order.
+        end = len(self._entries)
+        while end:
+            start = bisect.bisect_left(
+                self._entries, self._entries[end - 1][0], hi=end, key=_first
+            )
+            for _, id in self._entries[start:end]:
+                yield id
+            end = start
+
+
+class IndexedEntities(Dict[Any, Any]):
+    """The id → entity dict of ``InMemoryRepositoryMixin``, with secondary indexes.
+
+    Every mutation keeps the declared ``HashIndex``es and ``SortedIndex``es
+    current, and ``plan`` turns a specification into the candidate ids an
+    index can answer it with.
+    Candidates come back in dict order, so indexed queries return entities in
+    exactly the order a full scan would.
+
+    Entities mutated in place must be stored again (``update``) for the
+    indexes to see the new field values.
+    """
+
+    def __init__(
+        self,
+        indexes: Iterable[IndexDeclaration] = (),
+        data=(),
+        sorted_indexes: Iterable[str] = (),
+    ):
+        super().__init__()
+        self.indexes: Dict[Tuple[str, ...], HashIndex] = {}
+        for declaration in indexes:
+            fields = (declaration,) if isinstance(declaration, str) else declaration
+            self.indexes[tuple(fields)] = HashIndex(tuple(fields))
+        self.sorted_indexes: Dict[str, SortedIndex] = {
+            field: SortedIndex(field) for field in sorted_indexes
+        }
+        # Insertion sequence per id, matching the dict's own iteration order.
+        self._sequence: Dict[Any, int] = {}
+        self._counter = itertools.count()
+        self.update(data)
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so copies and pickles get fresh indexes.
+        return self.__class__, (
+            list(self.indexes),
+            dict(self),
+            list(self.sorted_indexes),
+        )
+
+    def __setitem__(self, id, entity) -> None:
+        if id in self:
+            for index in self._all_indexes():
+                index.remove(id)
+        else:
+            self._sequence[id] = next(self._counter)
+        super().__setitem__(id, entity)
+        for index in self._all_indexes():
+            index.add(id, entity)
+
+    def __delitem__(self, id) -> None:
+        super().__delitem__(id)
+        del self._sequence[id]
+        for index in self._all_indexes():
+            index.remove(id)
+
+    _MISSING = object()
+
+    def pop(self, id, default=_MISSING):
+        if id not in self:
+            if default is self._MISSING:
+                raise KeyError(id)
+            return default
+        entity = self[id]
+        del self[id]
+        return entity
+
+    def popitem(self):
+        id, entity = next(reversed(self.items()))
+        del self[id]
+        return id, entity
+
+    def setdefault(self, id, default=None):
+        if id not in self:
+            self[id] = default
+        return self[id]
+
+    def update(self, *args, **kwargs) -> None:
+        for id, entity in dict(*args, **kwargs).items():
+            self[id] = entity
+
+    def clear(self) -> None:
+        super().clear()
+        self._sequence.clear()
+        for index in self._all_indexes():
+            index.clear()
+
+    def _all_indexes(self) -> List[Union[HashIndex, SortedIndex]]:
+        return [*self.indexes.values(), *self.sorted_indexes.values()]
+
+    def ordered(self, order_by: str) -> Optional[Iterator[Any]]:
+        """Ids in ``order_by`` order from a sorted index, or None if there is none."""
+        reverse = order_by.startswith("-")
+        index = self.sorted_indexes.get(order_by[1:] if reverse else order_by)
+        return index.ordered(reverse) if index else None
+
+    def plan(self, specification: Specification) -> Optional[List[Any]]:
+        """Candidate ids for ``specification``, or None if it needs a full scan.
+
+        ``id`` equality and ``in`` are answered by the dict itself, other
+        equality and ``in`` specifications by a declared hash index, and
+        ``<``/``<=``/``>``/``>=`` by a declared sorted index. The
+        candidates are a superset of the matches; the caller still filters
+        them with the specification.
+        """
+        try:
+            ids = self._plan(specification)
+        except TypeError:
+            # An unhashable value, which a scan compares with == instead.
+            return None
+        if ids is None:
+            return None
+        return sorted(dict.fromkeys(ids), key=self._sequence.__getitem__)
+
+    def _plan(self, specification: Specification) -> Optional[List[Any]]:
+        if isinstance(specification, OrSpecification):
+            ids: List[Any] = []
+            for child in specification.specifications:
+                child_ids = self._plan(child)
+                if child_ids is None:
+                    return None
+                ids.extend(child_ids)
+            return ids
+
+        children = (
+            specification.specifications
+            if isinstance(specification, AndSpecification)
+            else [specification]
+        )
+        constraints: Dict[str, List] = {}
+        for child in children:
+            if equality := _equality_values(child):
+                field, values = equality
+                constraints.setdefault(field, values)
+        if "id" in constraints:
+            return [id for id in constraints["id"] if id in self]
+        # The index covering the most constrained fields is the most selective.
+        for fields in sorted(self.indexes, key=len, reverse=True):
+            if all(field in constraints for field in fields):
+                return self.indexes[fields].lookup([constraints[f] for f in fields])
+        bounds: Dict[str, Dict[str, Bound]] = {}
+        for child in children:
+            if (bound := _range_bound(child)) and bound[0] in self.sorted_indexes:
+                field, side, value = bound
+                bounds.setdefault(field, {}).setdefault(side, value)
+        if bounds:
+            field, sides = next(iter(bounds.items()))
+            return self.sorted_indexes[field].range(
+                sides.get("lower"), sides.get("upper")
+            )
+        if isinstance(specification, AndSpecification):
+            for child in children:
+                child_ids = self._plan(child)
+                if child_ids is not None:
+                    return child_ids
+        return None
@@ -0,0 +1,36 @@
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of at most ``size`` items from ``iterable``.
+
+    Consumes the iterable lazily, so a generator of millions of entities is
+    never materialized at once. A ``size`` below 1 yields everything as a single
+    batch.
+
+    Example:
+        list(batched(range(5), 2))  # [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    if size < 1:
+        if batch := list(iterator):
+            yield batch
+        return
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def last_by_key(iterable: Iterable[T], key: Callable[[T], Any]) -> List[T]:
+    """The last item for each distinct ``key``, at that key's first position.
+
+    Bulk writes use it to send each id once where the store rejects (or
+    keeps the first of) repeated ids in one statement, while the last entity
+    given for an id is still the one stored, as with repeated single writes.
+
+    Example:
+        last_by_key(["a1", "b1", "a2"], key=lambda s: s[0])  # ["a2", "b1"]
+    """
+    return list({key(item): item for item in iterable}.values())
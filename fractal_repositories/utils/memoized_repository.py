@@ -8,12 +8,15 @@ class MemoizedRepository(Repository[EntityType]):
     find_one() results are stored in a per-instance dict keyed by entity.id.
     A secondary _spec_index (spec → entity.id) allows repeated find_one(spec)
     calls to be served from cache without hitting the inner repository.
+    get_many() serves cached ids from the same dict and fetches the rest from
+    the inner repository in a single get_many() call.
 
     Mutations update or evict only the cache entry for the mutated entity;
-    unrelated entries remain cached.
+    unrelated entries remain cached. remove_many() is the exception: the
+    removed ids aren't known, so it clears the whole cache.
 
-    find(), count(), and is_healthy() always delegate directly to the
-    inner repository without caching.
+    find(), find_values(), count(), and is_healthy() always delegate directly
+    to the inner repository without caching.
     """
 
     def __init__(self, inner: Repository[EntityType]):
@@ -36,11 +39,29 @@ class MemoizedRepository(Repository[EntityType]):
         self._spec_index[specification] = entity.id
         return entity
 
+    # The inner repository chunks get_many itself.
+    get_many_chunk_size = 0
+
+    def _get_many(self, ids):
+        cached = [self._cache[id] for id in ids if id in self._cache]
+        uncached = [id for id in ids if id not in self._cache]
+        fetched = (
+            self._inner.get_many(uncached, preserve_order=False) if uncached else []
+        )
+        for entity in fetched:
+            self._cache[entity.id] = entity
+        return cached + fetched
+
     def find(self, specification=None, *, offset=0, limit=0, order_by=""):
         return self._inner.find(
             specification, offset=offset, limit=limit, order_by=order_by
         )
 
+    def _find_values(self, specification, select, *, offset, limit, order_by):
+        return self._inner.find_values(
+            specification, select=select, offset=offset, limit=limit, order_by=order_by
+        )
+
     def count(self, specification=None):
         return self._inner.count(specification)
 
@@ -57,6 +78,18 @@ class MemoizedRepository(Repository[EntityType]):
         self._cache[entity.id] = result  # update in place; spec_index stays valid
         return result
 
+    def add_many(self, entities, *, batch_size=1000):
+        return self._inner.add_many(entities, batch_size=batch_size)
+
+    def update_many(self, entities, *, upsert=False, batch_size=1000):
+        entities = list(entities)
+        count = self._inner.update_many(entities, upsert=upsert, batch_size=batch_size)
+        # Which entities were skipped as missing isn't reported, so evict
+        # rather than overwrite; the next find_one reloads from the inner repo.
+        for entity in entities:
+            self._cache.pop(entity.id, None)
+        return count
+
     def invalidate(self, entity_id: str) -> None:
         """Remove a single entry from the in-process cache by entity ID.
 
@@ -78,3 +111,10 @@ class MemoizedRepository(Repository[EntityType]):
         if entity_id is not None:
             self._cache.pop(entity_id, None)
             # Stale _spec_index entries pointing to entity_id are cleaned up lazily.
+
+    def remove_many(self, specification=None):
+        count = self._inner.remove_many(specification)
+        # The removed ids aren't known without an extra query; drop the cache.
+        self._cache.clear()
+        self._spec_index.clear()
+        return count
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fractal_repositories.utils.compression import block_lines, read_blocks
+from fractal_repositories.utils.file_tail import FileTail
+
+logger = logging.getLogger(__name__)
+
+# Parses one stripped line into ``(deleted, id)``, or None if it is corrupt.
+RecordParser = Callable[[bytes], Optional[Tuple[bool, Any]]]
+
+
+def _read_line(fp, offset: int, length: int) -> bytes:
+    """The line at ``offset``, stripped of whitespace and null bytes."""
+    fp.seek(offset)
+    return fp.read(length).strip().replace(b"\x00", b"")
+
+
+class OffsetIndex(FileTail):
+    """Maps entity ids to the byte range of their line in a JSON-lines file.
+
+    The file is read in binary and only complete (newline-terminated) lines
+    are indexed; lines ``parse`` rejects are skipped, like the repository's
+    own reader skips them. ``sync`` follows the file as ``FileTail`` does:
+    appends are indexed from where the last sync stopped, anything else
+    rebuilds the index from the start.
+
+    With ``last_wins`` a later line for an id replaces the earlier one and a
+    tombstone removes it (the log-structured format); otherwise the first line
+    for an id is the one a scan finds first.
+
+    With ``blocks`` (a block-compressed file) an id maps to its block and its
+    line in it, so a lookup decompresses only the blocks holding the ids.
+
+    With ``persist`` the index is saved beside the file as ``<file>.idx`` after
+    a rebuild and every ``save_interval`` indexed lines, and loaded on
+    construction, so opening a large file only indexes the lines appended
+    since the last save.
+    """
+
+    save_interval = 1000
+    _VERSION = 3
+
+    def __init__(
+        self,
+        path: str,
+        parse: RecordParser,
+        *,
+        last_wins: bool = False,
+        persist: bool = False,
+        blocks: bool = False,
+    ):
+        super(OffsetIndex, self).__init__(path, blocks=blocks)
+        self.parse = parse
+        self.last_wins = last_wins
+        self.persist = persist
+        if persist:
+            self._load()
+
+    def _reset(self) -> None:
+        super(OffsetIndex, self)._reset()
+        # ``(offset, length)`` of the line, or of the block and the line's
+        # number in it.
+        self.offsets: Dict[Any, Tuple[int, ...]] = {}
+        # Entity lines indexed, duplicates included (what a scan would count),
+        # and all the valid lines, tombstones included.
+        self.entries = 0
+        self.records = 0
+        self._unsaved = 0
+
+    @property
+    def index_path(self) -> str:
+        return self.path + ".idx"
+
+    @property
+    def count(self) -> int:
+        """The number of entities a full read of the file yields."""
+        return len(self.offsets) if self.last_wins else self.entries
+
+    def sync(self) -> bool:
+        rebuilt = super(OffsetIndex, self).sync()
+        if self.persist and (rebuilt or self._unsaved >= self.save_interval):
+            self.save()
+        return rebuilt
+
+    def _add(self, offset: int, line: bytes) -> None:
+        self._index(line, (offset, len(line)))
+
+    def _add_block(self, offset: int, length: int, lines: List[bytes]) -> None:
+        for number, line in enumerate(lines):
+            self.lines += 1
+            self._index(line, (offset, length, number))
+
+    def _index(self, line: bytes, span: Tuple[int, ...]) -> None:
+        raw = line.strip().replace(b"\x00", b"")
+        if not raw:
+            return
+        record = self.parse(raw)
+        if record is None:
+            return
+        deleted, id = record
+        self._unsaved += 1
+        self.records += 1
+        if deleted:
+            self.offsets.pop(id, None)
+            return
+        self.entries += 1
+        if self.last_wins:
+            self.offsets.pop(id, None)
+            self.offsets[id] = span
+        else:
+            self.offsets.setdefault(id, span)
+
+    def read(self, ids: Iterable[Any]) -> List[bytes]:
+        """The stored lines of ``ids`` in file order; unknown ids are left out."""
+        spans = sorted({self.offsets[id] for id in ids if id in self.offsets})
+        if not spans:
+            return []
+        with open(self.path, "rb") as fp:
+            if not self.blocks:
+                return [_read_line(fp, offset, length) for offset, length in spans]
+            lines: List[bytes] = []
+            block: Tuple[int, List[bytes]] = (-1, [])
+            for offset, _, number in spans:
+                if block[0] != offset:
+                    # Sorted, so each block is decompressed once.
+                    data = next(read_blocks(fp, offset), (0, 0, None))[2] or b""
+                    block = (offset, block_lines(data))
+                if number < len(block[1]):
+                    lines.append(block[1][number].strip().replace(b"\x00", b""))
+            return lines
+
+    def save(self) -> None:
+        """Write the index to ``index_path``, atomically."""
+        if self._signature is None:
+            return
+        state = {
+            "version": self._VERSION,
+            "signature": self._signature,
+            "end": self._end,
+            "lines": self.lines,
+            "last_line": self._last_line.decode("latin-1"),
+            "entries": self.entries,
+            "records": self.records,
+            "blocks": self.blocks,
+            "offsets": [[id, *span] for id, span in self.offsets.items()],
+        }
+        directory = os.path.dirname(self.index_path)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(state, fp)
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fp:
+                state = json.load(fp)
+            if state["version"] != self._VERSION:
+                return
+            if state.get("blocks", False) != self.blocks:
+                return  # the file was rewritten in the other format
+            offsets = {id: tuple(span) for id, *span in state["offsets"]}
+            signature = tuple(state["signature"])
+            end, lines, entries = state["end"], state["lines"], state["entries"]
+            records = state["records"]
+            last_line = state["last_line"].encode("latin-1")
+        except FileNotFoundError:
+            return
+        except (KeyError, TypeError, ValueError) as exc:
+            # Only a cache: a damaged one is rebuilt from the file.
+            logger.warning("Ignoring unreadable index %s: %s", self.index_path, exc)
+            return
+        self.offsets, self.entries, self.records = offsets, entries, records
+        self._end, self.lines, self._last_line = end, lines, last_line
+        self._signature = signature  # type: ignore[assignment]
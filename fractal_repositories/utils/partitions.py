@@ -0,0 +1,146 @@
+import json
+import operator
+import types
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+from urllib.parse import quote, unquote
+from uuid import UUID
+
+from fractal_specifications.generic.collections import (
+    AndSpecification,
+    OrSpecification,
+)
+from fractal_specifications.generic.specification import Specification
+
+from fractal_repositories.core.entity import _serialize
+from fractal_repositories.utils.indexes import _equality_values, _range_bound
+
+PartitionPredicate = Callable[[Any], bool]
+
+# Field types whose stored (JSON) values compare like the values themselves,
+# so a partition's stored value can be tested against a specification.
+# Not datetime (offsets) or Decimal (stored as a string).
+_PRUNABLE_TYPES = (str, int, float, date, UUID, Enum)
+
+
+def segment_name(value: Any) -> str:
+    """The file name (without extension) of the partition holding ``value``.
+
+    ``value`` is a stored (JSON) value. Strings are used as they are, with
+    anything but letters, digits and ``-_.~`` percent-encoded; other values
+    are their JSON behind an ``=``, which no encoded string starts with.
+    """
+    if isinstance(value, str):
+        return quote(value, safe="-_.~")
+    return "=" + quote(json.dumps(value, sort_keys=True), safe="")
+
+
+def segment_value(name: str) -> Any:
+    """The stored value a ``segment_name`` was made from."""
+    if name.startswith("="):
+        return json.loads(unquote(name[1:]))
+    return unquote(name)
+
+
+def hash_segment(id: Any, partitions: int) -> str:
+    """The name of the hash partition, out of ``partitions``, holding ``id``."""
+    if isinstance(id, float) and id.is_integer():
+        id = int(id)  # 1.0 and 1 are the same key, as in a dict
+    digest = zlib.crc32(json.dumps(id, sort_keys=True).encode("utf-8"))
+    return f"{digest % partitions:0{len(str(partitions - 1))}d}"
+
+
+def prunable_field(entity_class: Any, field: str) -> bool:
+    """Whether partitions on ``field`` can be pruned by comparing stored values."""
+    try:
+        field_type = get_type_hints(entity_class).get(field)
+    except (NameError, TypeError):
+        return False
+    if get_origin(field_type) in (Union, types.UnionType):
+        args = [arg for arg in get_args(field_type) if arg is not type(None)]
+        field_type = args[0] if len(args) == 1 else None
+    return (
+        isinstance(field_type, type)
+        and not issubclass(field_type, datetime)
+        and issubclass(field_type, _PRUNABLE_TYPES)
+    )
+
+
+def stored_values(specification: Specification, field: str) -> Optional[List[Any]]:
+    """The stored values ``field`` must have for ``specification`` to match.
+
+    Returns None unless the specification (or a child of an ``and``) is an
+    equality or ``in`` on ``field``.
+    """
+    children = (
+        specification.specifications
+        if isinstance(specification, AndSpecification)
+        else [specification]
+    )
+    for child in children:
+        equality = _equality_values(child)
+        if equality and equality[0] == field:
+            return [_serialize(value) for value in equality[1]]
+    return None
+
+
+_RANGE_OPERATORS = {
+    ("lower", True): operator.ge,
+    ("lower", False): operator.gt,
+    ("upper", True): operator.le,
+    ("upper", False): operator.lt,
+}
+
+
+def partition_predicate(
+    specification: Specification, field: str
+) -> Optional[PartitionPredicate]:
+    """A test on a partition's stored value: False if no entity in it can match.
+
+    Understands equality, ``in`` and range specifications on ``field`` and
+    ``and``/``or`` combinations of them; returns None if ``specification``
+    does not constrain ``field`` that way. Values that cannot be compared
+    keep the partition.
+    """
+    if isinstance(specification, OrSpecification):
+        alternatives = [
+            partition_predicate(child, field) for child in specification.specifications
+        ]
+        if not alternatives or any(p is None for p in alternatives):
+            return None
+        return lambda value: any(p(value) for p in alternatives)  # type: ignore[misc]
+    if isinstance(specification, AndSpecification):
+        constraints = [
+            p
+            for child in specification.specifications
+            if (p := partition_predicate(child, field)) is not None
+        ]
+        if not constraints:
+            return None
+        return lambda value: all(p(value) for p in constraints)
+    if (values := stored_values(specification, field)) is not None:
+        return lambda value: value in values
+    bound = _range_bound(specification)
+    if bound is None or bound[0] != field:
+        return None
+    _, side, (limit, inclusive) = bound
+    compare, limit = _RANGE_OPERATORS[side, inclusive], _serialize(limit)
+
+    def in_range(value: Any) -> bool:
+        try:
+            return compare(value, limit)
+        except TypeError:
+            return True
+
+    return in_range
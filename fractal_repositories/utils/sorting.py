@@ -0,0 +1,76 @@
+import heapq
+from typing import Any, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class _Descending:
+    """Sort key ordering by ``value`` descending, ties by ``id`` ascending."""
+
+    __slots__ = ("value", "id")
+
+    def __init__(self, value, id):
+        self.value = value
+        self.id = id
+
+    def __lt__(self, other: "_Descending") -> bool:
+        if self.value == other.value:
+            return self.id < other.id
+        return self.value > other.value
+
+
+def order_entities(
+    entities: Iterable[T],
+    order_by: str,
+    *,
+    offset: int = 0,
+    limit: int = 0,
+    value: Callable[[T, str], Any] = getattr,
+) -> List[T]:
+    """
+    Order entities like the repositories' ``find`` does, then apply offset/limit.
+
+    ``order_by`` is a field name, prefixed with ``-`` for descending; ties are
+    broken by ``id`` ascending either way. With a ``limit`` only the first
+    ``offset + limit`` entities are selected, with a heap, instead of sorting
+    every match. As in ``find``, ``offset`` only applies together with
+    ``limit``.
+
+    Args:
+        entities: The entities (or rows) to order
+        order_by: Field to order by, or "" to keep the given order
+        offset: Number of ordered entities to skip
+        limit: Maximum number of entities to return (0 for all)
+        value: Reads a field from an entity; ``getattr`` by default
+    """
+    reverse = order_by.startswith("-")
+    field = order_by[1:] if reverse else order_by
+    if not field:
+        ordered = list(entities)
+    elif limit:
+        if reverse:
+            return heapq.nsmallest(
+                offset + limit,
+                entities,
+                key=lambda e: _Descending(value(e, field), value(e, "id")),
+            )[offset:]
+        if field == "id":
+            return heapq.nsmallest(
+                offset + limit, entities, key=lambda e: value(e, "id")
+            )[offset:]
+        return heapq.nsmallest(
+            offset + limit,
+            entities,
+            key=lambda e: (value(e, field), value(e, "id")),
+        )[offset:]
+    else:
+        ordered = list(entities)
+        if field != "id":
+            # Tiebreaker: pre-sorting by id keeps ties on order_by in id
+            # order (the sort is stable), as the database mixins do, so
+            # keyset pagination can resume between tied entities.
+            ordered.sort(key=lambda e: value(e, "id"))
+        ordered.sort(key=lambda e: value(e, field), reverse=reverse)
+    if limit:
+        ordered = ordered[offset : offset + limit]
+    return ordered
@@ -0,0 +1,149 @@
+import functools
+import keyword
+import re
+from typing import Any, Callable, List
+
+from fractal_specifications.generic.collections import (
+    AndSpecification,
+    CollectionSpecification,
+    OrSpecification,
+)
+from fractal_specifications.generic.operators import (
+    ContainsSpecification,
+    EqualsSpecification,
+    FieldValueSpecification,
+    GreaterThanEqualSpecification,
+    GreaterThanSpecification,
+    InSpecification,
+    IsNoneSpecification,
+    LessThanEqualSpecification,
+    LessThanSpecification,
+    NotEqualsSpecification,
+    NotSpecification,
+    RegexStringMatchSpecification,
+)
+from fractal_specifications.generic.specification import (
+    EmptySpecification,
+    Specification,
+)
+
+Predicate = Callable[[Any], Any]
+
+# Every FieldValueSpecification shares this default pre_processor; compiled
+# code skips calling it.
+_IDENTITY = FieldValueSpecification.__init__.__defaults__[-1]  # type: ignore[index]
+
+_COMPARISONS = {
+    EqualsSpecification: "==",
+    NotEqualsSpecification: "!=",
+    LessThanSpecification: "<",
+    LessThanEqualSpecification: "<=",
+    GreaterThanSpecification: ">",
+    GreaterThanEqualSpecification: ">=",
+    InSpecification: "in",
+}
+
+
+class _Builder:
+    """Turns a specification tree into one expression over ``obj``.
+
+    Values, custom pre_processors and unknown specifications become numbered
+    constants, so the expression only depends on the shape of the tree (its
+    operators and fields) and is compiled once for every specification like it.
+    """
+
+    def __init__(self):
+        self.constants: List[Any] = []
+        self._temporaries = 0
+
+    def constant(self, value: Any) -> str:
+        self.constants.append(value)
+        return f"c{len(self.constants) - 1}"
+
+    def temporary(self) -> str:
+        self._temporaries += 1
+        return f"v{self._temporaries}"
+
+    def value(self, specification: FieldValueSpecification, default: str = "") -> str:
+        # The same lookup as fractal_specifications: "a.b" or "a__b".
+        separator = "__" if "__" in specification.field else "."
+        expression = "obj"
+        for name in specification.field.split(separator):
+            if name.isidentifier() and not keyword.iskeyword(name):
+                expression += f".{name}"
+            else:
+                expression = f"getattr({expression}, {name!r})"
+        if default:
+            expression = f"({expression} or {default})"
+        if specification.pre_processor is _IDENTITY:
+            return expression
+        return f"{self.constant(specification.pre_processor)}({expression})"
+
+    def build(self, specification: Specification) -> str:
+        kind = type(specification)
+        if isinstance(specification, FieldValueSpecification):
+            if kind in _COMPARISONS:
+                value = self.value(specification)
+                operator = _COMPARISONS[kind]
+                return f"({value} {operator} {self.constant(specification.value)})"
+            if kind is IsNoneSpecification:
+                return f"({self.value(specification)} is None)"
+            if kind is ContainsSpecification:
+                name = self.temporary()
+                return (
+                    f"(bool({name} := {self.value(specification)}) "
+                    f"and {self.constant(specification.value)} in {name})"
+                )
+            if kind is RegexStringMatchSpecification:
+                value = self.value(specification, default="''")
+                return f"bool(_match({self.constant(specification.value)}, {value}))"
+        elif isinstance(specification, NotSpecification) and kind is NotSpecification:
+            return f"(not {self.build(specification.specification)})"
+        elif isinstance(specification, CollectionSpecification) and kind in (
+            AndSpecification,
+            OrSpecification,
+        ):
+            if not specification.specifications:
+                return "True" if kind is AndSpecification else "False"
+            operator = " and " if kind is AndSpecification else " or "
+            parts = [self.build(s) for s in specification.specifications]
+            return f"bool({operator.join(parts)})"
+        elif kind is EmptySpecification:
+            return "True"
+        # Anything else (including subclasses of the known specifications)
+        # keeps its own is_satisfied_by.
+        return f"{self.constant(specification.is_satisfied_by)}(obj)"
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_shape(expression: str, constants: int) -> Callable[..., Predicate]:
+    arguments = ", ".join(f"c{i}" for i in range(constants))
+    source = (
+        f"def factory({arguments}):\n"
+        f"    def predicate(obj):\n"
+        f"        return {expression}\n"
+        f"    return predicate\n"
+    )
+    namespace: dict = {"_match": re.match}
+    exec(compile(source, "<specification>", "exec"), namespace)
+    return namespace["factory"]
+
+
+def compile_specification(specification: Specification) -> Predicate:
+    """
+    Compile a specification into a single Python function of one object.
+
+    ``compile_specification(spec)(obj)`` is truthy exactly when
+    ``spec.is_satisfied_by(obj)`` is, and raises the same exceptions, but
+    evaluates the whole tree as one flat expression instead of a chain of
+    method calls per node. The generated code is cached per specification
+    shape (its tree of operators and fields); specifications that only
+    differ in their values share it.
+
+    Example:
+        is_match = compile_specification(Specification.parse(name="John"))
+        matches = [user for user in users if is_match(user)]
+    """
+    builder = _Builder()
+    expression = builder.build(specification)
+    return _compile_shape(expression, len(builder.constants))(*builder.constants)
@@ -1,4 +1,4 @@
-from mockfirestore import CollectionReference  # type: ignore
+from mockfirestore import CollectionReference, Query  # type: ignore
 
 from tests.fixtures import *  # NOQA
 
@@ -17,3 +17,13 @@ def where(*args, **kwargs):
 
 
 CollectionReference.where = where
+
+
+def select(self, field_paths):
+    # mockfirestore has no projection queries; returning every field is fine
+    # because the repository only reads the selected ones.
+    return self
+
+
+CollectionReference.select = select
+Query.select = select
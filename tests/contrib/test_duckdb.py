@@ -292,3 +292,124 @@ def test_field_types():
     assert result.price == 19.99
     assert result.active is True
     repo.close()
+
+
+def test_add_many(duckdb_test_repository, duckdb_test_model):
+    objs = [get_obj(duckdb_test_model) for _ in range(3)]
+
+    assert duckdb_test_repository.add_many(iter(objs), batch_size=2) == 3
+    assert duckdb_test_repository.count() == 3
+
+
+def test_update_many(duckdb_test_repository, duckdb_test_model):
+    obj1 = get_obj(duckdb_test_model)
+    obj2 = get_obj(duckdb_test_model)
+    duckdb_test_repository.add(obj1)
+    obj1.name = "updated"
+
+    assert duckdb_test_repository.update_many([obj1, obj2]) == 1
+    assert duckdb_test_repository.count() == 1
+    assert duckdb_test_repository.get(obj1.id).name == "updated"
+
+    assert duckdb_test_repository.update_many([obj1, obj2], upsert=True) == 2
+    assert duckdb_test_repository.count() == 2
+
+
+def test_update_many_repeated_ids(duckdb_test_repository, duckdb_test_model):
+    obj1 = get_obj(duckdb_test_model)
+    obj2 = get_obj(duckdb_test_model)
+    duckdb_test_repository.add(obj1)
+    first, last = obj1.update({"name": "first"}), obj1.update({"name": "last"})
+
+    assert duckdb_test_repository.update_many([first, last, obj2]) == 2
+    assert duckdb_test_repository.get(obj1.id).name == "last"
+
+    assert duckdb_test_repository.update_many([obj2, obj2], upsert=True) == 2
+    assert duckdb_test_repository.count() == 2
+
+
+def test_update_many_single_transaction(duckdb_test_repository, duckdb_test_model):
+    obj1 = get_obj(duckdb_test_model)
+    obj2 = get_obj(duckdb_test_model)
+    duckdb_test_repository.add(obj1)
+
+    def entities():
+        yield obj1.update({"name": "updated"})
+        yield obj2
+        raise RuntimeError("interrupted")
+
+    # The batches already written are rolled back with the failing one.
+    with pytest.raises(RuntimeError):
+        duckdb_test_repository.update_many(entities(), upsert=True, batch_size=1)
+
+    assert duckdb_test_repository.get(obj1.id).name == "name"
+    assert duckdb_test_repository.count() == 1
+
+
+def test_remove_many(duckdb_test_repository, duckdb_test_model):
+    obj1 = get_obj(duckdb_test_model)
+    obj2 = get_obj(duckdb_test_model)
+    obj1.name = "remove"
+    duckdb_test_repository.add_many([obj1, obj2])
+
+    assert duckdb_test_repository.remove_many(Specification.parse(name="remove")) == 1
+    assert duckdb_test_repository.count() == 1
+    assert duckdb_test_repository.remove_many() == 1
+    assert duckdb_test_repository.count() == 0
+
+
+def test_get_many(duckdb_test_repository, duckdb_test_model):
+    obj1 = get_obj(duckdb_test_model)
+    obj2 = get_obj(duckdb_test_model)
+    duckdb_test_repository.add_many([obj1, obj2])
+
+    assert duckdb_test_repository.get_many([obj2.id, "absent", obj1.id]) == [obj2, obj1]
+
+
+def _page_ids(repository, specification=None, **kwargs):
+    result, page = [], repository.find_page(specification, limit=2, **kwargs)
+    while True:
+        result += [e.id for e in page]
+        if not page.next_cursor:
+            return result
+        page = repository.find_page(
+            specification, limit=2, after=page.next_cursor, **kwargs
+        )
+
+
+def test_find_page(duckdb_test_repository, duckdb_test_model):
+    duckdb_test_repository.add_many(
+        duckdb_test_model(id=id, name=name, description="")
+        for id, name in zip("12345", "babac", strict=True)
+    )
+
+    assert _page_ids(duckdb_test_repository) == list("12345")
+    assert _page_ids(duckdb_test_repository, order_by="name") == list("24135")
+    assert _page_ids(duckdb_test_repository, order_by="-name") == list("51324")
+    assert _page_ids(
+        duckdb_test_repository, Specification.parse(name__in=["a", "b"])
+    ) == list("1234")
+
+
+def test_find_values(duckdb_test_repository, duckdb_test_model):
+    duckdb_test_repository.add_many(
+        duckdb_test_model(id=id, name=name, description="")
+        for id, name in zip("123", "bac", strict=True)
+    )
+
+    assert list(
+        duckdb_test_repository.find_values(select=["name"], order_by="-name")
+    ) == [
+        {"name": "c"},
+        {"name": "b"},
+        {"name": "a"},
+    ]
+    assert list(
+        duckdb_test_repository.find_values(
+            Specification.parse(name__in=["a", "b"]),
+            select=["id", "name"],
+            order_by="name",
+            offset=1,
+            limit=1,
+        )
+    ) == [{"id": "1", "name": "b"}]
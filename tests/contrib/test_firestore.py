@@ -150,3 +150,94 @@ def test_remove_one(firestore_test_repository, firestore_test_model, now):
     firestore_test_repository.remove_one(Specification.parse(id=obj.id))
 
     assert len(list(firestore_test_repository.find())) == 0
+
+
+def test_add_many(firestore_test_repository, firestore_test_model, now):
+    objs = [get_obj(firestore_test_model, now) for _ in range(3)]
+
+    assert firestore_test_repository.add_many(iter(objs), batch_size=2) == 3
+    assert firestore_test_repository.count() == 3
+
+
+def test_update_many(firestore_test_repository, firestore_test_model, now):
+    obj1 = get_obj(firestore_test_model, now)
+    obj2 = get_obj(firestore_test_model, now)
+    firestore_test_repository.add(obj1)
+    obj1.name = "updated"
+
+    assert firestore_test_repository.update_many([obj1, obj2]) == 1
+    assert firestore_test_repository.get(obj1.id).name == "updated"
+
+    assert firestore_test_repository.update_many([obj1, obj2], upsert=True) == 2
+    assert firestore_test_repository.count() == 2
+
+
+def test_update_many_repeated_ids(firestore_test_repository, firestore_test_model, now):
+    obj1 = get_obj(firestore_test_model, now)
+    obj2 = get_obj(firestore_test_model, now)
+    firestore_test_repository.add(obj1)
+    first, last = obj1.update({"name": "first"}), obj1.update({"name": "last"})
+
+    assert firestore_test_repository.update_many([first, last, obj2]) == 2
+    assert firestore_test_repository.get(obj1.id).name == "last"
+
+    assert firestore_test_repository.update_many([obj2, obj2], upsert=True) == 2
+    assert firestore_test_repository.count() == 2
+
+
+def test_remove_many(firestore_test_repository, firestore_test_model, now):
+    obj1 = get_obj(firestore_test_model, now)
+    obj2 = get_obj(firestore_test_model, now)
+    obj1.name = "remove"
+    firestore_test_repository.add_many([obj1, obj2])
+
+    assert (
+        firestore_test_repository.remove_many(Specification.parse(name="remove")) == 1
+    )
+    assert firestore_test_repository.count() == 1
+    assert firestore_test_repository.remove_many() == 1
+    assert firestore_test_repository.count() == 0
+
+
+def test_get_many(firestore_test_repository, firestore_test_model, now):
+    obj1 = get_obj(firestore_test_model, now)
+    obj2 = get_obj(firestore_test_model, now)
+    firestore_test_repository.add_many([obj1, obj2])
+
+    assert firestore_test_repository.get_many([obj2.id, "absent", obj1.id]) == [
+        obj2,
+        obj1,
+    ]
+
+
+def _page_ids(repository, specification=None, **kwargs):
+    result, page = [], repository.find_page(specification, limit=2, **kwargs)
+    while True:
+        result += [e.id for e in page]
+        if not page.next_cursor:
+            return result
+        page = repository.find_page(
+            specification, limit=2, after=page.next_cursor, **kwargs
+        )
+
+
+def test_find_page(firestore_test_repository, firestore_test_model, now):
+    objs = [get_obj(firestore_test_model, now) for _ in range(5)]
+    for i, obj in enumerate(objs):
+        obj.id = str(i + 1)
+    firestore_test_repository.add_many(objs)
+
+    assert _page_ids(firestore_test_repository) == list("12345")
+    assert _page_ids(firestore_test_repository, order_by="-id") == list("54321")
+
+
+def test_find_values(firestore_test_repository, firestore_test_model, now):
+    obj1 = get_obj(firestore_test_model, now)
+    obj2 = get_obj(firestore_test_model, now)
+    obj1.id, obj2.id = "1", "2"
+    obj2.name = "other"
+    firestore_test_repository.add_many([obj1, obj2])
+
+    assert list(
+        firestore_test_repository.find_values(select=["id", "name"], order_by="-id")
+    ) == [{"id": "2", "name": "other"}, {"id": "1", "name": "name"}]
@@ -170,3 +170,106 @@ def test_remove_one(mongo_test_repository, mongo_test_model):
     mongo_test_repository.remove_one(Specification.parse(id=obj.id))
 
     assert len(list(mongo_test_repository.find())) == 0
+
+
+def test_add_many(mongo_test_repository, mongo_test_model):
+    objs = [get_obj(mongo_test_model) for _ in range(3)]
+
+    assert mongo_test_repository.add_many(iter(objs), batch_size=2) == 3
+    assert mongo_test_repository.count() == 3
+
+
+def test_update_many(mongo_test_repository, mongo_test_model):
+    obj1 = get_obj(mongo_test_model)
+    obj2 = get_obj(mongo_test_model)
+    mongo_test_repository.add(obj1)
+    obj1.name = "updated"
+
+    assert mongo_test_repository.update_many([obj1, obj2]) == 1
+    assert mongo_test_repository.count() == 1
+    assert mongo_test_repository.get(obj1.id).name == "updated"
+
+    assert mongo_test_repository.update_many([obj1, obj2], upsert=True) == 2
+    assert mongo_test_repository.count() == 2
+
+
+def test_update_many_repeated_ids(mongo_test_repository, mongo_test_model):
+    obj1 = get_obj(mongo_test_model)
+    obj2 = get_obj(mongo_test_model)
+    mongo_test_repository.add(obj1)
+    first, last = obj1.update({"name": "first"}), obj1.update({"name": "last"})
+
+    assert mongo_test_repository.update_many([first, last, obj2]) == 2
+    assert mongo_test_repository.get(obj1.id).name == "last"
+
+    assert mongo_test_repository.update_many([obj2, obj2], upsert=True) == 2
+    assert mongo_test_repository.count() == 2
+
+
+def test_remove_many(mongo_test_repository, mongo_test_model):
+    obj1 = get_obj(mongo_test_model)
+    obj2 = get_obj(mongo_test_model)
+    obj1.name = "remove"
+    mongo_test_repository.add_many([obj1, obj2])
+
+    assert mongo_test_repository.remove_many(Specification.parse(name="remove")) == 1
+    assert mongo_test_repository.count() == 1
+    assert mongo_test_repository.remove_many() == 1
+    assert mongo_test_repository.count() == 0
+
+
+def test_get_many(mongo_test_repository, mongo_test_model):
+    obj1 = get_obj(mongo_test_model)
+    obj2 = get_obj(mongo_test_model)
+    mongo_test_repository.add_many([obj1, obj2])
+
+    assert mongo_test_repository.get_many([obj2.id, "absent", obj1.id]) == [obj2, obj1]
+
+
+def _page_ids(repository, specification=None, **kwargs):
+    result, page = [], repository.find_page(specification, limit=2, **kwargs)
+    while True:
+        result += [e.id for e in page]
+        if not page.next_cursor:
+            return result
+        page = repository.find_page(
+            specification, limit=2, after=page.next_cursor, **kwargs
+        )
+
+
+def test_find_page(mongo_test_repository, mongo_test_model):
+    mongo_test_repository.add_many(
+        mongo_test_model(id=id, name=name, description="")
+        for id, name in zip("12345", "babac", strict=True)
+    )
+
+    assert _page_ids(mongo_test_repository) == list("12345")
+    assert _page_ids(mongo_test_repository, order_by="name") == list("24135")
+    assert _page_ids(mongo_test_repository, order_by="-name") == list("51324")
+    assert _page_ids(
+        mongo_test_repository, Specification.parse(name__in=["a", "b"])
+    ) == list("1234")
+
+
+def test_find_values(mongo_test_repository, mongo_test_model):
+    mongo_test_repository.add_many(
+        mongo_test_model(id=id, name=name, description="")
+        for id, name in zip("123", "bac", strict=True)
+    )
+
+    assert list(
+        mongo_test_repository.find_values(select=["name"], order_by="-name")
+    ) == [
+        {"name": "c"},
+        {"name": "b"},
+        {"name": "a"},
+    ]
+    assert list(
+        mongo_test_repository.find_values(
+            Specification.parse(name__in=["a", "b"]),
+            select=["id", "name"],
+            order_by="name",
+            offset=1,
+            limit=1,
+        )
+    ) == [{"id": "1", "name": "b"}]
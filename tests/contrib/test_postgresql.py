@@ -346,3 +346,184 @@ def test_is_healthy_error(postgres_test_repository):
         result = postgres_test_repository.is_healthy()
 
         assert result is False
+
+
+def test_add_many(postgres_test_repository, postgres_test_model):
+    objs = [get_obj(postgres_test_model) for _ in range(3)]
+
+    with (
+        patch("psycopg2.connect") as mock_connect,
+        patch("psycopg2.extras.execute_values") as mock_execute_values,
+    ):
+        mock_conn = MagicMock()
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.add_many(iter(objs), batch_size=2) == 3
+
+        # One connection, one multi-row INSERT per batch, one commit.
+        mock_connect.assert_called_once()
+        assert mock_execute_values.call_count == 2
+        query = mock_execute_values.call_args.args[1]
+        assert query == "INSERT INTO test (id, name, description) VALUES %s"
+        mock_conn.commit.assert_called_once()
+
+
+def test_update_many(postgres_test_repository, postgres_test_model):
+    obj1 = get_obj(postgres_test_model)
+    obj2 = get_obj(postgres_test_model)
+
+    with (
+        patch("psycopg2.connect") as mock_connect,
+        patch("psycopg2.extras.execute_batch") as mock_execute_batch,
+    ):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(obj1.id,)]
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.update_many([obj1, obj2]) == 1
+
+        query, rows = mock_execute_batch.call_args.args[1:3]
+        assert query == "UPDATE test SET name = %s, description = %s WHERE id = %s"
+        assert rows == [["name", "description", obj1.id]]
+        mock_conn.commit.assert_called_once()
+
+
+def test_update_many_upsert(postgres_test_repository, postgres_test_model):
+    objs = [get_obj(postgres_test_model) for _ in range(2)]
+
+    with (
+        patch("psycopg2.connect") as mock_connect,
+        patch("psycopg2.extras.execute_values") as mock_execute_values,
+    ):
+        mock_conn = MagicMock()
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.update_many(objs, upsert=True) == 2
+
+        query = mock_execute_values.call_args.args[1]
+        assert query == (
+            "INSERT INTO test (id, name, description) VALUES %s ON CONFLICT (id) "
+            "DO UPDATE SET name = EXCLUDED.name, description = EXCLUDED.description"
+        )
+
+
+def test_update_many_upsert_repeated_ids(postgres_test_repository, postgres_test_model):
+    obj = get_obj(postgres_test_model)
+    first, last = obj.update({"name": "first"}), obj.update({"name": "last"})
+
+    with (
+        patch("psycopg2.connect") as mock_connect,
+        patch("psycopg2.extras.execute_values") as mock_execute_values,
+    ):
+        mock_conn = MagicMock()
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.update_many([first, last], upsert=True) == 2
+
+        # One row per id, the last given, or ON CONFLICT would fail.
+        rows = mock_execute_values.call_args.args[2]
+        assert rows == [[obj.id, "last", "description"]]
+
+
+def test_remove_many(postgres_test_repository):
+    with patch("psycopg2.connect") as mock_connect:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 2
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.remove_many(Specification.parse(name="x")) == 2
+        mock_cursor.execute.assert_called_once_with(
+            "DELETE FROM test WHERE name = %s", ["x"]
+        )
+        assert postgres_test_repository.remove_many() == 2
+        mock_cursor.execute.assert_called_with("DELETE FROM test", [])
+
+
+def test_get_many(postgres_test_repository, postgres_test_model):
+    obj1 = get_obj(postgres_test_model)
+    obj2 = get_obj(postgres_test_model)
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [obj1.asdict(), obj2.asdict()]
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert postgres_test_repository.get_many([obj2.id, "absent", obj1.id]) == [
+            obj2,
+            obj1,
+        ]
+        mock_cursor.execute.assert_called_once_with(
+            "SELECT * FROM test WHERE id = ANY(%s)", [[obj2.id, "absent", obj1.id]]
+        )
+
+
+def test_find_page(postgres_test_repository, postgres_test_model):
+    obj1 = get_obj(postgres_test_model)
+    obj2 = get_obj(postgres_test_model)
+
+    with patch("psycopg2.connect") as mock_connect:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.__iter__.return_value = [obj1.asdict(), obj2.asdict()]
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        page = postgres_test_repository.find_page(limit=1, order_by="name")
+        assert page.entities == [obj1]
+        mock_cursor.execute.assert_called_once_with(
+            "SELECT * FROM test ORDER BY name ASC, id ASC LIMIT 2", []
+        )
+
+        postgres_test_repository.find_page(
+            Specification.parse(description="x"),
+            limit=1,
+            order_by="name",
+            after=page.next_cursor,
+        )
+        mock_cursor.execute.assert_called_with(
+            "SELECT * FROM test WHERE (description = %s) AND (name, id) > (%s, %s) "
+            "ORDER BY name ASC, id ASC LIMIT 2",
+            ["x", obj1.name, obj1.id],
+        )
+
+
+def test_find_values(postgres_test_repository):
+    with patch("psycopg2.connect") as mock_connect:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.__iter__.return_value = [{"name": "a"}]
+        mock_connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        mock_connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert list(
+            postgres_test_repository.find_values(
+                Specification.parse(description="x"),
+                select=["name"],
+                order_by="-name",
+                limit=10,
+            )
+        ) == [{"name": "a"}]
+        mock_cursor.execute.assert_called_once_with(
+            "SELECT name FROM test WHERE description = %s "
+            "ORDER BY name DESC, id ASC LIMIT 10",
+            ["x"],
+        )
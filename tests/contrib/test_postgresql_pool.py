@@ -0,0 +1,315 @@
+import os
+import threading
+from unittest.mock import patch
+
+import psycopg2
+import pytest
+
+from fractal_repositories.contrib.postgresql import pool as pool_module
+from fractal_repositories.contrib.postgresql.pool import (
+    ConnectionPool,
+    PoolTimeout,
+    get_pool,
+)
+
+
+class FakeCursor:
+    rowcount = 1
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.conn.queries.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+
+class FakeConnection:
+    """Local stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_pool(**options):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return ConnectionPool(connect, **options), opened
+
+
+def test_reuses_connections():
+    pool, opened = make_pool(min_size=2, max_size=4)
+
+    for _ in range(5):
+        with pool.connection() as conn:
+            conn.cursor().execute("SELECT 1")
+
+    assert len(opened) == 2
+    assert conn.commits == 5
+    stats = pool.stats()
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
+    assert stats["in_use"] == 0
+    assert stats["opened"] == 2
+    assert stats["checkouts"] == 5
+
+
+def test_rolls_back_on_error():
+    pool, opened = make_pool()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError
+
+    assert opened[0].rollbacks == 1
+    assert opened[0].commits == 0
+    assert pool.stats()["idle"] == 1
+
+
+def test_discards_connection_after_connection_error():
+    pool, opened = make_pool()
+
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            conn.broken = True
+            conn.cursor().execute("SELECT 1")
+
+    assert opened[0].closed
+    assert pool.stats()["size"] == 0
+    with pool.connection() as conn:
+        assert conn is opened[1]
+
+
+def test_max_size_and_timeout():
+    pool, opened = make_pool(max_size=2, timeout=0.05)
+    first, _ = pool.getconn(), pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+    assert pool.stats()["timeouts"] == 1
+    pool.putconn(first)
+    assert pool.getconn() is first
+    assert len(opened) == 2
+
+
+def test_waiting_checkout_gets_returned_connection():
+    pool, _ = make_pool(max_size=1, timeout=5)
+    conn = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    waiter.start()
+    while pool.stats()["waiting"] == 0:
+        pass
+
+    pool.putconn(conn)
+    waiter.join()
+
+    assert got == [conn]
+
+
+def test_threads_share_at_most_max_size():
+    pool, opened = make_pool(max_size=3, timeout=5)
+
+    def work():
+        for _ in range(50):
+            with pool.connection() as conn:
+                conn.cursor().execute("SELECT 1")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) <= 3
+    assert pool.stats()["checkouts"] == 400
+    assert pool.stats()["in_use"] == 0
+
+
+def test_max_lifetime(clock):
+    pool, opened = make_pool(max_lifetime=60)
+    with pool.connection():
+        clock[0] += 61
+
+    assert opened[0].closed
+    with pool.connection() as conn:
+        assert conn is opened[1]
+    assert pool.stats()["closed"] == 1
+
+
+def test_health_check_after_idle(clock):
+    pool, opened = make_pool(check_after=30)
+    with pool.connection():
+        pass
+
+    clock[0] += 10
+    with pool.connection() as conn:
+        assert conn.queries == []  # recently used: not checked
+    opened[0].broken = True
+    clock[0] += 31
+    with pool.connection() as conn:
+        assert conn is opened[1]
+
+    assert opened[0].closed
+    assert pool.stats()["failed_checks"] == 1
+
+
+def test_health_check_does_not_block_checkouts(clock):
+    pool, opened = make_pool(max_size=2, timeout=5, check_after=30)
+    with pool.connection():
+        pass
+    clock[0] += 31
+    checking, release = threading.Event(), threading.Event()
+
+    def slow_execute(query, params=None):
+        checking.set()
+        release.wait(5)
+
+    opened[0].cursor = lambda: type(
+        "SlowCursor", (FakeCursor,), {"execute": staticmethod(slow_execute)}
+    )(opened[0])
+    got = []
+    checker = threading.Thread(target=lambda: got.append(pool.getconn()))
+    checker.start()
+    checking.wait(5)
+
+    # While the first checkout waits for its check, others are served.
+    others = []
+    borrower = threading.Thread(target=lambda: others.append(pool.getconn()))
+    borrower.start()
+    borrower.join(2)
+    assert len(opened) == 2 and others == [opened[1]]
+    release.set()
+    checker.join()
+
+    assert got == [opened[0]]
+    assert pool.stats()["in_use"] == 2
+    assert pool.stats()["failed_checks"] == 0
+
+
+def test_close_retires_checked_out_connections():
+    pool, opened = make_pool(min_size=2)
+    conn = pool.getconn()
+
+    pool.close()
+    pool.putconn(conn)
+
+    assert all(c.closed for c in opened)
+    assert pool.stats()["size"] == 0
+
+
+def test_child_process_opens_its_own():
+    pool, opened = make_pool()
+    with pool.connection():
+        pass
+
+    with patch.object(pool_module.os, "getpid", return_value=os.getpid() + 1):
+        with pool.connection() as conn:
+            assert conn is opened[1]
+    assert not opened[0].closed
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        ConnectionPool(FakeConnection, min_size=3, max_size=2)
+
+
+def test_get_pool_shared_by_dsn():
+    params = {"host": "localhost", "database": "shared_pool_test"}
+
+    assert get_pool(params, max_size=2) is get_pool(dict(params), max_size=2)
+    assert get_pool(params, max_size=2) is not get_pool(params, max_size=3)
+    assert get_pool(params) is not get_pool({**params, "database": "other"})
+
+
+def test_repository_pooled(postgres_test_repository, postgres_test_model):
+    from fractal_repositories.contrib.postgresql.mixins import (
+        PostgresRepositoryMixin,
+    )
+
+    class PooledRepository(PostgresRepositoryMixin[postgres_test_model]):
+        entity = postgres_test_model
+
+    def make(db):
+        return PooledRepository(
+            postgres_host="localhost",
+            postgres_port="5432",
+            postgres_db=db,
+            postgres_user="user",
+            postgres_password="password",
+            connection="pool",
+            pool_options={"max_size": 1, "timeout": 1},
+        )
+
+    repository, same_dsn = make("pooled_test"), make("pooled_test")
+    assert repository.pool is same_dsn.pool
+    assert postgres_test_repository.pool is None
+
+    with patch(
+        "psycopg2.connect", side_effect=lambda **params: FakeConnection()
+    ) as connect:
+        repository.add(postgres_test_model(id="1"))
+        # Nothing updated: the upsert then adds, after giving the only
+        # connection back.
+        with patch.object(FakeCursor, "rowcount", 0):
+            same_dsn.update(postgres_test_model(id="2"), upsert=True)
+        assert repository.is_healthy()
+
+    connect.assert_called_once_with(
+        host="localhost",
+        port="5432",
+        database="pooled_test",
+        user="user",
+        password="password",
+    )
+    assert repository.pool.stats()["checkouts"] == 4
+
+
+def test_repository_unknown_connection(postgres_test_model):
+    from fractal_repositories.contrib.postgresql.mixins import (
+        PostgresRepositoryMixin,
+    )
+
+    class Repository(PostgresRepositoryMixin[postgres_test_model]):
+        entity = postgres_test_model
+
+    with pytest.raises(ValueError):
+        Repository("db", "host", "password", "5432", "user", connection="shared")
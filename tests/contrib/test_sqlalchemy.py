@@ -427,3 +427,125 @@ def test_find_one_error(sqlalchemy_test_repository, sqlalchemy_test_model):
 
     with pytest.raises(ObjectNotFoundException):
         sqlalchemy_test_repository.find_one(EqualsSpecification("id", "test"))
+
+
+def test_add_many(sqlalchemy_test_repository, sqlalchemy_test_model):
+    objs = [sqlalchemy_test_model(f"test{i}") for i in range(3)]
+
+    assert sqlalchemy_test_repository.add_many(iter(objs), batch_size=2) == 3
+    assert sqlalchemy_test_repository.count() == 3
+
+
+def test_add_many_error(sqlalchemy_test_repository, sqlalchemy_test_model):
+    obj = sqlalchemy_test_model("test")
+    obj.name = obj
+
+    from fractal_repositories.contrib.sqlalchemy.mixins import SqlAlchemyException
+
+    with pytest.raises(SqlAlchemyException):
+        sqlalchemy_test_repository.add_many([obj])
+
+
+def test_remove_many(sqlalchemy_test_repository, sqlalchemy_test_model):
+    sqlalchemy_test_repository.add_many(
+        [sqlalchemy_test_model("test1", name="remove"), sqlalchemy_test_model("test2")]
+    )
+
+    assert (
+        sqlalchemy_test_repository.remove_many(Specification.parse(name="absent")) == 0
+    )
+    assert (
+        sqlalchemy_test_repository.remove_many(Specification.parse(name="remove")) == 1
+    )
+    assert sqlalchemy_test_repository.count() == 1
+    assert sqlalchemy_test_repository.remove_many() == 1
+    assert sqlalchemy_test_repository.count() == 0
+
+
+def test_remove_many_in_one_statement(
+    sqlalchemy_test_repository,
+    sqlalchemy_test_model,
+    sqlalchemy_test_sub_model,
+    sqlalchemy_test_sub_model_dao,
+    mocker,
+):
+    from sqlalchemy.orm import Session
+
+    obj = sqlalchemy_test_model("test1", name="remove")
+    obj.items = [sqlalchemy_test_sub_model("item", item_id=obj.id)]
+    sqlalchemy_test_repository.add_many(
+        [obj, sqlalchemy_test_model("test2"), sqlalchemy_test_model("test3")]
+    )
+    delete = mocker.spy(Session, "delete")
+
+    # Mapped to SQL, and (id__in) matched in Python.
+    assert (
+        sqlalchemy_test_repository.remove_many(Specification.parse(name="remove")) == 1
+    )
+    assert (
+        sqlalchemy_test_repository.remove_many(
+            Specification.parse(id__in=["test2", "absent"])
+        )
+        == 1
+    )
+
+    delete.assert_not_called()
+    assert [e.id for e in sqlalchemy_test_repository.find()] == ["test3"]
+    # The item is detached, as session.delete leaves it.
+    with sqlalchemy_test_repository:
+        (item,) = sqlalchemy_test_repository.session.query(
+            sqlalchemy_test_sub_model_dao
+        )
+        assert item.item_id is None
+
+
+def test_get_many(sqlalchemy_test_repository, sqlalchemy_test_model):
+    obj1 = sqlalchemy_test_model("test1")
+    obj2 = sqlalchemy_test_model("test2")
+    sqlalchemy_test_repository.add_many([obj1, obj2])
+
+    assert sqlalchemy_test_repository.get_many(["test2", "absent", "test1"]) == [
+        obj2,
+        obj1,
+    ]
+
+
+def _page_ids(repository, specification=None, **kwargs):
+    result, page = [], repository.find_page(specification, limit=2, **kwargs)
+    while True:
+        result += [e.id for e in page]
+        if not page.next_cursor:
+            return result
+        page = repository.find_page(
+            specification, limit=2, after=page.next_cursor, **kwargs
+        )
+
+
+def test_find_page(sqlalchemy_test_repository, sqlalchemy_test_model):
+    sqlalchemy_test_repository.add_many(
+        sqlalchemy_test_model(id, name=name)
+        for id, name in zip("12345", "babac", strict=True)
+    )
+
+    assert _page_ids(sqlalchemy_test_repository) == list("12345")
+    assert _page_ids(sqlalchemy_test_repository, order_by="name") == list("24135")
+    assert _page_ids(sqlalchemy_test_repository, order_by="-name") == list("51324")
+    assert _page_ids(sqlalchemy_test_repository, Specification.parse(name="b")) == list(
+        "13"
+    )
+
+
+def test_find_values(sqlalchemy_test_repository, sqlalchemy_test_model):
+    sqlalchemy_test_repository.add_many(
+        sqlalchemy_test_model(id, name=name)
+        for id, name in zip("123", "bac", strict=True)
+    )
+
+    assert list(
+        sqlalchemy_test_repository.find_values(select=["name"], order_by="-name")
+    ) == [{"name": "c"}, {"name": "b"}, {"name": "a"}]
+    assert list(
+        sqlalchemy_test_repository.find_values(
+            Specification.parse(name="b"), select=["id", "name"]
+        )
+    ) == [{"id": "1", "name": "b"}]
@@ -392,3 +392,76 @@ def test_model_with_nested_uuid_and_enum():
     assert result["users"][0]["role"] == "admin"
     assert result["users"][1]["user_id"] == str(uuid2)
     assert result["users"][1]["role"] == "user"
+
+
+def test_model_serializer_subclass_types():
+    """Subclasses of dict/str/tuple convert exactly as before the fast path."""
+    from collections import OrderedDict
+
+    from fractal_repositories.core.entity import Entity
+
+    class Color(str, Enum):
+        RED = "red"
+
+    @dataclass
+    class M(Entity):
+        color: Color
+        mapping: OrderedDict
+        pair: tuple
+        when: date
+
+    model = M(
+        id="1",
+        color=Color.RED,
+        mapping=OrderedDict(a=Decimal("1.5")),
+        pair=(Color.RED, date(2024, 1, 2)),
+        when=date(2024, 1, 2),
+    )
+
+    assert model.asdict() == {
+        "id": "1",
+        "color": "red",
+        "mapping": {"a": "1.50"},
+        "pair": ("red", "2024-01-02"),
+        "when": "2024-01-02",
+    }
+
+
+def test_model_serializer_calculated_fields_per_class():
+    """Field sets are cached per class, so subclasses do not reuse the parent's."""
+    from fractal_repositories.core.entity import Entity
+
+    @dataclass
+    class Parent(Entity):
+        name: str = "parent"
+
+        @staticmethod
+        def calculated_fields():
+            return ["name"]
+
+    @dataclass
+    class Child(Parent):
+        extra: int = 1
+
+        @staticmethod
+        def calculated_fields():
+            return []
+
+    assert Parent(id="1").asdict() == {"id": "1"}
+    assert Child(id="1").asdict() == {"id": "1", "name": "parent", "extra": 1}
+    assert Parent(id="1").asdict() == {"id": "1"}
+
+
+def test_model_clean_date_fields():
+    """clean() drops empty date/datetime values but keeps falsy values of others."""
+    from fractal_repositories.core.entity import Entity
+
+    @dataclass
+    class M(Entity):
+        number: int = 5
+        created: datetime = None
+        day: date = date(2024, 1, 1)
+
+    model = M.clean(id="1", number=0, created=None, day="", unknown="x")
+
+    assert model == M(id="1", number=0)
@@ -0,0 +1,52 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from fractal_repositories.core.pagination import (
+    decode_cursor,
+    encode_cursor,
+    keyset_sql,
+)
+from fractal_repositories.exceptions import InvalidCursorException
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "name",
+        42,
+        1.5,
+        True,
+        Decimal("10.005"),
+        datetime.date(2024, 2, 29),
+        datetime.datetime(2024, 2, 29, 12, 30, tzinfo=datetime.timezone.utc),
+        uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    ],
+)
+def test_cursor_round_trip(value):
+    cursor = encode_cursor("-field", value, 7)
+
+    assert decode_cursor(cursor, "-field") == (value, 7)
+    assert type(decode_cursor(cursor, "-field")[0]) is type(value)
+
+
+def test_cursor_for_other_order_by():
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(encode_cursor("name", "a", "1"), "-name")
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "W10="])
+def test_cursor_malformed(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, "name")
+
+
+def test_keyset_sql():
+    assert keyset_sql("name", ("a", "1")) == ("(name, id) > (%s, %s)", ["a", "1"])
+    assert keyset_sql("-name", ("a", "1"), "?") == (
+        "(name < ? OR (name = ? AND id > ?))",
+        ["a", "a", "1"],
+    )
+    assert keyset_sql("-id", ("1", "1")) == ("id < %s", ["1"])
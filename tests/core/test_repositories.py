@@ -29,3 +29,169 @@ def test_find_one_not_found(an_object):
 
     with pytest.raises(TestObjectNotFoundException):
         TestRepository().find_one(Specification.parse(id="an_object.id"))
+
+
+def _default_bulk_repository(an_object):
+    """In-memory repository that falls back to the ABC's bulk defaults."""
+    from fractal_repositories.core.repositories import Repository
+    from fractal_repositories.mixins.inmemory_repository_mixin import (
+        InMemoryRepositoryMixin,
+    )
+
+    class TestRepository(InMemoryRepositoryMixin[an_object.__class__]):
+        entity = an_object.__class__
+
+        add_many = Repository.add_many
+        update_many = Repository.update_many
+        remove_many = Repository.remove_many
+        _get_many = Repository._get_many
+        get_many_chunk_size = Repository.get_many_chunk_size
+
+    return TestRepository()
+
+
+def test_default_add_many(an_object, another_object):
+    repository = _default_bulk_repository(an_object)
+
+    assert repository.add_many(iter([an_object, another_object])) == 2
+    assert repository.count() == 2
+
+
+def test_default_update_many_skips_missing(an_object, another_object):
+    repository = _default_bulk_repository(an_object)
+    repository.add(an_object)
+
+    an_object.name = "updated"
+    assert repository.update_many([an_object, another_object]) == 1
+    assert repository.count() == 1
+    assert repository.get(an_object.id).name == "updated"
+
+    assert repository.update_many([an_object, another_object], upsert=True) == 2
+    assert repository.count() == 2
+
+
+def test_default_remove_many(an_object, another_object):
+    repository = _default_bulk_repository(an_object)
+    repository.add_many([an_object, another_object])
+
+    assert repository.remove_many(Specification.parse(id=an_object.id)) == 1
+    assert repository.remove_many(Specification.parse(id=an_object.id)) == 0
+    assert repository.remove_many() == 1
+    assert repository.count() == 0
+
+
+def test_write_repository_remove_many(an_object, another_object):
+    from fractal_repositories.core.repositories import WriteRepository
+
+    class TestRepository(WriteRepository[an_object.__class__]):
+        def __init__(self):
+            self.stored = {}
+
+        def add(self, entity):
+            self.stored[entity.id] = entity
+            return entity
+
+        def update(self, entity, *, upsert=False):
+            return self.add(entity)
+
+        def remove_one(self, specification):
+            del self.stored[specification.value]
+
+        def is_healthy(self):
+            return True
+
+    # Write-only: instantiable, but without find() there is nothing to match.
+    with pytest.raises(NotImplementedError):
+        TestRepository().remove_many()
+
+    class FindingRepository(TestRepository):
+        def find(self, specification=None):
+            return [e for e in self.stored.values() if specification.is_satisfied_by(e)]
+
+    repository = FindingRepository()
+    repository.add(an_object)
+    repository.add(another_object)
+
+    assert repository.remove_many(Specification.parse(id=an_object.id)) == 1
+    assert list(repository.stored) == [another_object.id]
+
+
+def test_default_get_many(an_object, another_object, mocker):
+    repository = _default_bulk_repository(an_object)
+    repository.add_many([an_object, another_object])
+    repository.get_many_chunk_size = 1
+    find = mocker.spy(repository, "find")
+
+    assert repository.get_many(
+        [another_object.id, "absent", an_object.id, another_object.id]
+    ) == [another_object, an_object, another_object]
+    # One query per chunk of unique ids.
+    assert find.call_count == 3
+
+
+def test_get_many_missing(an_object, another_object):
+    from fractal_repositories.exceptions import ObjectNotFoundException
+
+    repository = _default_bulk_repository(an_object)
+    repository.add(an_object)
+
+    assert repository.get_many(["absent", an_object.id], missing="none") == [
+        None,
+        an_object,
+    ]
+    assert repository.get_many(
+        ["absent", an_object.id], preserve_order=False, missing="none"
+    ) == [an_object, None]
+    with pytest.raises(ObjectNotFoundException):
+        repository.get_many([an_object.id, "absent"], missing="raise")
+    with pytest.raises(ValueError):
+        repository.get_many([an_object.id], missing="ignore")
+
+
+def test_find_page(an_object):
+    repository = _default_bulk_repository(an_object)
+    repository.add_many(
+        an_object.__class__(id, name) for id, name in zip("12345", "babac", strict=True)
+    )
+
+    def ids(**kwargs):
+        result, page = [], repository.find_page(limit=2, **kwargs)
+        while True:
+            result += [e.id for e in page]
+            if not page.next_cursor:
+                return result
+            page = repository.find_page(limit=2, after=page.next_cursor, **kwargs)
+
+    assert ids() == list("12345")
+    assert ids(order_by="name") == list("24135")
+    assert ids(order_by="-name") == list("51324")
+    assert ids(order_by="-id") == list("54321")
+    assert len(repository.find_page(limit=5)) == 5
+    assert repository.find_page(limit=5).next_cursor is None
+
+
+def test_find_page_invalid(an_object):
+    from fractal_repositories.exceptions import InvalidCursorException
+
+    repository = _default_bulk_repository(an_object)
+    repository.add_many([an_object.__class__("1"), an_object.__class__("2")])
+    cursor = repository.find_page(limit=1, order_by="name").next_cursor
+
+    with pytest.raises(InvalidCursorException):
+        repository.find_page(limit=1, order_by="-name", after=cursor)
+    with pytest.raises(ValueError):
+        repository.find_page(limit=0)
+
+
+def test_find_values(an_object, another_object):
+    repository = _default_bulk_repository(an_object)
+    repository.add_many([an_object, another_object])
+
+    assert list(repository.find_values(select=["name"], order_by="-id")) == [
+        {"name": another_object.name},
+        {"name": an_object.name},
+    ]
+    with pytest.raises(ValueError):
+        repository.find_values(select=["name", "unknown; DROP TABLE x"])
+    with pytest.raises(ValueError):
+        repository.find_values(select=[])
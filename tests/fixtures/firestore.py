@@ -22,7 +22,12 @@ def firestore_test_model(now):
 
 @pytest.fixture
 def firebase_client_mock(mocker):
-    from mockfirestore import CollectionReference, MockFirestore, Query  # type: ignore
+    from mockfirestore import (  # type: ignore
+        CollectionReference,
+        MockFirestore,
+        Query,
+        Transaction,
+    )
 
     def count(self):
         class Result:
@@ -35,8 +40,16 @@ def firebase_client_mock(mocker):
 
         return Query()
 
+    def batch(self):
+        # mockfirestore has no WriteBatch; a begun Transaction has the same
+        # set/delete/commit surface.
+        write_batch = Transaction(self)
+        write_batch._begin()
+        return write_batch
+
     CollectionReference.count = count
     Query.count = count
+    MockFirestore.batch = batch
 
     mocker.patch("firebase_admin.firestore.client", lambda: MockFirestore())
 
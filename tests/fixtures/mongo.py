@@ -1,3 +1,4 @@
+import inspect
 from abc import ABC
 from dataclasses import dataclass
 
@@ -18,7 +19,24 @@ def mongo_test_model():
 
 
 @pytest.fixture
-def mongo_test_repository(mongo_test_model):
+def mongomock_bulk_update_sort(monkeypatch):
+    """Let mongomock's bulk API take the ``sort`` pymongo 4.11+ passes for
+    ``UpdateOne`` (always None here: the repository never sorts an update)."""
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    if "sort" in inspect.signature(add_update).parameters:
+        return
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        assert sort is None
+        return add_update(self, *args, **kwargs)
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", add_update_without_sort)
+
+
+@pytest.fixture
+def mongo_test_repository(mongo_test_model, mongomock_bulk_update_sort):
     from fractal_repositories.contrib.mongo.mixins import MongoRepositoryMixin
     from fractal_repositories.core.repositories import Repository
 
@@ -282,8 +282,8 @@ def file_repository(mocker_file_open_data):
     return FileRepository(root_dir="")
 
 
-@pytest.fixture
-def sqlite_repository(tmp_path):
+@pytest.fixture(params=["operation", "thread"])
+def sqlite_repository(request, tmp_path):
     from fractal_repositories.mixins.sqlite_repository_mixin import (
         SqliteRepositoryMixin,
     )
@@ -291,7 +291,7 @@ def sqlite_repository(tmp_path):
     class SqliteRepository(SqliteRepositoryMixin[AnObject]):
         entity = AnObject
 
-    return SqliteRepository(root_dir=str(tmp_path))
+    return SqliteRepository(root_dir=str(tmp_path), connection=request.param)
 
 
 @pytest.fixture
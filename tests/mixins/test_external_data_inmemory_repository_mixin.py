@@ -32,3 +32,28 @@ def test_dump_data_json(external_data_inmemory_repository, an_object):
     data = (an_object.__class__.__name__.lower(), json.dumps([an_object.__dict__]))
 
     assert external_data_inmemory_repository.dump_data_json() == data
+
+
+def test_data_json_codec(an_object):
+    import json
+
+    import pytest
+
+    pytest.importorskip("orjson")
+
+    from fractal_repositories.mixins.external_data_inmemory_repository_mixin import (
+        ExternalDataInMemoryRepositoryMixin,
+    )
+    from tests.fixtures.repositories import AnObject
+
+    class ExternalDataInMemoryRepository(ExternalDataInMemoryRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = ExternalDataInMemoryRepository(AnObject, codec="orjson")
+    repository.add(an_object)
+
+    key, data = repository.dump_data_json()
+    assert json.loads(data) == [an_object.__dict__]
+
+    repository.load_data_json({key: json.dumps([an_object.__dict__])})
+    assert list(repository.find()) == [an_object]
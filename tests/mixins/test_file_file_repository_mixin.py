@@ -11,3 +11,64 @@ def test_delete_file(file_file_repository, mocker_os_remove):
 
 def test_delete_file_error(file_file_repository, mocker_os_remove_error):
     assert not file_file_repository.delete_file("reference")
+
+
+def test_compressed_upload_get_file(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import (
+        FileFileRepositoryMixin,
+    )
+    from fractal_repositories.utils.compression import BLOCK_MAGIC
+
+    class CompressedFileRepository(FileFileRepositoryMixin):
+        compression = "gzip"
+
+    (tmp_path / "media").mkdir()
+    repository = CompressedFileRepository(root_dir=str(tmp_path))
+    text = b"line of text\n" * 1000
+    noise = bytes(range(256))
+
+    compressed = repository.upload_file(text, "text/plain")
+    stored = (tmp_path / "compressed_media" / compressed).read_bytes()
+    assert stored.startswith(BLOCK_MAGIC) and len(stored) < len(text) // 10
+    assert repository.get_file(compressed) == text
+
+    # Incompressible data is stored as it is.
+    raw = repository.upload_file(noise, "application/octet-stream")
+    assert (tmp_path / "media" / raw).read_bytes() == noise
+    assert repository.get_file(raw) == noise
+
+    # Files read back whatever the setting is now.
+    plain = FileFileRepositoryMixin(root_dir=str(tmp_path))
+    assert plain.get_file(compressed) == text
+    assert repository.get_file(plain.upload_file(text, "text/plain")) == text
+
+
+def test_compressed_upload_raw_block_file(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import (
+        FileFileRepositoryMixin,
+    )
+    from fractal_repositories.utils.compression import get_compressor, pack_block
+
+    class CompressedFileRepository(FileFileRepositoryMixin):
+        compression = "gzip"
+
+    (tmp_path / "media").mkdir()
+    repository = CompressedFileRepository(root_dir=str(tmp_path))
+    # An upload that happens to be a block file (too small to pack smaller).
+    block_file = pack_block(b"x", get_compressor("gzip"))
+
+    for uploader in (repository, FileFileRepositoryMixin(root_dir=str(tmp_path))):
+        reference = uploader.upload_file(block_file, "application/octet-stream")
+        assert repository.get_file(reference) == block_file
+
+    # Re-uploading a reference stored compressed replaces it.
+    text = b"line of text\n" * 1000
+    repository.upload_file(text, "text/plain", reference="doc")
+    repository.upload_file(block_file, "application/octet-stream", reference="doc")
+    assert repository.get_file("doc") == block_file
+    repository.upload_file(text, "text/plain", reference="doc")
+    assert repository.get_file("doc") == text
+
+    assert repository.delete_file("doc")
+    assert not repository.delete_file("doc")
+    assert not (tmp_path / "compressed_media" / "doc").exists()
@@ -1,3 +1,8 @@
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 
 
@@ -152,3 +157,1188 @@ def test_find_skips_corrupt_lines(file_repository, an_object, mocker_file_open_d
 
     assert len(found) == 1
     assert found[0].id == an_object.id
+
+
+def test_add_many(file_repository, an_object, another_object, mocker):
+    opened = mocker.patch("builtins.open", mocker.mock_open())
+
+    assert file_repository.add_many(iter([an_object, another_object])) == 2
+
+    # A single append for the whole batch, one line per entity.
+    opened.assert_called_once()
+    (written,) = opened().write.call_args.args
+    assert written.count("\n") == 2
+    assert len(file_repository.entities) == 2
+
+
+def test_update_many(
+    file_repository, an_object, another_object, mocker_file_open_data, mocker
+):
+    file_repository.add(an_object)
+    mocker_file_open_data([an_object])
+    write = mocker.patch.object(type(file_repository), "_atomic_write")
+
+    an_object.name = "update"
+    assert file_repository.update_many([an_object, another_object]) == 1
+    assert file_repository.update_many([an_object, another_object], upsert=True) == 2
+
+    lines = write.call_args.args[0]
+    assert [json.loads(line)["id"] for line in lines] == [
+        an_object.id,
+        another_object.id,
+    ]
+
+
+def test_remove_many(
+    file_repository, an_object, another_object, mocker_file_open_data, mocker
+):
+    file_repository.add_many([an_object, another_object])
+    mocker_file_open_data([an_object, another_object])
+    write = mocker.patch.object(type(file_repository), "_atomic_write")
+
+    from fractal_specifications.generic.specification import Specification
+
+    assert file_repository.remove_many(Specification.parse(id="absent")) == 0
+    write.assert_not_called()
+
+    assert file_repository.remove_many(Specification.parse(id=an_object.id)) == 1
+    assert [json.loads(line)["id"] for line in write.call_args.args[0]] == [
+        another_object.id
+    ]
+    assert list(file_repository.entities) == [another_object.id]
+
+    assert file_repository.remove_many() == 2
+    assert file_repository.entities == {}
+
+
+def test_get_many(file_repository, an_object, another_object, mocker_file_open_data):
+    mocker_file_open_data([an_object, another_object])
+
+    # Served from the file, not the in-process dict.
+    assert file_repository.entities == {}
+    assert file_repository.get_many([another_object.id, "absent", an_object.id]) == [
+        another_object,
+        an_object,
+    ]
+
+
+def test_codec(tmp_path, an_object, another_object):
+    pytest.importorskip("orjson")
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class FileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    (tmp_path / "db").mkdir()
+    FileRepository(root_dir=str(tmp_path)).add(an_object)
+    repository = FileRepository(root_dir=str(tmp_path), codec="orjson")
+    repository.add(another_object)
+
+    # Lines written by either codec read back with the other.
+    assert list(repository.find(order_by="id")) == [an_object, another_object]
+    assert list(FileRepository(root_dir=str(tmp_path)).find(order_by="id")) == [
+        an_object,
+        another_object,
+    ]
+
+
+def test_codec_incompatible_with_stored_data(tmp_path, an_object):
+    from fractal_repositories.exceptions import IncompatibleCodecException
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from fractal_repositories.utils.codecs import JsonCodec
+    from tests.fixtures.repositories import AnObject
+
+    class UpperCodec(JsonCodec):
+        def loads(self, data):
+            return {k: v.upper() for k, v in super().loads(data).items()}
+
+    class FileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    (tmp_path / "db").mkdir()
+    FileRepository(root_dir=str(tmp_path)).add(an_object)
+
+    with pytest.raises(IncompatibleCodecException):
+        FileRepository(root_dir=str(tmp_path), codec=UpperCodec())
+
+
+def test_codec_cannot_read_later_record(tmp_path):
+    pytest.importorskip("orjson")
+    from fractal_repositories.exceptions import IncompatibleCodecException
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class FileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    (tmp_path / "db").mkdir()
+    stored = FileRepository(root_dir=str(tmp_path))
+    stored.add_many(
+        [AnObject("1", "a"), AnObject("2", float("inf")), AnObject("3", 2**70)]
+    )
+    before = open(stored._filename).read()
+    repository = FileRepository(root_dir=str(tmp_path), codec="orjson")
+
+    # Stored records, not corrupt lines: never skipped, so never rewritten away.
+    with pytest.raises(IncompatibleCodecException):
+        repository.delete("1")
+    with pytest.raises(IncompatibleCodecException):
+        list(repository.find())
+    assert open(stored._filename).read() == before
+
+
+@pytest.fixture
+def log_repository_class(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class LogFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        log_structured = True
+        compaction_min_records = 10
+
+    (tmp_path / "db").mkdir()
+    return LogFileRepository
+
+
+def _lines(repository):
+    if not os.path.exists(repository._filename):
+        return []
+    with open(repository._filename) as fp:
+        return [json.loads(line) for line in fp]
+
+
+def test_log_structured_update_appends(
+    tmp_path, log_repository_class, an_object, mocker
+):
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    atomic_write = mocker.spy(repository, "_atomic_write")
+
+    repository.update(an_object.update({"name": "update"}))
+
+    atomic_write.assert_not_called()
+    assert _lines(repository) == [
+        {"id": "1", "name": "default_name"},
+        {"id": "1", "name": "update"},
+    ]
+    reopened = log_repository_class(root_dir=str(tmp_path))
+    assert list(reopened.find()) == [an_object.update({"name": "update"})]
+
+
+@pytest.mark.parametrize("log_structured", [False, True])
+def test_update_many_repeated_ids(tmp_path, an_object, another_object, log_structured):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class FileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    FileRepository.log_structured = log_structured
+    repository = FileRepository(root_dir=str(tmp_path))
+    repository.add(an_object)
+    first, last = an_object.update({"name": "first"}), an_object.update(
+        {"name": "last"}
+    )
+
+    assert repository.update_many([first, last, another_object]) == 2
+    assert repository.update_many([another_object] * 2, upsert=True) == 2
+
+    reopened = FileRepository(root_dir=str(tmp_path))
+    assert reopened.get(an_object.id).name == "last"
+    assert reopened.count() == 2
+
+
+def test_log_structured_update_not_found(tmp_path, log_repository_class, an_object):
+    from fractal_repositories.exceptions import ObjectNotFoundException
+
+    repository = log_repository_class(root_dir=str(tmp_path))
+
+    with pytest.raises(ObjectNotFoundException):
+        repository.update(an_object)
+    assert repository.update(an_object, upsert=True) == an_object
+    assert list(repository.find()) == [an_object]
+
+
+def test_log_structured_remove_appends_tombstone(
+    tmp_path, log_repository_class, an_object, another_object, mocker
+):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.exceptions import ObjectNotFoundException
+
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+    atomic_write = mocker.spy(repository, "_atomic_write")
+
+    repository.remove_one(Specification.parse(id=an_object.id))
+
+    atomic_write.assert_not_called()
+    assert _lines(repository)[-1] == {"$deleted": "1"}
+    assert list(repository.find()) == [another_object]
+    assert list(repository.entities) == [another_object.id]
+    with pytest.raises(ObjectNotFoundException):
+        repository.remove_one(Specification.parse(id=an_object.id))
+
+
+def test_log_structured_many(tmp_path, log_repository_class, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+
+    assert repository.update_many([an_object.update({"name": "update"})]) == 1
+    assert list(repository.find()) == [
+        another_object,
+        an_object.update({"name": "update"}),
+    ]
+    assert repository.remove_many(Specification.parse(name="update")) == 1
+    assert list(repository.find()) == [another_object]
+    assert repository.remove_many() == 1
+    assert list(repository.find()) == []
+    assert len(_lines(repository)) == 5
+
+
+def test_log_structured_skips_torn_line(
+    tmp_path, log_repository_class, an_object, another_object
+):
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    with open(repository._filename, "a") as fp:
+        fp.write('{"$deleted": "1"}\n{"id": "1", "na')
+
+    assert list(repository.find()) == []
+    # An append after the torn tail starts on a line of its own again.
+    with open(repository._filename, "a") as fp:
+        fp.write("\n")
+    repository.add(another_object)
+    assert list(repository.find()) == [another_object]
+
+
+def test_log_structured_compaction(tmp_path, log_repository_class, an_object):
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+
+    # Counted from the offset index: no full read is needed first.
+    for i in range(4):
+        repository.update(an_object.update({"name": f"name {i}"}))
+    assert len(_lines(repository)) == 5
+
+    # The tenth record reaches compaction_min_records with 9 of them dead.
+    for i in range(5):
+        repository.update(an_object.update({"name": f"again {i}"}))
+    assert _lines(repository) == [{"id": "1", "name": "again 4"}]
+
+
+def test_log_structured_writes_do_not_replay_log(
+    tmp_path, log_repository_class, an_object, another_object, mocker
+):
+    from fractal_repositories.exceptions import ObjectNotFoundException
+
+    log_repository_class(root_dir=str(tmp_path)).add_many([an_object, another_object])
+    repository = log_repository_class(root_dir=str(tmp_path))
+    resolve = mocker.spy(repository, "_resolve_segments")
+    read_lines = mocker.spy(repository, "_read_lines")
+
+    repository.update(an_object.update({"name": "update"}))
+    assert repository.update_many([another_object.update({"name": "many"})]) == 1
+    repository.delete(another_object.id)
+    with pytest.raises(ObjectNotFoundException):
+        repository.delete(another_object.id)
+
+    # Existence is checked and ids read through the offset index.
+    assert repository.get(an_object.id).name == "update"
+    assert repository.count() == 1
+    resolve.assert_not_called()
+    read_lines.assert_not_called()
+    assert list(repository.find()) == [an_object.update({"name": "update"})]
+
+
+def test_compact(tmp_path, log_repository_class, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    repository = log_repository_class(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+    repository.remove_one(Specification.parse(id=an_object.id))
+
+    repository.compact()
+
+    assert _lines(repository) == [{"id": "2", "name": "another_name"}]
+    assert list(repository.find()) == [another_object]
+
+
+@pytest.fixture
+def indexed_repository_class(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class IndexedFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        offset_index = True
+
+    (tmp_path / "db").mkdir()
+    return IndexedFileRepository
+
+
+def test_offset_index_get(
+    tmp_path, indexed_repository_class, an_object, another_object, mocker
+):
+    from fractal_repositories.exceptions import ObjectNotFoundException
+
+    repository = indexed_repository_class(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+    repository.count()  # builds the index
+    scan = mocker.patch.object(
+        type(repository), "_get_entities", new_callable=mocker.PropertyMock
+    )
+
+    assert repository.get(another_object.id) == another_object
+    assert repository.get_many([another_object.id, an_object.id]) == [
+        another_object,
+        an_object,
+    ]
+    with pytest.raises(ObjectNotFoundException):
+        repository.get("absent")
+    scan.assert_not_called()
+
+
+def test_offset_index_follows_writes(
+    tmp_path, indexed_repository_class, an_object, another_object
+):
+    from fractal_specifications.generic.specification import Specification
+
+    repository = indexed_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    assert repository.get(an_object.id) == an_object
+
+    repository.add(another_object)
+    assert repository.get(another_object.id) == another_object
+    assert repository.count() == 2
+
+    repository.update(an_object.update({"name": "update"}))
+    assert repository.get(an_object.id).name == "update"
+
+    repository.remove_one(Specification.parse(id=another_object.id))
+    assert repository.count() == 1
+    assert list(repository.find(Specification.parse(id__in=["1", "2"]))) == [
+        an_object.update({"name": "update"})
+    ]
+
+
+def test_offset_index_count(tmp_path, indexed_repository_class, an_object, mocker):
+    repository = indexed_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    with open(repository._filename, "a") as fp:
+        fp.write('{"corrupt"\n{"id": "2", "na')
+
+    scan = mocker.patch.object(
+        type(repository), "_get_entities", new_callable=mocker.PropertyMock
+    )
+    assert repository.count() == 1
+    scan.assert_not_called()
+
+
+def test_offset_index_log_structured(tmp_path, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class IndexedLogRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        log_structured = True
+        offset_index = True
+
+    (tmp_path / "db").mkdir()
+    repository = IndexedLogRepository(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+    repository.update(an_object.update({"name": "update"}))
+    repository.remove_one(Specification.parse(id=another_object.id))
+
+    assert repository.count() == 1
+    assert repository.get(an_object.id).name == "update"
+    assert repository.get_many([another_object.id]) == []
+
+
+def test_offset_index_persisted(tmp_path, an_object, another_object, mocker):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class PersistedIndexRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        offset_index = True
+        persist_offset_index = True
+
+    (tmp_path / "db").mkdir()
+    repository = PersistedIndexRepository(root_dir=str(tmp_path))
+    repository.add(an_object)
+    repository.count()
+    assert os.path.exists(repository._filename + ".idx")
+    repository.add(another_object)
+
+    reopened = PersistedIndexRepository(root_dir=str(tmp_path))
+    parse = mocker.patch.object(
+        reopened._offset_index(reopened._filename),
+        "parse",
+        side_effect=reopened._index_record,
+    )
+
+    assert reopened.get(another_object.id) == another_object
+    # Only the line appended after the index was saved is parsed.
+    assert parse.call_count == 1
+
+
+@pytest.fixture(params=["json", "orjson"])
+def mapped_repository(request, tmp_path):
+    pytest.importorskip(request.param)
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class MappedFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        memory_map = True
+
+    (tmp_path / "db").mkdir()
+    return MappedFileRepository(root_dir=str(tmp_path), codec=request.param)
+
+
+def test_memory_map_empty(mapped_repository):
+    assert list(mapped_repository.find()) == []
+    assert mapped_repository.count() == 0
+
+
+def test_memory_map_find(mapped_repository, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    mapped_repository.add_many([an_object, another_object])
+
+    assert list(mapped_repository.find()) == [an_object, another_object]
+    assert mapped_repository.find_one(Specification.parse(id="1")) == an_object
+    assert mapped_repository.get(another_object.id) == another_object
+
+
+def test_memory_map_skips_corrupt_lines(mapped_repository, an_object, caplog):
+    with open(mapped_repository._filename, "wb") as fp:
+        fp.write(
+            b"\n"
+            b"   \r\n"
+            b'\x00{"id": "1", "name": "nulls"}\x00\n'
+            b'  {"id": "2", "name": "padded"}\r\n'
+            b"{corrupt\n"
+            b'{"id": "3"}\n'
+            b'{"id": "4", "na'
+        )
+
+    assert list(mapped_repository.find()) == [
+        an_object.update({"name": "nulls"}),
+        an_object.update({"id": "2", "name": "padded"}),
+        an_object.update({"id": "3"}),
+    ]
+    assert [r.getMessage().split(" in ")[0] for r in caplog.records] == [
+        "Skipping malformed line 5",
+        "Skipping malformed line 7",
+    ]
+
+
+def test_memory_map_last_line_unterminated(mapped_repository, an_object):
+    with open(mapped_repository._filename, "w") as fp:
+        fp.write('{"id": "1", "name": "default_name"}')
+
+    assert list(mapped_repository.find()) == [an_object]
+
+
+def test_memory_map_log_structured(tmp_path, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class MappedLogRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        log_structured = True
+        memory_map = True
+
+    (tmp_path / "db").mkdir()
+    repository = MappedLogRepository(root_dir=str(tmp_path))
+    repository.add_many([an_object, another_object])
+    repository.remove_one(Specification.parse(id=an_object.id))
+
+    assert list(repository.find()) == [another_object]
+
+
+def test_memory_map_small_windows(mapped_repository, an_object, caplog):
+    # Lines longer than the window, and windows ending mid-file.
+    mapped_repository._MAP_WINDOW = 16
+    objects = [an_object.update({"id": str(i), "name": "x" * i}) for i in range(40)]
+    mapped_repository.add_many(objects)
+    with open(mapped_repository._filename, "a") as fp:
+        fp.write("{corrupt\n\n")
+    mapped_repository.add(an_object)
+
+    assert list(mapped_repository.find()) == objects + [an_object]
+    assert "Skipping malformed line 41" in caplog.text
+
+
+@pytest.fixture
+def durable_repository_class(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class DurableFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    (tmp_path / "db").mkdir()
+    return DurableFileRepository
+
+
+def test_durability_unknown(tmp_path, durable_repository_class):
+    with pytest.raises(ValueError):
+        durable_repository_class(root_dir=str(tmp_path), durability="never")
+
+
+@pytest.mark.parametrize("durability, fsyncs", [("os", 0), ("always", 2)])
+def test_durability_immediate(
+    tmp_path,
+    durable_repository_class,
+    an_object,
+    another_object,
+    mocker,
+    durability,
+    fsyncs,
+):
+    repository = durable_repository_class(root_dir=str(tmp_path), durability=durability)
+    fsync = mocker.spy(os, "fsync")
+
+    repository.add(an_object)
+    repository.add_many([another_object])
+
+    assert fsync.call_count == fsyncs
+    assert len(_lines(repository)) == 2
+
+
+def test_durability_batch(
+    tmp_path, durable_repository_class, an_object, another_object, mocker
+):
+    repository = durable_repository_class(
+        root_dir=str(tmp_path), durability="batch", flush_entities=3, flush_ms=60_000
+    )
+    fsync = mocker.spy(os, "fsync")
+
+    repository.add(an_object)
+    repository.add(another_object)
+    assert _lines(repository) == []
+
+    # The third buffered line commits all three with one write and one fsync.
+    repository.add(an_object.update({"id": "3"}))
+    assert len(_lines(repository)) == 3
+    fsync.assert_called_once()
+
+
+def test_durability_batch_interval(tmp_path, durable_repository_class, an_object):
+    repository = durable_repository_class(
+        root_dir=str(tmp_path), durability="batch", flush_ms=0
+    )
+
+    repository.add(an_object)
+
+    assert len(_lines(repository)) == 1
+
+
+def test_durability_batch_timer(tmp_path, durable_repository_class, an_object):
+    repository = durable_repository_class(
+        root_dir=str(tmp_path), durability="batch", flush_ms=10
+    )
+
+    repository.add(an_object)
+    repository._flush_timer.join(5)
+
+    # Flushed without another write or a flush() call.
+    assert len(_lines(repository)) == 1
+    assert repository._flush_timer is None
+
+
+def test_durability_batch_flushed_at_exit(tmp_path, durable_repository_class):
+    from tests.fixtures.repositories import AnObject
+
+    # A fresh interpreter that exits without calling flush().
+    script = f"""
+from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+from tests.fixtures.repositories import AnObject
+
+class DurableFileRepository(FileRepositoryMixin[AnObject]):
+    entity = AnObject
+
+repository = DurableFileRepository(
+    root_dir={str(tmp_path)!r}, durability="batch", flush_ms=60_000
+)
+repository.add(AnObject("1", "a"))
+"""
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=os.getcwd())
+
+    repository = durable_repository_class(root_dir=str(tmp_path))
+    assert list(repository.find()) == [AnObject("1", "a")]
+
+
+def test_durability_batch_reads_flush(
+    tmp_path, durable_repository_class, an_object, another_object
+):
+    repository = durable_repository_class(
+        root_dir=str(tmp_path), durability="batch", flush_ms=60_000
+    )
+    repository.add(an_object)
+    repository.add(another_object)
+
+    assert list(repository.find()) == [an_object, another_object]
+    assert len(_lines(repository)) == 2
+
+
+def test_durability_batch_context_manager(
+    tmp_path, durable_repository_class, an_object, another_object
+):
+    with durable_repository_class(
+        root_dir=str(tmp_path), durability="batch", flush_ms=60_000
+    ) as repository:
+        repository.add_many([an_object, another_object])
+        assert _lines(repository) == []
+
+    assert len(_lines(repository)) == 2
+
+
+def test_flush_nothing_buffered(tmp_path, durable_repository_class, mocker):
+    repository = durable_repository_class(root_dir=str(tmp_path), durability="batch")
+    opened = mocker.patch("builtins.open")
+
+    repository.flush()
+
+    opened.assert_not_called()
+
+
+@pytest.fixture
+def locking_repository_class(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class LockingFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        locking = True
+
+    (tmp_path / "db").mkdir()
+    return LockingFileRepository
+
+
+def test_locking_crud(tmp_path, locking_repository_class, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    repository.add_many([another_object])
+    repository.update(an_object.update({"name": "update"}))
+
+    assert list(repository.find()) == [
+        another_object,
+        an_object.update({"name": "update"}),
+    ]
+    repository.remove_one(Specification.parse(id=another_object.id))
+    assert repository.count() == 1
+    assert repository.remove_many() == 1
+    assert list(repository.find()) == []
+
+
+def test_locking_lock_modes(tmp_path, locking_repository_class, an_object, mocker):
+    import fcntl
+
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    flock = mocker.spy(fcntl, "flock")
+
+    repository.add(an_object)
+    assert [c.args[1] for c in flock.call_args_list] == [fcntl.LOCK_EX, fcntl.LOCK_UN]
+    flock.reset_mock()
+
+    repository.get(an_object.id)
+    assert [c.args[1] for c in flock.call_args_list] == [fcntl.LOCK_SH, fcntl.LOCK_UN]
+    flock.reset_mock()
+
+    # Reads inside a write are covered by its exclusive lock.
+    repository.update(an_object)
+    assert [c.args[1] for c in flock.call_args_list] == [fcntl.LOCK_EX, fcntl.LOCK_UN]
+    assert repository._filename + ".lock" in [
+        os.path.join(tmp_path, "db", name) for name in os.listdir(tmp_path / "db")
+    ]
+
+
+def test_locking_lock_upgrade(tmp_path, locking_repository_class, mocker):
+    import fcntl
+
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    flock = mocker.spy(fcntl, "flock")
+
+    with repository._locked():
+        with repository._locked(exclusive=True):
+            with repository._locked():
+                pass
+
+    assert [c.args[1] for c in flock.call_args_list] == [
+        fcntl.LOCK_SH,
+        fcntl.LOCK_EX,
+        fcntl.LOCK_SH,
+        fcntl.LOCK_UN,
+    ]
+
+
+def test_locking_reads_only_appended_tail(
+    tmp_path, locking_repository_class, an_object, another_object, mocker
+):
+    reader = locking_repository_class(root_dir=str(tmp_path))
+    writer = locking_repository_class(root_dir=str(tmp_path))
+    writer.add(an_object)
+    assert list(reader.find()) == [an_object]
+    record = mocker.spy(reader, "_record")
+
+    assert list(reader.find()) == [an_object]
+    record.assert_not_called()
+
+    writer.add(another_object)
+    assert list(reader.find()) == [an_object, another_object]
+    record.assert_called_once()
+
+
+def test_locking_rereads_after_rewrite(
+    tmp_path, locking_repository_class, an_object, another_object
+):
+    from fractal_specifications.generic.specification import Specification
+
+    reader = locking_repository_class(root_dir=str(tmp_path))
+    writer = locking_repository_class(root_dir=str(tmp_path))
+    writer.add_many([an_object, another_object])
+    assert reader.count() == 2
+
+    writer.remove_one(Specification.parse(id=an_object.id))
+
+    assert list(reader.find()) == [another_object]
+
+
+def test_locking_unterminated_last_line(tmp_path, locking_repository_class, an_object):
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    with open(repository._filename, "w") as fp:
+        fp.write('{"id": "1", "name": "default_name"}')
+    assert list(repository.find()) == [an_object]
+
+    with open(repository._filename, "a") as fp:
+        fp.write('\n{"id": "2", "na')
+    assert list(repository.find()) == [an_object]
+
+
+def test_locking_log_structured(tmp_path, an_object, another_object):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class LockingLogRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        log_structured = True
+        locking = True
+
+    (tmp_path / "db").mkdir()
+    reader = LockingLogRepository(root_dir=str(tmp_path))
+    writer = LockingLogRepository(root_dir=str(tmp_path))
+    writer.add_many([an_object, another_object])
+    assert reader.count() == 2
+
+    writer.update(an_object.update({"name": "update"}))
+    writer.remove_one(Specification.parse(id=another_object.id))
+
+    assert list(reader.find()) == [an_object.update({"name": "update"})]
+
+
+def test_locking_reopens_lock_file_after_fork(
+    tmp_path, locking_repository_class, an_object, mocker
+):
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    repository.add(an_object)
+    fd = repository._lock_fd
+
+    mocker.patch("os.getpid", return_value=os.getpid() + 1)
+    repository.add(an_object)
+
+    assert repository._lock_fd != fd
+
+
+def _add_concurrently(root_dir, worker, count):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class LockingFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        locking = True
+
+    repository = LockingFileRepository(root_dir=root_dir)
+    for i in range(count):
+        repository.add(AnObject(f"{worker}-{i}"))
+        if i % 5 == 4:
+            # A rewrite that must not lose the other workers' appends.
+            repository.remove_one(Specification.parse(id=f"{worker}-{i}"))
+
+
+def test_locking_concurrent_processes(tmp_path, locking_repository_class):
+    import multiprocessing
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_add_concurrently, args=(str(tmp_path), worker, 20))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in workers)
+    repository = locking_repository_class(root_dir=str(tmp_path))
+    assert sorted(e.id for e in repository.find()) == sorted(
+        f"{worker}-{i}" for worker in range(4) for i in range(20) if i % 5 != 4
+    )
+
+
+@pytest.fixture
+def reading_repository_class(tmp_path):
+    from dataclasses import dataclass
+    from datetime import date
+
+    from fractal_repositories.core.entity import Entity
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+
+    @dataclass
+    class Reading(Entity):
+        id: str
+        day: date
+        value: int = 0
+
+        def __post_init__(self):
+            if isinstance(self.day, str):
+                self.day = date.fromisoformat(self.day)
+
+    class ReadingRepository(FileRepositoryMixin[Reading]):
+        entity = Reading
+        partition_by = "day"
+
+    (tmp_path / "db").mkdir()
+    return ReadingRepository
+
+
+def _segment_names(repository):
+    return sorted(os.listdir(repository._segment_dir))
+
+
+def test_partitions_exclusive(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class Both(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        partitions = 4
+        partition_by = "name"
+
+    with pytest.raises(ValueError):
+        Both(root_dir=str(tmp_path))
+
+
+def test_hash_partitions(tmp_path, an_object, another_object, mocker):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class HashedRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        partitions = 16
+
+    (tmp_path / "db").mkdir()
+    repository = HashedRepository(root_dir=str(tmp_path))
+    objects = [AnObject(str(i), f"name{i}") for i in range(20)]
+    repository.add_many(objects)
+    repository.add(an_object.update({"id": "a"}))
+
+    assert 1 < len(_segment_names(repository)) <= 16
+    assert not os.path.exists(repository._filename)
+    assert sorted(e.id for e in repository.find()) == sorted(
+        [*(o.id for o in objects), "a"]
+    )
+    opened = mocker.spy(repository, "_read_lines")
+    assert repository.get("7") == objects[7]
+    assert len(opened.call_args_list) == 1
+
+    atomic_write = mocker.spy(repository, "_atomic_write")
+    repository.remove_one(Specification.parse(id="7"))
+    assert atomic_write.call_count == 1
+    assert repository.count() == 20
+    assert HashedRepository(root_dir=str(tmp_path)).count() == 20
+
+
+def test_partition_by_field(tmp_path, reading_repository_class, mocker):
+    from datetime import date
+
+    from fractal_specifications.generic.specification import Specification
+
+    repository = reading_repository_class(root_dir=str(tmp_path))
+    entity = repository.entity
+    readings = [entity(str(i), date(2024, 1, 1 + i % 3), i) for i in range(9)]
+    repository.add_many(readings)
+
+    assert _segment_names(repository) == [
+        "2024-01-01.jsonl",
+        "2024-01-02.jsonl",
+        "2024-01-03.jsonl",
+    ]
+    opened = mocker.spy(repository, "_read_lines")
+    assert [
+        r.id for r in repository.find(Specification.parse(day=date(2024, 1, 2)))
+    ] == [
+        "1",
+        "4",
+        "7",
+    ]
+    assert [c.args[0] for c in opened.call_args_list] == [
+        os.path.join(repository._segment_dir, "2024-01-02.jsonl")
+    ]
+
+    opened.reset_mock()
+    found = repository.find(Specification.parse(day__gte=date(2024, 1, 2), value__lt=5))
+    assert sorted(r.id for r in found) == ["1", "2", "4"]
+    assert len(opened.call_args_list) == 2
+
+    opened.reset_mock()
+    assert repository.count(Specification.parse(value=4)) == 1
+    assert len(opened.call_args_list) == 3
+
+
+def test_partition_by_rewrites_one_segment(tmp_path, reading_repository_class):
+    from datetime import date
+
+    from fractal_specifications.generic.specification import Specification
+
+    repository = reading_repository_class(root_dir=str(tmp_path))
+    entity = repository.entity
+    repository.add_many([entity(str(i), date(2024, 1, 1 + i % 2), i) for i in range(4)])
+    other = os.path.join(repository._segment_dir, "2024-01-02.jsonl")
+    inode = os.stat(other).st_ino
+
+    repository.update(entity("0", date(2024, 1, 1), 10))
+    assert repository.remove_many(Specification.parse(value__gt=5)) == 1
+    assert os.stat(other).st_ino == inode
+
+    # An update to another day moves the entity.
+    repository.update(entity("1", date(2024, 1, 1), 11))
+    assert sorted((r.id, r.day.day) for r in repository.find()) == [
+        ("1", 1),
+        ("2", 1),
+        ("3", 2),
+    ]
+
+    # A partition left empty is deleted.
+    repository.remove_one(Specification.parse(id="3"))
+    assert _segment_names(repository) == ["2024-01-01.jsonl"]
+    assert repository.update_many([entity("2", date(2024, 1, 5), 2)]) == 1
+    assert _segment_names(repository) == ["2024-01-01.jsonl", "2024-01-05.jsonl"]
+    assert repository.get("2").day == date(2024, 1, 5)
+
+
+def test_partition_by_log_structured(tmp_path, reading_repository_class, mocker):
+    from datetime import date
+
+    from fractal_specifications.generic.specification import Specification
+
+    class LogReadingRepository(reading_repository_class):
+        log_structured = True
+
+    repository = LogReadingRepository(root_dir=str(tmp_path))
+    entity = repository.entity
+    repository.add_many([entity(str(i), date(2024, 1, 1 + i % 2), i) for i in range(4)])
+    atomic_write = mocker.spy(repository, "_atomic_write")
+
+    repository.update(entity("0", date(2024, 1, 2), 10))
+    repository.remove_one(Specification.parse(id="1"))
+    atomic_write.assert_not_called()
+    assert sorted((r.id, r.day.day) for r in repository.find()) == [
+        ("0", 2),
+        ("2", 1),
+        ("3", 2),
+    ]
+
+    repository.compact()
+    assert _segment_names(repository) == ["2024-01-01.jsonl", "2024-01-02.jsonl"]
+    reopened = LogReadingRepository(root_dir=str(tmp_path))
+    assert reopened.count() == 3
+    assert reopened.get("0").value == 10
+
+
+def test_partition_by_offset_index_and_batch(tmp_path, reading_repository_class):
+    from datetime import date
+
+    class IndexedReadingRepository(reading_repository_class):
+        offset_index = True
+
+    repository = IndexedReadingRepository(root_dir=str(tmp_path), durability="batch")
+    entity = repository.entity
+    with repository:
+        repository.add(entity("1", date(2024, 1, 1)))
+        repository.add(entity("2", date(2024, 1, 2)))
+    assert repository.get("2").day == date(2024, 1, 2)
+    assert repository.count() == 2
+
+
+def test_partition_by_unprunable_field(tmp_path, mocker):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class ByNameRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        partition_by = "name"
+
+    (tmp_path / "db").mkdir()
+    repository = ByNameRepository(root_dir=str(tmp_path))
+    repository.add_many([AnObject("1", "a/b"), AnObject("2", "c")])
+    assert _segment_names(repository) == ["a%2Fb.jsonl", "c.jsonl"]
+
+    opened = mocker.spy(repository, "_read_lines")
+    assert repository.find_one(Specification.parse(name="a/b")).id == "1"
+    assert len(opened.call_args_list) == 1
+
+
+@pytest.fixture
+def compressed_repository_class(tmp_path):
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from tests.fixtures.repositories import AnObject
+
+    class CompressedFileRepository(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        compression = "gzip"
+        compression_block_size = 256
+
+    (tmp_path / "db").mkdir()
+    return CompressedFileRepository
+
+
+def test_compression_crud(tmp_path, compressed_repository_class):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.utils.compression import BLOCK_MAGIC
+    from tests.fixtures.repositories import AnObject
+
+    repository = compressed_repository_class(root_dir=str(tmp_path))
+    objects = [AnObject(str(i), "name" * 10) for i in range(100)]
+    repository.add_many(objects)
+    repository.add(AnObject("extra"))
+    repository.update(objects[5].update({"name": "update"}))
+    repository.remove_one(Specification.parse(id="7"))
+
+    with open(repository._filename, "rb") as fp:
+        stored = fp.read()
+    assert stored.startswith(BLOCK_MAGIC)
+    assert stored.count(BLOCK_MAGIC) > 1  # rewritten in several blocks
+    assert len(stored) < sum(len(json.dumps(o.asdict())) for o in objects) // 2
+
+    reopened = compressed_repository_class(root_dir=str(tmp_path))
+    assert reopened.count() == 100
+    assert reopened.get("5").name == "update"
+    assert reopened.get("extra") == AnObject("extra")
+
+
+def test_compression_skips_torn_block(tmp_path, compressed_repository_class, caplog):
+    from tests.fixtures.repositories import AnObject
+
+    repository = compressed_repository_class(root_dir=str(tmp_path))
+    repository.add(AnObject("1"))
+    repository.add(AnObject("2"))
+    with open(repository._filename, "rb+") as fp:
+        fp.truncate(os.path.getsize(repository._filename) - 3)
+    assert [e.id for e in repository.find()] == ["1"]
+
+    # A torn block followed by later appends is skipped like a torn line.
+    repository.add(AnObject("3"))
+    assert [e.id for e in repository.find()] == ["1", "3"]
+    assert "damaged" in caplog.text
+
+
+def test_compression_offset_index(tmp_path, compressed_repository_class, mocker):
+    from fractal_repositories.utils import offset_index
+    from tests.fixtures.repositories import AnObject
+
+    class IndexedCompressedRepository(compressed_repository_class):
+        offset_index = True
+        persist_offset_index = True
+
+    repository = IndexedCompressedRepository(root_dir=str(tmp_path))
+    repository.add_many([AnObject(str(i), "name" * 10) for i in range(100)])
+    repository.compact()
+    assert repository.count() == 100
+
+    reopened = IndexedCompressedRepository(root_dir=str(tmp_path))
+    blocks = mocker.spy(offset_index, "read_blocks")
+    assert reopened.get("42").id == "42"
+    assert blocks.call_count == 1
+    assert [e.id for e in reopened.get_many(["3", "98"])] == ["3", "98"]
+
+
+def test_compression_switched(tmp_path, an_object):
+    from fractal_specifications.generic.specification import Specification
+
+    from fractal_repositories.mixins.file_repository_mixin import FileRepositoryMixin
+    from fractal_repositories.utils.compression import BLOCK_MAGIC
+    from tests.fixtures.repositories import AnObject
+
+    class Table(FileRepositoryMixin[AnObject]):
+        entity = AnObject
+        log_structured = True
+
+    def stored():
+        with open(repository._filename, "rb") as fp:
+            return fp.read()
+
+    (tmp_path / "db").mkdir()
+    repository = Table(root_dir=str(tmp_path))
+    repository.add(an_object)
+    repository.remove_one(Specification.parse(id=an_object.id))
+    repository.add(an_object)
+    plain = stored()
+
+    Table.compression = "gzip"
+    repository = Table(root_dir=str(tmp_path))
+    assert stored().startswith(BLOCK_MAGIC)
+    assert list(repository.find()) == [an_object]
+
+    # Converted line for line, tombstone included, and back.
+    Table.compression = ""
+    repository = Table(root_dir=str(tmp_path))
+    assert stored() == plain
+
+
+def test_compression_log_structured_partitioned_locking(
+    tmp_path, compressed_repository_class
+):
+    from fractal_specifications.generic.specification import Specification
+
+    from tests.fixtures.repositories import AnObject
+
+    class Repository(compressed_repository_class):
+        log_structured = True
+        partitions = 4
+        locking = True
+
+    repository = Repository(root_dir=str(tmp_path))
+    repository.add_many([AnObject(str(i)) for i in range(10)])
+    repository.update(AnObject("3", "update"))
+    repository.remove_one(Specification.parse(id="4"))
+
+    other = Repository(root_dir=str(tmp_path))
+    assert other.count() == 9
+    assert other.get("3").name == "update"
+    repository.compact()
+    assert other.count() == 9
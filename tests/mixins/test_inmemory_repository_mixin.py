@@ -127,3 +127,179 @@ def test_find_with_specification_empty(inmemory_repository, an_object):
     from fractal_specifications.generic.specification import Specification
 
     assert len(list(inmemory_repository.find(Specification.parse(id=2)))) == 0
+
+
+def test_add_many(inmemory_repository, an_object, another_object):
+    assert inmemory_repository.add_many(iter([an_object, another_object])) == 2
+
+    assert inmemory_repository.count() == 2
+
+
+def test_update_many(inmemory_repository, an_object, another_object):
+    inmemory_repository.add(an_object)
+    an_object.name = "update"
+
+    assert inmemory_repository.update_many([an_object, another_object]) == 1
+    assert inmemory_repository.count() == 1
+    assert inmemory_repository.get(an_object.id).name == "update"
+
+    assert inmemory_repository.update_many([another_object], upsert=True) == 1
+    assert inmemory_repository.count() == 2
+
+
+def test_update_many_repeated_ids(inmemory_repository, an_object, another_object):
+    inmemory_repository.add(an_object)
+    first, last = an_object.update({"name": "first"}), an_object.update(
+        {"name": "last"}
+    )
+
+    assert inmemory_repository.update_many([first, last, another_object]) == 2
+    assert inmemory_repository.get(an_object.id).name == "last"
+
+
+def test_remove_many(inmemory_repository, an_object, another_object):
+    inmemory_repository.add_many([an_object, another_object])
+
+    assert inmemory_repository.remove_many(Specification.parse(id="absent")) == 0
+    assert inmemory_repository.remove_many(Specification.parse(id=an_object.id)) == 1
+    assert inmemory_repository.remove_many() == 1
+    assert inmemory_repository.count() == 0
+
+
+def test_get_many(inmemory_repository, an_object, another_object):
+    inmemory_repository.add_many([an_object, another_object])
+
+    assert inmemory_repository.get_many(
+        [another_object.id, "absent", an_object.id]
+    ) == [
+        another_object,
+        an_object,
+    ]
+
+
+@pytest.fixture
+def indexed_repository():
+    from fractal_repositories.mixins.inmemory_repository_mixin import (
+        InMemoryRepositoryMixin,
+    )
+    from tests.fixtures.repositories import C
+
+    class InMemoryIndexedRepository(InMemoryRepositoryMixin[C]):
+        entity = C
+        indexes = ["name", ("number", "extra")]
+
+    repository = InMemoryIndexedRepository()
+    repository.add_many(
+        [
+            C(1, "a", 1, "x"),
+            C(2, "b", 1, "y"),
+            C(3, "a", 2, "x"),
+            C(4, "c", 1, "x"),
+        ]
+    )
+    return repository
+
+
+def _forbid_scan(mocker, repository):
+    mocker.patch.object(
+        type(repository),
+        "_get_entities",
+        new_callable=mocker.PropertyMock,
+        side_effect=AssertionError("full scan"),
+    )
+
+
+def test_indexed_find(indexed_repository, mocker):
+    _forbid_scan(mocker, indexed_repository)
+
+    assert [e.id for e in indexed_repository.find(Specification.parse(name="a"))] == [
+        1,
+        3,
+    ]
+    assert indexed_repository.count(Specification.parse(number=1, extra="x")) == 2
+    assert indexed_repository.find_one(Specification.parse(name__in=["c"])).id == 4
+    assert indexed_repository.get(2).name == "b"
+
+
+def test_indexed_find_rechecks_specification(indexed_repository):
+    spec = Specification.parse(name="a", number__gt=1)
+
+    assert [e.id for e in indexed_repository.find(spec)] == [3]
+
+
+def test_indexed_update_and_remove(indexed_repository):
+    from tests.fixtures.repositories import C
+
+    indexed_repository.update(C(1, "b", 1, "x"))
+    indexed_repository.remove_one(Specification.parse(id=4))
+    indexed_repository.remove_many(Specification.parse(name="a"))
+
+    assert [e.id for e in indexed_repository.find(Specification.parse(name="b"))] == [
+        1,
+        2,
+    ]
+    assert indexed_repository.count(Specification.parse(number=1, extra="x")) == 1
+
+
+def test_indexed_assigned_entities(indexed_repository):
+    from tests.fixtures.repositories import C
+
+    indexed_repository.entities = {5: C(5, "a")}
+
+    assert [e.id for e in indexed_repository.find(Specification.parse(name="a"))] == [5]
+
+
+@pytest.fixture
+def sorted_repository():
+    from fractal_repositories.mixins.inmemory_repository_mixin import (
+        InMemoryRepositoryMixin,
+    )
+    from tests.fixtures.repositories import C
+
+    class InMemorySortedRepository(InMemoryRepositoryMixin[C]):
+        entity = C
+        sorted_indexes = ["number"]
+
+    repository = InMemorySortedRepository()
+    repository.add_many(
+        [C(1, "a", 3), C(2, "b", 1), C(3, "c", 2), C(4, "d", 1), C(5, "e", 3)]
+    )
+    return repository
+
+
+def test_sorted_index_find(sorted_repository, mocker):
+    _forbid_scan(mocker, sorted_repository)
+
+    assert [e.id for e in sorted_repository.find(order_by="number")] == [
+        2,
+        4,
+        3,
+        1,
+        5,
+    ]
+    assert [
+        e.id for e in sorted_repository.find(order_by="-number", offset=1, limit=2)
+    ] == [5, 3]
+    assert [
+        e.id for e in sorted_repository.find(Specification.parse(number__gte=2))
+    ] == [1, 3, 5]
+    assert [
+        e.id
+        for e in sorted_repository.find(
+            Specification.parse(name__in=["a", "b", "c"]), order_by="number", limit=2
+        )
+    ] == [2, 3]
+
+
+def test_find_top_k(inmemory_c_repository, mocker):
+    import heapq
+
+    from tests.fixtures.repositories import C
+
+    inmemory_c_repository.add_many([C(i, str(i % 3), i % 4) for i in range(20)])
+    sort = mocker.spy(heapq, "nsmallest")
+
+    found = list(inmemory_c_repository.find(order_by="-number", offset=2, limit=3))
+
+    sort.assert_called_once()
+    assert [(e.number, e.id) for e in found] == [(3, 11), (3, 15), (3, 19)]
@@ -1,5 +1,8 @@
 import json
+import re
 from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
 from typing import Optional
 
 import pytest
@@ -214,12 +217,12 @@ class Item(Entity):
     status: str = "new"
 
 
-@pytest.fixture
-def item_repository(tmp_path):
+@pytest.fixture(params=["operation", "thread"])
+def item_repository(request, tmp_path):
     class ItemRepository(SqliteRepositoryMixin[Item]):
         entity = Item
 
-    repo = ItemRepository(root_dir=str(tmp_path))
+    repo = ItemRepository(root_dir=str(tmp_path), connection=request.param)
     repo.add(Item("a", n=1, opt=None, status="new"))
     repo.add(Item("b", n=5, opt=7, status="done"))
     repo.add(Item("c", n=9, opt=None, status="done"))
@@ -375,3 +378,1084 @@ def test_skips_unbuildable_rows(sqlite_repository, an_object, caplog):
     ids = {e.id for e in found}
     assert ids == {an_object.id}
     assert any("Skipping stale row" in r.message for r in caplog.records)
+
+
+def test_add_many(sqlite_repository, an_object, another_object):
+    assert (
+        sqlite_repository.add_many(iter([an_object, another_object]), batch_size=1) == 2
+    )
+
+    assert sqlite_repository.count() == 2
+
+
+def test_update_many(sqlite_repository, an_object, another_object):
+    sqlite_repository.add(an_object)
+    an_object.name = "update"
+
+    assert sqlite_repository.update_many([an_object, another_object]) == 1
+    assert sqlite_repository.count() == 1
+    assert sqlite_repository.get(an_object.id).name == "update"
+
+    assert sqlite_repository.update_many([another_object], upsert=True) == 1
+    assert sqlite_repository.count() == 2
+
+
+def test_update_many_repeated_ids(sqlite_repository, an_object, another_object):
+    sqlite_repository.add(an_object)
+    first, last = an_object.update({"name": "first"}), an_object.update(
+        {"name": "last"}
+    )
+
+    assert sqlite_repository.update_many([first, last, another_object]) == 2
+    assert sqlite_repository.get(an_object.id).name == "last"
+    assert sqlite_repository.update_many([another_object] * 2, upsert=True) == 2
+    assert sqlite_repository.count() == 2
+
+
+def test_update_many_cross_type_id_does_not_match(sqlite_repository):
+    @dataclass
+    class IntEntity(Entity):
+        id: int
+
+    class IntRepo(SqliteRepositoryMixin[IntEntity]):
+        entity = IntEntity
+
+    repo = IntRepo(root_dir=sqlite_repository.root_dir)
+    repo.add(IntEntity(42))
+
+    assert repo.update_many([IntEntity("42")]) == 0  # type: ignore[arg-type]
+    assert repo.update_many([IntEntity(42)]) == 1
+
+
+def test_remove_many(item_repository):
+    from fractal_specifications.generic.operators import (
+        ContainsSpecification,
+        EqualsSpecification,
+    )
+
+    assert item_repository.remove_many(EqualsSpecification("status", "absent")) == 0
+    assert item_repository.remove_many(ContainsSpecification("status", "ew")) == 1
+    assert item_repository.remove_many(EqualsSpecification("status", "done")) == 2
+    assert item_repository.count() == 0
+
+
+def test_remove_many_all(item_repository):
+    assert item_repository.remove_many() == 3
+    assert item_repository.count() == 0
+
+
+def test_get_many(sqlite_repository, an_object, another_object):
+    sqlite_repository.add_many([an_object, another_object])
+    sqlite_repository.get_many_chunk_size = 1
+
+    assert sqlite_repository.get_many([another_object.id, "absent", an_object.id]) == [
+        another_object,
+        an_object,
+    ]
+
+
+def test_get_many_cross_type_id_does_not_match(sqlite_repository):
+    @dataclass
+    class IntEntity(Entity):
+        id: int
+
+    class IntRepo(SqliteRepositoryMixin[IntEntity]):
+        entity = IntEntity
+
+    repo = IntRepo(root_dir=sqlite_repository.root_dir)
+    repo.add(IntEntity(42))
+
+    assert repo.get_many(["42"]) == []
+    assert repo.get_many([42]) == [IntEntity(42)]
+
+
+def _page_ids(repository, specification=None, **kwargs):
+    result, page = [], repository.find_page(specification, limit=2, **kwargs)
+    while True:
+        result += [e.id for e in page]
+        if not page.next_cursor:
+            return result
+        page = repository.find_page(
+            specification, limit=2, after=page.next_cursor, **kwargs
+        )
+
+
+def test_find_page(sqlite_repository):
+    sqlite_repository.add_many(
+        AnObject(id, name) for id, name in zip("12345", "babac", strict=True)
+    )
+
+    assert _page_ids(sqlite_repository) == list("12345")
+    assert _page_ids(sqlite_repository, order_by="name") == list("24135")
+    assert _page_ids(sqlite_repository, order_by="-name") == list("51324")
+    assert _page_ids(
+        sqlite_repository, Specification.parse(name__in=["a", "b"])
+    ) == list("1234")
+
+
+def test_find_values(sqlite_repository):
+    sqlite_repository.add_many(
+        AnObject(id, name) for id, name in zip("123", "bac", strict=True)
+    )
+
+    assert list(sqlite_repository.find_values(select=["name"], order_by="-name")) == [
+        {"name": "c"},
+        {"name": "b"},
+        {"name": "a"},
+    ]
+    assert list(
+        sqlite_repository.find_values(
+            Specification.parse(name__in=["a", "b"]),
+            select=["id", "name"],
+            order_by="name",
+            offset=1,
+            limit=1,
+        )
+    ) == [{"id": "1", "name": "b"}]
+    assert list(sqlite_repository.find_values(select=["id"], limit=2)) == [
+        {"id": "1"},
+        {"id": "2"},
+    ]
+
+
+def test_find_values_keeps_json_types(tmp_path):
+    @dataclass
+    class Nested(Entity):
+        id: str
+        tags: list
+        meta: dict
+        score: Optional[float] = None
+
+    class NestedRepo(SqliteRepositoryMixin[Nested]):
+        entity = Nested
+
+    repo = NestedRepo(root_dir=str(tmp_path))
+    repo.add(Nested("1", ["a", "b"], {"k": 1}))
+
+    assert list(repo.find_values(select=["tags", "meta", "score"])) == [
+        {"tags": ["a", "b"], "meta": {"k": 1}, "score": None}
+    ]
+
+
+def test_codec(tmp_path, an_object, another_object):
+    pytest.importorskip("orjson")
+
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    SqliteRepository(root_dir=str(tmp_path)).add(an_object)
+    repository = SqliteRepository(root_dir=str(tmp_path), codec="orjson")
+    repository.add(another_object)
+
+    assert list(repository.find(order_by="id")) == [an_object, another_object]
+    assert list(repository.find(Specification.parse(name="another_name"))) == [
+        another_object
+    ]
+    assert list(repository.find_values(select=["name"], order_by="id")) == [
+        {"name": an_object.name},
+        {"name": another_object.name},
+    ]
+
+
+def test_codec_incompatible_with_stored_data(tmp_path, an_object):
+    from fractal_repositories.exceptions import IncompatibleCodecException
+    from fractal_repositories.utils.codecs import JsonCodec
+
+    class DroppingCodec(JsonCodec):
+        def loads(self, data):
+            return {k: v for k, v in super().loads(data).items() if k != "name"}
+
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    SqliteRepository(root_dir=str(tmp_path)).add(an_object)
+
+    with pytest.raises(IncompatibleCodecException):
+        SqliteRepository(root_dir=str(tmp_path), codec=DroppingCodec())
+
+
+def test_connection_unknown(tmp_path):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    with pytest.raises(ValueError):
+        SqliteRepository(root_dir=str(tmp_path), connection="pool")
+
+
+@pytest.fixture
+def thread_repository(tmp_path):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    return SqliteRepository(
+        root_dir=str(tmp_path), connection="thread", cached_statements=16
+    )
+
+
+def test_thread_connection_reused(thread_repository, an_object, mocker):
+    import sqlite3
+
+    connect = mocker.spy(sqlite3, "connect")
+
+    thread_repository.add(an_object)
+    thread_repository.get(an_object.id)
+    thread_repository.remove_one(Specification.parse(id=an_object.id))
+
+    connect.assert_called_once()
+    assert connect.call_args.kwargs["cached_statements"] == 16
+
+
+def test_thread_connection_per_thread(thread_repository, an_object):
+    import threading
+
+    connections = []
+
+    def work():
+        thread_repository.add(an_object)
+        connections.append(thread_repository._thread_connection())
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    main = thread_repository._thread_connection()
+    assert len({id(conn) for conn in [main, *connections]}) == 3
+    assert thread_repository.count() == 1
+
+
+def test_thread_connection_rolls_back_on_error(thread_repository, an_object):
+    with pytest.raises(RuntimeError):
+        with thread_repository._connect() as conn:
+            conn.execute(
+                f'INSERT INTO "{thread_repository._table}" (id, data) VALUES (?, ?)',
+                (an_object.id, json.dumps(an_object.asdict())),
+            )
+            raise RuntimeError
+
+    assert thread_repository.count() == 0
+
+
+def test_thread_connection_close(thread_repository, an_object):
+    import sqlite3
+
+    thread_repository.add(an_object)
+    conn = thread_repository._thread_connection()
+    thread_repository.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    # A new connection is opened on the next operation.
+    assert thread_repository.get(an_object.id) == an_object
+
+
+def test_thread_connection_reopened_after_fork(thread_repository, an_object):
+    import multiprocessing
+
+    thread_repository.add(an_object)
+    parent = id(thread_repository._thread_connection())
+
+    def child(queue):
+        queue.put(
+            (
+                id(thread_repository._thread_connection()) != parent,
+                thread_repository.count(),
+            )
+        )
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=child, args=(queue,))
+    process.start()
+    process.join()
+
+    assert queue.get() == (True, 1)
+
+
+def _pragma(repository, name):
+    with repository._connect() as conn:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+@pytest.mark.parametrize("connection", ["operation", "thread"])
+def test_pragmas_preset(tmp_path, connection):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(
+        root_dir=str(tmp_path), connection=connection, pragmas="throughput"
+    )
+
+    assert _pragma(repository, "journal_mode") == "wal"
+    assert _pragma(repository, "synchronous") == 1  # NORMAL
+    assert _pragma(repository, "busy_timeout") == 5000
+    assert _pragma(repository, "cache_size") == -65536
+    assert _pragma(repository, "temp_store") == 2  # MEMORY
+
+
+def test_pragmas_default(tmp_path):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(root_dir=str(tmp_path))
+
+    assert repository.pragmas == {}
+    assert _pragma(repository, "journal_mode") == "delete"
+
+
+def test_pragmas_dict(tmp_path, an_object):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(
+        root_dir=str(tmp_path), pragmas={"journal_mode": "wal", "synchronous": "OFF"}
+    )
+    repository.add(an_object)
+
+    assert _pragma(repository, "journal_mode") == "wal"
+    assert _pragma(repository, "synchronous") == 0
+    assert repository.get(an_object.id) == an_object
+
+
+def test_pragmas_applied_once_per_thread_connection(tmp_path, mocker):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(
+        root_dir=str(tmp_path), connection="thread", pragmas="wal"
+    )
+    open_ = mocker.spy(repository, "_open")
+
+    for _ in range(3):
+        repository.count()
+
+    open_.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "pragmas",
+    [
+        "fastest",
+        {"page_size": 4096},
+        {"journal_mode": "wal; DROP TABLE objects"},
+    ],
+)
+def test_pragmas_invalid(tmp_path, pragmas):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    with pytest.raises(ValueError):
+        SqliteRepository(root_dir=str(tmp_path), pragmas=pragmas)
+
+
+def test_pragmas_wal_reader_during_write(tmp_path, an_object):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    writer = SqliteRepository(root_dir=str(tmp_path), pragmas="wal")
+    reader = SqliteRepository(root_dir=str(tmp_path), pragmas="wal")
+    writer.add(an_object)
+
+    with writer._connect() as conn:
+        conn.execute(f'DELETE FROM "{writer._table}"')
+        # The write transaction is still open: the reader sees the last commit.
+        assert reader.get(an_object.id) == an_object
+
+    assert reader.count() == 0
+
+
+@dataclass
+class Task(Entity):
+    id: int
+    title: str
+    priority: int
+    due: date
+    done: bool = False
+    weight: float = 1.0
+
+    def __post_init__(self):
+        if isinstance(self.due, str):
+            self.due = date.fromisoformat(self.due)
+
+
+@dataclass
+class Invoice(Entity):
+    id: str
+    amount: Decimal
+    note: Optional[str] = None
+
+    def __post_init__(self):
+        self.amount = Decimal(self.amount)
+
+
+def _tasks():
+    return [
+        Task(i, f"t{i % 4}", i % 3, date(2024, 1, 1 + i % 5), i % 2 == 0, i / 3)
+        for i in range(1, 13)
+    ]
+
+
+@pytest.fixture
+def task_repository(tmp_path):
+    class TaskRepository(SqliteRepositoryMixin[Task]):
+        entity = Task
+
+    repository = TaskRepository(root_dir=str(tmp_path))
+    repository.add_many(_tasks())
+    return repository
+
+
+@pytest.mark.parametrize(
+    "order_by", ["id", "-id", "title", "-priority", "due", "-done", "weight"]
+)
+@pytest.mark.parametrize("offset,limit", [(0, 0), (0, 5), (3, 4), (10, 5)])
+def test_find_ordered_in_sql(task_repository, mocker, order_by, offset, limit):
+    from fractal_repositories.utils.sorting import order_entities
+
+    ordered = mocker.spy(task_repository, "_find_ordered")
+    expected = order_entities(_tasks(), order_by, offset=offset, limit=limit)
+
+    found = list(task_repository.find(order_by=order_by, offset=offset, limit=limit))
+
+    assert found == expected
+    assert ordered.spy_return is not None
+    assert list(
+        task_repository.find_values(
+            select=["id"], order_by=order_by, offset=offset, limit=limit
+        )
+    ) == [{"id": task.id} for task in expected]
+
+
+def test_find_ordered_in_sql_only_reads_page(task_repository, mocker):
+    row_to_entity = mocker.spy(task_repository, "_row_to_entity")
+
+    found = list(
+        task_repository.find(
+            Specification.parse(priority__gte=1), order_by="-title", offset=2, limit=3
+        )
+    )
+
+    assert [task.id for task in found] == [2, 10, 1]
+    assert row_to_entity.call_count == 3
+
+
+def test_find_ordered_in_sql_default_for_missing_field(task_repository):
+    # Written before `done` was added: sorts as its default, False.
+    _write_raw_row(
+        task_repository,
+        "13",
+        {"id": 13, "title": "old", "priority": 0, "due": "2024-01-01"},
+    )
+
+    found = list(task_repository.find(order_by="-done", limit=7))
+
+    assert [task.id for task in found] == [2, 4, 6, 8, 10, 12, 1]
+    assert [task.id for task in task_repository.find(order_by="done", limit=1)] == [1]
+
+
+def test_find_ordered_in_sql_refills_page_after_stale_row(task_repository):
+    _write_raw_row(task_repository, "0", {"id": 0, "title": "t0"})
+
+    found = list(task_repository.find(order_by="id", limit=3))
+
+    assert [task.id for task in found] == [1, 2, 3]
+
+
+def test_find_ordered_in_python_when_not_sql_sortable(tmp_path, mocker):
+    class InvoiceRepository(SqliteRepositoryMixin[Invoice]):
+        entity = Invoice
+
+    repository = InvoiceRepository(root_dir=str(tmp_path))
+    repository.add_many(
+        [
+            Invoice("1", Decimal("10.00"), "b"),
+            Invoice("2", Decimal("9.50"), "a"),
+            Invoice("3", Decimal("100.00"), "c"),
+        ]
+    )
+    ordered = mocker.spy(repository, "_find_ordered")
+
+    assert [i.id for i in repository.find(order_by="amount", limit=2)] == ["2", "1"]
+    assert [i.id for i in repository.find(order_by="-note", limit=2)] == ["3", "1"]
+    assert ordered.spy_return_list == [None, None]
+    assert repository._sort_column("amount") is None
+    assert repository._sort_column("note") is None
+    assert repository._sort_column("id") == ("id", [])
+
+
+@dataclass
+class Account(Entity):
+    id: str
+    email: str
+    tenant: str
+    status: str
+    age: int
+
+
+def _index_names(repository):
+    with repository._connect() as conn:
+        return {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            )
+        }
+
+
+def _plan(repository, specification, order_by=""):
+    where, params = repository._where(specification)
+    query = f'SELECT id, data FROM "{repository._table}" WHERE {where}'
+    if order_by:
+        order, order_params = repository._order_clause(order_by)
+        query += f" {order}"
+        params += order_params
+    with repository._connect() as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def account_repository(tmp_path):
+    class AccountRepository(SqliteRepositoryMixin[Account]):
+        entity = Account
+        indexes = ["email", ("tenant", "status"), "age"]
+
+    repository = AccountRepository(root_dir=str(tmp_path))
+    repository.add_many(
+        Account(str(i), f"{i}@example.com", f"t{i % 3}", "ab"[i % 2], 20 + i)
+        for i in range(30)
+    )
+    return repository
+
+
+def test_indexes_created(account_repository):
+    names = _index_names(account_repository)
+
+    assert len(names) == 3
+    for prefix in (
+        "AccountRepository_email_",
+        "AccountRepository_tenant_status_",
+        "AccountRepository_age_",
+    ):
+        (name,) = [name for name in names if name.startswith(prefix)]
+        assert re.fullmatch(r"[0-9a-f]{8}", name[len(prefix) :])
+
+
+def test_indexes_names_do_not_collide(tmp_path):
+    @dataclass
+    class Nested(Entity):
+        id: str
+        a_b: str
+        a: dict
+        b: str
+
+    class NestedRepository(SqliteRepositoryMixin[Nested]):
+        entity = Nested
+        indexes = ["a_b", ("a", "b"), "a__b"]
+
+    repository = NestedRepository(root_dir=str(tmp_path))
+
+    assert len(_index_names(repository)) == 3
+
+
+def test_indexes_declared_twice(tmp_path):
+    class AccountRepository(SqliteRepositoryMixin[Account]):
+        entity = Account
+        indexes = [("tenant", "status"), ["tenant", "status"]]
+
+    with pytest.raises(ValueError):
+        AccountRepository(root_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "specification,index",
+    [
+        (Specification.parse(email="7@example.com"), "AccountRepository_email_"),
+        (
+            Specification.parse(email__in=["1@example.com", "2@example.com"]),
+            "AccountRepository_email_",
+        ),
+        (
+            Specification.parse(tenant="t1", status="b"),
+            "AccountRepository_tenant_status_",
+        ),
+        (Specification.parse(age__gte=45), "AccountRepository_age_"),
+    ],
+)
+def test_indexes_used(account_repository, specification, index):
+    from fractal_repositories.utils.specification_compiler import (
+        compile_specification,
+    )
+
+    assert f"USING INDEX {index}" in _plan(account_repository, specification)
+
+    expected = sorted(
+        a.id
+        for a in filter(compile_specification(specification), account_repository.find())
+    )
+    assert sorted(a.id for a in account_repository.find(specification)) == expected
+    assert account_repository.count(specification) == len(expected)
+
+
+def test_indexes_used_for_order_by(account_repository):
+    plan = _plan(account_repository, None, order_by="-age")
+
+    assert "USING INDEX AccountRepository_age_" in plan
+    # Only ties on age are sorted (by id), not the whole table.
+    assert "TEMP B-TREE FOR ORDER BY" not in plan
+    assert [a.age for a in account_repository.find(order_by="-age", limit=3)] == [
+        49,
+        48,
+        47,
+    ]
+
+
+def test_indexes_unindexed_fields_stay_bound(account_repository):
+    where, params = account_repository._where(
+        Specification.parse(email="1@example.com", id="1")
+    )
+
+    assert "'$.email'" in where
+    assert params == ["1@example.com", "$.id", "1"]
+
+
+@dataclass
+class Reading(Entity):
+    id: str
+    email: str
+    value: float
+
+
+def test_indexes_non_finite_floats(tmp_path):
+    class ReadingRepository(SqliteRepositoryMixin[Reading]):
+        entity = Reading
+
+    # Rows SQLite cannot parse (the json codec writes Infinity and NaN) are
+    # already stored when the indexes are declared.
+    ReadingRepository(root_dir=str(tmp_path)).add(
+        Reading("1", "1@example.com", float("inf"))
+    )
+
+    class IndexedReadingRepository(ReadingRepository):
+        indexes = ["email", "value"]
+
+    IndexedReadingRepository.__name__ = "ReadingRepository"
+    repository = IndexedReadingRepository(root_dir=str(tmp_path))
+    repository.add(Reading("2", "2@example.com", float("nan")))
+    repository.add(Reading("3", "3@example.com", 1.5))
+    repository.update(Reading("3", "3@example.com", float("-inf")))
+    repository.update(Reading("2", "2@example.com", 2.5))
+
+    assert len(_index_names(repository)) == 2
+    assert repository.get("1").value == float("inf")
+    assert repository.get("3").value == float("-inf")
+    specification = Specification.parse(email="2@example.com")
+    assert "USING INDEX ReadingRepository_email_" in _plan(repository, specification)
+    assert [r.value for r in repository.find(specification)] == [2.5]
+
+
+def test_indexes_invalid_field(tmp_path):
+    class AccountRepository(SqliteRepositoryMixin[Account]):
+        entity = Account
+        indexes = ["email') OR 1 --"]
+
+    with pytest.raises(ValueError):
+        AccountRepository(root_dir=str(tmp_path))
+
+
+def test_transaction(sqlite_repository, an_object, another_object):
+    other = type(sqlite_repository)(root_dir=sqlite_repository.root_dir)
+
+    with sqlite_repository.transaction():
+        sqlite_repository.add(an_object)
+        sqlite_repository.add_many([another_object])
+        an_object.name = "updated"
+        sqlite_repository.update(an_object)
+        # Visible inside the transaction, not outside it until the commit.
+        assert sqlite_repository.count() == 2
+        assert other.count() == 0
+
+    assert other.get(an_object.id).name == "updated"
+    assert other.count() == 2
+
+
+def test_transaction_rolls_back_on_error(sqlite_repository, an_object, another_object):
+    sqlite_repository.add(an_object)
+
+    with pytest.raises(RuntimeError):
+        with sqlite_repository.transaction():
+            sqlite_repository.add(another_object)
+            sqlite_repository.remove_one(Specification.parse(id=an_object.id))
+            raise RuntimeError
+
+    assert list(sqlite_repository.find()) == [an_object]
+
+
+def test_transaction_survives_handled_error(sqlite_repository, an_object):
+    with sqlite_repository.transaction():
+        sqlite_repository.add(an_object)
+        with pytest.raises(ObjectNotFoundException):
+            sqlite_repository.remove_one(Specification.parse(id="absent"))
+
+    assert sqlite_repository.count() == 1
+
+
+def test_transaction_one_connection_and_commit(tmp_path, an_object, mocker):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(root_dir=str(tmp_path))
+    open_ = mocker.spy(repository, "_open")
+
+    with repository.transaction():
+        with repository.transaction():
+            repository.add(an_object)
+        repository.get(an_object.id)
+        repository.remove_one(Specification.parse(id=an_object.id))
+        repository.add(an_object)
+
+    open_.assert_called_once()
+    assert repository.get(an_object.id) == an_object
+    assert repository._local.transaction is None
+
+
+def test_transaction_per_thread(sqlite_repository, an_object, another_object):
+    import threading
+
+    thread = threading.Thread(target=sqlite_repository.add, args=(another_object,))
+    with sqlite_repository.transaction():
+        sqlite_repository.add(an_object)
+        thread.start()
+        thread.join(0.2)
+        # The other thread waits for the commit rather than joining in.
+        assert thread.is_alive()
+
+    thread.join()
+    assert sqlite_repository.count() == 2
+
+
+@pytest.fixture
+def streaming_repository(tmp_path):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(root_dir=str(tmp_path), fetch_size=2)
+    repository.add_many(AnObject(str(i), f"name{i % 3}") for i in range(7))
+    return repository
+
+
+def test_fetch_size_keeps_connection_until_closed(streaming_repository, mocker):
+    import sqlite3
+
+    open_ = mocker.spy(streaming_repository, "_open")
+
+    found = streaming_repository.find()
+    assert next(found) == AnObject("0", "name0")
+    conn = open_.spy_return
+    conn.execute("SELECT 1")  # still open for the rest of the rows
+
+    found.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_fetch_size_zero_fetches_all_first(tmp_path, an_object, mocker):
+    import sqlite3
+
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(root_dir=str(tmp_path))
+    repository.add(an_object)
+    open_ = mocker.spy(repository, "_open")
+
+    found = repository.find()
+    assert next(found) == an_object
+    with pytest.raises(sqlite3.ProgrammingError):
+        open_.spy_return.execute("SELECT 1")
+
+
+def test_fetch_size_same_results(streaming_repository):
+    specification = Specification.parse(name__in=["name0", "name2"])
+
+    assert [e.id for e in streaming_repository.find()] == list("0123456")
+    assert [e.id for e in streaming_repository.find(specification)] == list("02356")
+    assert [e.id for e in streaming_repository.find(order_by="-name")] == list(
+        "2514036"
+    )
+    assert streaming_repository.find_one(Specification.parse(name="name1")).id == "1"
+
+
+def test_fetch_size_skips_stale_rows(streaming_repository):
+    _write_raw_row(streaming_repository, "stale1", {"nonsense": True})
+    _write_raw_row(streaming_repository, "stale2", json.loads("42"))
+
+    assert [e.id for e in streaming_repository.find()] == list("0123456")
+
+
+@pytest.mark.parametrize("connection", ["operation", "thread"])
+def test_fetch_size_writes_while_iterating(tmp_path, connection):
+    import itertools
+
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(
+        root_dir=str(tmp_path), connection=connection, fetch_size=2
+    )
+    repository.add_many(AnObject(str(i), "old") for i in range(5))
+
+    seen = []
+    # Bounded, so a row the updates moved could not loop forever.
+    for entity in itertools.islice(repository.find(), 50):
+        seen.append(entity.id)
+        entity.name = "new"
+        repository.update(entity)
+        if entity.id == "0":
+            repository.remove_one(Specification.parse(id="3"))
+            repository.add(AnObject("5", "added"))
+
+    assert seen == ["0", "1", "2", "4"]
+    assert {e.id: e.name for e in repository.find()} == {
+        "0": "new",
+        "1": "new",
+        "2": "new",
+        "4": "new",
+        "5": "added",
+    }
+
+
+@pytest.mark.parametrize("fetch_size", [0, 2])
+def test_find_offset_without_limit_ignored(tmp_path, fetch_size):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    repository = SqliteRepository(root_dir=str(tmp_path), fetch_size=fetch_size)
+    repository.add_many(AnObject(str(i)) for i in range(4))
+
+    assert [e.id for e in repository.find(offset=2)] == list("0123")
+    assert [e.id for e in repository.find(offset=2, limit=1)] == ["2"]
+
+
+@dataclass
+class Article(Entity):
+    id: str
+    title: str
+    body: str
+    topic: str = "misc"
+
+
+def _article_repository_class(search_fields=("title", "body")):
+    # Same class name, so the same table, whatever the search_fields.
+    class ArticleRepository(SqliteRepositoryMixin[Article]):
+        entity = Article
+
+    ArticleRepository.search_fields = search_fields
+    return ArticleRepository
+
+
+@pytest.fixture(params=["operation", "thread"])
+def article_repository(tmp_path, request):
+    repository = _article_repository_class()(
+        root_dir=str(tmp_path), connection=request.param
+    )
+    repository.add_many(
+        [
+            Article("1", "Sourdough basics", "Flour, water and salt.", "baking"),
+            Article("2", "Bread", "Sourdough sourdough sourdough.", "baking"),
+            Article("3", "Python tips", "Generators are lazy.", "code"),
+            Article("4", "Rye", "A sourdough with rye flour.", "baking"),
+        ]
+    )
+    return repository
+
+
+def _search_ids(repository, *args, **kwargs):
+    return [a.id for a in repository.search(*args, **kwargs)]
+
+
+def test_search_ranked(article_repository):
+    assert _search_ids(article_repository, "sourdough") == ["2", "1", "4"]
+    assert _search_ids(article_repository, "flour AND rye") == ["4"]
+    assert _search_ids(article_repository, "gen*") == ["3"]
+    assert _search_ids(article_repository, "title: sourdough") == ["1"]
+    assert _search_ids(article_repository, "croissant") == []
+
+
+def test_search_specification_and_page(article_repository):
+    assert _search_ids(
+        article_repository, "sourdough", Specification.parse(topic="baking")
+    ) == ["2", "1", "4"]
+    assert _search_ids(article_repository, "sourdough", offset=1, limit=1) == ["1"]
+    # Not mapped to SQL: filtered (and paged) in Python.
+    contains_o = Specification.parse(title__contains="o")
+    assert _search_ids(article_repository, "sourdough OR lazy", contains_o) == [
+        "3",
+        "1",
+    ]
+    assert _search_ids(
+        article_repository, "sourdough OR lazy", contains_o, offset=1, limit=5
+    ) == ["1"]
+
+
+def test_search_kept_in_sync(article_repository):
+    article_repository.add(Article("3", "Sourdough in Python", "Really."))
+    article_repository.update(Article("2", "Bread", "Yeast only."))
+    article_repository.remove_one(Specification.parse(id="4"))
+    article_repository.update_many([Article("1", "Focaccia", "Olive oil.")])
+
+    assert _search_ids(article_repository, "sourdough") == ["3"]
+    assert _search_ids(article_repository, "yeast OR olive") == ["1", "2"]
+    article_repository.remove_many(Specification.parse(topic="misc"))
+    assert _search_ids(article_repository, "sourdough OR yeast OR olive") == []
+
+
+def test_search_table_filled_and_rebuilt(tmp_path):
+    plain = _article_repository_class(search_fields=())(root_dir=str(tmp_path))
+    plain.add(Article("1", "Sourdough", "Bread."))
+
+    repository = _article_repository_class()(root_dir=str(tmp_path))
+    assert _search_ids(repository, "sourdough") == ["1"]
+
+    # Declaring other fields rebuilds the index with them.
+    by_topic = _article_repository_class(search_fields=["topic"])(
+        root_dir=str(tmp_path)
+    )
+    assert _search_ids(by_topic, "misc") == ["1"]
+    assert _search_ids(by_topic, "sourdough") == []
+
+    with by_topic._connect() as conn:
+        conn.execute(f'DELETE FROM "{by_topic._search_table}"')
+    by_topic.rebuild_search_index()
+    assert _search_ids(by_topic, "misc") == ["1"]
+
+
+def test_search_non_finite_floats(tmp_path):
+    @dataclass
+    class Review(Entity):
+        id: str
+        title: str
+        score: float
+
+    def repository_class(search_fields):
+        class ReviewRepository(SqliteRepositoryMixin[Review]):
+            entity = Review
+
+        ReviewRepository.search_fields = search_fields
+        return ReviewRepository
+
+    # Rows SQLite cannot parse (the json codec writes Infinity and NaN) are
+    # already stored when the search table is filled.
+    repository_class(())(root_dir=str(tmp_path)).add(
+        Review("1", "Sourdough", float("inf"))
+    )
+    repository = repository_class(["title"])(root_dir=str(tmp_path))
+    repository.add(Review("2", "Sourdough again", float("nan")))
+    repository.add(Review("3", "Rye", 4.5))
+    repository.update(Review("3", "Rye sourdough", float("-inf")))
+    repository.update(Review("2", "Sourdough again", 3.0))
+    repository.rebuild_search_index()
+
+    assert repository.get("1").score == float("inf")
+    assert repository.get("3").score == float("-inf")
+    assert [r.id for r in repository.search("sourdough")] == ["2"]
+
+
+def test_search_errors(article_repository, tmp_path):
+    with pytest.raises(ValueError):
+        list(article_repository.search('"unbalanced'))
+    with pytest.raises(ValueError):
+        list(
+            _article_repository_class(search_fields=())(root_dir=str(tmp_path)).search(
+                "x"
+            )
+        )
+    with pytest.raises(ValueError):
+        _article_repository_class(search_fields=['title") --'])(root_dir=str(tmp_path))
+
+
+jsonb = pytest.mark.skipif(
+    not __import__("sqlite3").sqlite_version_info >= (3, 45, 0),
+    reason="JSONB needs SQLite 3.45.0+",
+)
+
+
+def _storage_repository(tmp_path, **kwargs):
+    class SqliteRepository(SqliteRepositoryMixin[AnObject]):
+        entity = AnObject
+
+    return SqliteRepository(root_dir=str(tmp_path), **kwargs)
+
+
+def _stored_types(repository):
+    with repository._connect() as conn:
+        return sorted(
+            row[0]
+            for row in conn.execute(f'SELECT typeof(data) FROM "{repository._table}"')
+        )
+
+
+def test_storage_unknown(tmp_path):
+    with pytest.raises(ValueError):
+        _storage_repository(tmp_path, storage="msgpack")
+
+
+def test_storage_jsonb_falls_back_to_text(tmp_path, an_object, monkeypatch, caplog):
+    import sqlite3
+
+    monkeypatch.setattr(sqlite3, "sqlite_version_info", (3, 44, 0))
+
+    repository = _storage_repository(tmp_path, storage="jsonb")
+    repository.add(an_object)
+
+    assert repository.storage == "text"
+    assert "no JSONB" in caplog.text
+    assert _stored_types(repository) == ["text"]
+    assert repository.get(an_object.id) == an_object
+    assert repository.migrate_storage() == 0
+
+
+@jsonb
+@pytest.mark.parametrize("connection", ["operation", "thread"])
+def test_storage_jsonb(tmp_path, an_object, another_object, connection):
+    repository = _storage_repository(tmp_path, storage="jsonb", connection=connection)
+    repository.add(an_object)
+    repository.add_many([another_object])
+    another_object.name = "renamed"
+    repository.update_many([another_object])
+
+    assert _stored_types(repository) == ["blob", "blob"]
+    assert repository.get(an_object.id) == an_object
+    assert list(repository.find(Specification.parse(name="renamed"))) == [
+        another_object
+    ]
+    assert list(repository.find_values(select=["name"], order_by="name")) == [
+        {"name": an_object.name},
+        {"name": "renamed"},
+    ]
+
+
+@jsonb
+def test_storage_migrate(tmp_path, an_object, another_object):
+    _storage_repository(tmp_path).add(an_object)
+    repository = _storage_repository(tmp_path, storage="jsonb")
+    repository.add(another_object)
+    with repository._connect() as conn:
+        conn.execute(
+            f'INSERT INTO "{repository._table}" VALUES (?, ?)', ("broken", "{no")
+        )
+
+    # Both formats are read before migrating.
+    assert sorted(e.id for e in repository.find()) == sorted(
+        [an_object.id, another_object.id]
+    )
+    assert repository.migrate_storage() == 1
+    assert _stored_types(repository) == ["blob", "blob", "text"]
+
+    text = _storage_repository(tmp_path)
+    assert text.migrate_storage() == 2
+    assert _stored_types(text) == ["text", "text", "text"]
+    assert sorted(e.id for e in text.find()) == sorted(
+        [an_object.id, another_object.id]
+    )
@@ -0,0 +1,144 @@
+import json
+from datetime import datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from fractal_repositories.exceptions import IncompatibleCodecException
+from fractal_repositories.utils.codecs import JsonCodec, check_codec, get_codec
+
+data = {
+    "id": "1",
+    "name": "näme",
+    "number": 1,
+    "ratio": 0.5,
+    "flag": True,
+    "nothing": None,
+    "nested": {"list": [1, "2", {"three": 3.0}]},
+}
+
+raw = {
+    "datetime": datetime(2021, 8, 19, 12, 30),
+    "time": time(12, 30, 59),
+    "uuid": UUID("12345678123456781234567812345678"),
+    "decimal": Decimal("1.95"),
+}
+
+
+def _codecs():
+    codecs = [JsonCodec()]
+    for name in ("orjson", "msgspec"):
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", _codecs(), ids=lambda c: c.name)
+def test_codec_round_trip(codec):
+    assert codec.loads(codec.dumps(data)) == data
+    assert json.loads(codec.dumps(data)) == data
+    assert codec.loads(json.dumps(data)) == data
+
+
+def test_orjson_codec_matches_enhanced_encoder():
+    pytest.importorskip("orjson")
+
+    codec = get_codec("orjson")
+
+    assert codec.loads(codec.dumps(raw)) == JsonCodec().loads(JsonCodec().dumps(raw))
+
+
+def test_msgspec_codec_round_trip():
+    pytest.importorskip("msgspec")
+
+    codec = get_codec("msgspec")
+
+    assert codec.loads(codec.dumps(data)) == data
+    with pytest.raises(ValueError):
+        codec.loads("{not valid json")
+
+
+@pytest.mark.parametrize("codec", _codecs(), ids=lambda c: c.name)
+def test_codec_loads_malformed_raises_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads("{not valid json")
+
+
+def test_get_codec():
+    codec = JsonCodec()
+
+    assert type(get_codec()) is JsonCodec
+    assert get_codec(codec) is codec
+    assert type(get_codec("json")) is JsonCodec
+
+
+def test_get_codec_unknown():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+class LossyCodec(JsonCodec):
+    name = "lossy"
+
+    def loads(self, data):
+        return {k: str(v) for k, v in json.loads(data).items()}
+
+
+def test_check_codec():
+    check_codec(JsonCodec(), json.dumps(data))
+    # Corrupt samples are left to the repository's corrupt-data handling.
+    check_codec(LossyCodec(), "{not valid json")
+
+    with pytest.raises(IncompatibleCodecException):
+        check_codec(LossyCodec(), json.dumps({"number": 1}), "table")
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+@pytest.mark.parametrize("stored", ['{"x": Infinity}', '{"x": NaN}'])
+def test_codec_cannot_read_non_finite(name, stored):
+    pytest.importorskip(name)
+
+    codec = get_codec(name)
+
+    with pytest.raises(IncompatibleCodecException):
+        codec.loads(stored)
+    with pytest.raises(IncompatibleCodecException):
+        codec.loads(stored.encode())
+    # Still a ValueError, and not incompatible, when the stdlib fails too.
+    with pytest.raises(ValueError):
+        codec.loads('{"x": Infinity')
+
+
+def test_orjson_codec_cannot_read_big_int():
+    pytest.importorskip("orjson")
+
+    codec = get_codec("orjson")
+    stored = json.dumps({"x": 2**70, "y": 2**63 - 1})
+
+    with pytest.raises(IncompatibleCodecException):
+        codec.loads(stored)
+    with pytest.raises(IncompatibleCodecException):
+        codec.loads(stored.encode())
+    assert codec.loads(json.dumps({"x": 2**63 - 1})) == {"x": 2**63 - 1}
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+@pytest.mark.parametrize("value", [float("inf"), float("-inf"), float("nan")])
+def test_codec_dumps_non_finite_raises(name, value):
+    pytest.importorskip(name)
+
+    codec = get_codec(name)
+
+    with pytest.raises(ValueError):
+        codec.dumps({"nested": [{"x": value}]})
+    assert codec.loads(codec.dumps({"x": None, "y": 1.5})) == {"x": None, "y": 1.5}
+
+
+def test_orjson_codec_dumps_big_int_raises():
+    pytest.importorskip("orjson")
+
+    with pytest.raises(TypeError):
+        get_codec("orjson").dumps({"x": 2**70})
@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+from fractal_repositories.utils.compression import (
+    BLOCK_MAGIC,
+    Compressor,
+    ZstdCompressor,
+    block_lines,
+    get_compressor,
+    pack_block,
+    read_blocks,
+    unpack_blocks,
+)
+
+
+def test_get_compressor():
+    assert isinstance(get_compressor("gzip"), Compressor)
+    compressor = Compressor(level=1)
+    assert get_compressor(compressor) is compressor
+    with pytest.raises(ValueError):
+        get_compressor("lz77")
+
+
+def test_pack_block():
+    block = pack_block(b'{"id": "1"}\n' * 100, Compressor())
+
+    assert block.startswith(BLOCK_MAGIC)
+    assert len(block) < 100
+    assert pack_block(b"data", Compressor()) == pack_block(b"data", Compressor())
+
+
+def test_read_blocks():
+    first, second = pack_block(b"a\nb\n", Compressor()), pack_block(
+        b"c\n", Compressor()
+    )
+
+    blocks = list(read_blocks(io.BytesIO(first + second)))
+
+    assert blocks == [(0, len(first), b"a\nb\n"), (len(first), len(second), b"c\n")]
+    assert list(read_blocks(io.BytesIO(first + second), len(first))) == blocks[1:]
+
+
+def test_read_blocks_incomplete_last_block():
+    first, second = pack_block(b"a\n", Compressor()), pack_block(b"b\n", Compressor())
+
+    for torn in (second[:5], second[:-1]):
+        assert [data for _, _, data in read_blocks(io.BytesIO(first + torn))] == [
+            b"a\n"
+        ]
+
+
+def test_read_blocks_skips_damaged_span(caplog):
+    first, second = pack_block(b"a\n", Compressor()), pack_block(b"b\n", Compressor())
+    damaged = first[:-3] + b"xyz"
+
+    blocks = list(read_blocks(io.BytesIO(first[:-2] + second + damaged + second)))
+
+    assert [data for _, _, data in blocks] == [None, b"b\n", None, b"b\n"]
+    assert blocks[1][0] == len(first) - 2
+    assert "damaged" in caplog.text
+
+
+def test_block_lines():
+    assert block_lines(b"a\nb\n") == [b"a", b"b"]
+    assert block_lines(b"a\nb") == [b"a", b"b"]
+
+
+def test_unpack_blocks():
+    data = bytes(range(256)) * 10
+    packed = pack_block(data[:100], Compressor()) + pack_block(data[100:], Compressor())
+
+    assert unpack_blocks(packed) == data
+    assert unpack_blocks(data) is None
+    assert unpack_blocks(packed[:-1]) is None
+
+
+def test_zstd():
+    pytest.importorskip("zstandard")
+    block = pack_block(b"data\n" * 100, ZstdCompressor())
+
+    # Read whatever compressor wrote the block.
+    assert list(read_blocks(io.BytesIO(block)))[0][2] == b"data\n" * 100
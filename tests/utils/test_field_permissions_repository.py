@@ -246,6 +246,18 @@ def test_find_user_secret_blanked(repo):
     assert all(r.secret is None for r in results)
 
 
+def test_find_values_user_secret_blanked(repo):
+    repo.add(SecureObject("1", name="a", secret="s1"))
+
+    assert list(repo.find_values(select=["name", "secret"], roles=["user"])) == [
+        {"name": "a", "secret": None}
+    ]
+    assert list(repo.find_values(select=["name", "secret"], roles=["admin"])) == [
+        {"name": "a", "secret": "s1"}
+    ]
+    assert list(repo.find_values(select=["name"], roles=["user"])) == [{"name": "a"}]
+
+
 def test_find_one_roles_none_no_masking(repo):
     repo.add(SecureObject("1", secret="top_secret"))
     result = repo.find_one(Specification.parse(id="1"), roles=None)
@@ -0,0 +1,34 @@
+import pytest
+
+from fractal_repositories.utils.file_tail import FileTail
+
+
+class LineTail(FileTail):
+    def _reset(self):
+        super(LineTail, self)._reset()
+        self.taken = []
+
+    def _add(self, offset, line):
+        self.taken.append((self.lines, offset, line))
+
+
+def test_add_is_abstract(tmp_path):
+    class Tail(FileTail): ...
+
+    with pytest.raises(TypeError, match="_add"):
+        Tail(str(tmp_path / "file.jsonl"))
+
+
+def test_sync_reads_appended_lines(tmp_path):
+    path = tmp_path / "file.jsonl"
+    path.write_bytes(b'{"id": "1"}\n{"id"')
+    tail = LineTail(str(path))
+
+    assert tail.sync()
+    assert tail.taken == [(1, 0, b'{"id": "1"}\n')]
+    assert tail.partial == b'{"id"'
+
+    with open(path, "ab") as fp:
+        fp.write(b': "2"}\n')
+    assert not tail.sync()
+    assert tail.taken[1:] == [(2, 12, b'{"id": "2"}\n')]
@@ -0,0 +1,183 @@
+import pickle
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+from fractal_specifications.generic.operators import (
+    EqualsSpecification,
+    GreaterThanSpecification,
+    InSpecification,
+)
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.utils.indexes import IndexedEntities
+
+
+@dataclass
+class User(Entity):
+    email: str = ""
+    tenant_id: int = 0
+    status: str = "active"
+    tags: List[str] = None  # type: ignore
+
+
+@pytest.fixture
+def entities():
+    entities = IndexedEntities(["email", ("tenant_id", "status")])
+    for user in [
+        User("1", "a@x", 1, "active"),
+        User("2", "b@x", 1, "blocked"),
+        User("3", "c@x", 2, "active"),
+        User("4", "a@x", 2, "active"),
+    ]:
+        entities[user.id] = user
+    return entities
+
+
+def test_plan_equality(entities):
+    assert entities.plan(EqualsSpecification("email", "a@x")) == ["1", "4"]
+    assert entities.plan(EqualsSpecification("email", "absent")) == []
+
+
+def test_plan_in(entities):
+    assert entities.plan(InSpecification("email", ["c@x", "a@x"])) == ["1", "3", "4"]
+
+
+def test_plan_id(entities):
+    assert entities.plan(EqualsSpecification("id", "3")) == ["3"]
+    assert entities.plan(InSpecification("id", ["4", "absent", "1"])) == ["1", "4"]
+
+
+def test_plan_composite(entities):
+    tenant = EqualsSpecification("tenant_id", 1)
+    active = EqualsSpecification("status", "active")
+
+    assert entities.plan(tenant & active) == ["1"]
+    assert entities.plan(InSpecification("tenant_id", [1, 2]) & active) == [
+        "1",
+        "3",
+        "4",
+    ]
+    # One field of a composite index is not enough.
+    assert entities.plan(tenant) is None
+
+
+def test_plan_and_or(entities):
+    email = EqualsSpecification("email", "a@x")
+
+    assert entities.plan(email & GreaterThanSpecification("tenant_id", 1)) == [
+        "1",
+        "4",
+    ]
+    assert entities.plan(email | EqualsSpecification("id", "2")) == ["1", "2", "4"]
+    assert entities.plan(email | GreaterThanSpecification("tenant_id", 1)) is None
+
+
+def test_plan_unindexed(entities):
+    assert entities.plan(GreaterThanSpecification("tenant_id", 1)) is None
+    assert entities.plan(EqualsSpecification("email", ["unhashable"])) is None
+
+    spec = EqualsSpecification("email", "a@x")
+    spec.pre_processor = str.upper
+    assert entities.plan(spec) is None
+
+
+def test_mutations_keep_indexes_current(entities):
+    email = EqualsSpecification("email", "a@x")
+
+    entities["1"] = User("1", "z@x", 1, "active")
+    assert entities.plan(email) == ["4"]
+
+    del entities["4"]
+    assert entities.plan(email) == []
+
+    entities.pop("absent", None)
+    entities.update({"5": User("5", "a@x")})
+    assert entities.plan(email) == ["5"]
+
+    entities.clear()
+    assert entities.plan(email) == []
+
+
+def test_unhashable_values_are_always_candidates(entities):
+    entities["5"] = User("5", ["not", "hashable"])  # type: ignore[arg-type]
+
+    assert entities.plan(EqualsSpecification("email", "a@x")) == ["1", "4", "5"]
+
+
+def test_candidates_in_dict_order(entities):
+    del entities["1"]
+    entities["1"] = User("1", "a@x")
+    entities["4"] = User("4", "a@x")
+
+    assert entities.plan(EqualsSpecification("email", "a@x")) == ["4", "1"]
+    assert list(entities) == ["2", "3", "4", "1"]
+
+
+def test_pickle(entities):
+    copy = pickle.loads(pickle.dumps(entities))
+
+    assert copy == entities
+    assert copy.plan(EqualsSpecification("email", "a@x")) == ["1", "4"]
+
+
+@pytest.fixture
+def sorted_entities():
+    entities = IndexedEntities(sorted_indexes=["tenant_id"])
+    for user in [
+        User("1", tenant_id=3),
+        User("2", tenant_id=1),
+        User("3", tenant_id=2),
+        User("4", tenant_id=1),
+        User("5", tenant_id=3),
+    ]:
+        entities[user.id] = user
+    return entities
+
+
+def test_plan_range(sorted_entities):
+    from fractal_specifications.generic.operators import (
+        GreaterThanEqualSpecification,
+        LessThanSpecification,
+    )
+
+    assert sorted_entities.plan(GreaterThanSpecification("tenant_id", 1)) == [
+        "1",
+        "3",
+        "5",
+    ]
+    assert sorted_entities.plan(
+        GreaterThanEqualSpecification("tenant_id", 2)
+        & LessThanSpecification("tenant_id", 3)
+    ) == ["3"]
+    assert sorted_entities.plan(LessThanSpecification("tenant_id", "x")) is None
+
+
+def test_sorted_index_ordered(sorted_entities):
+    assert list(sorted_entities.ordered("tenant_id")) == ["2", "4", "3", "1", "5"]
+    # Descending keeps ties in id order, like find().
+    assert list(sorted_entities.ordered("-tenant_id")) == ["1", "5", "3", "2", "4"]
+    assert sorted_entities.ordered("email") is None
+
+
+def test_sorted_index_mutations(sorted_entities):
+    sorted_entities["1"] = User("1", tenant_id=0)
+    del sorted_entities["3"]
+
+    assert list(sorted_entities.ordered("tenant_id")) == ["1", "2", "4", "5"]
+    assert sorted_entities.plan(GreaterThanSpecification("tenant_id", 1)) == ["5"]
+
+
+def test_sorted_index_unorderable_values(sorted_entities):
+    sorted_entities["6"] = User("6", tenant_id=None)  # type: ignore[arg-type]
+
+    # Always a range candidate, and no index order while it is present.
+    assert sorted_entities.plan(GreaterThanSpecification("tenant_id", 2)) == [
+        "1",
+        "5",
+        "6",
+    ]
+    assert sorted_entities.ordered("tenant_id") is None
+
+    del sorted_entities["6"]
+    assert sorted_entities.ordered("tenant_id") is not None
@@ -87,6 +87,19 @@ def test_get_uses_cache(repo, inner, mocker):
     assert spy.call_count == 1
 
 
+def test_get_many_fetches_only_uncached(repo, inner, mocker):
+    repo.add(Item("1", name="Alice"))
+    repo.add(Item("2", name="Bob"))
+    repo.get("1")
+    spy = mocker.spy(inner, "get_many")
+
+    assert [i.name for i in repo.get_many(["2", "1", "3"])] == ["Bob", "Alice"]
+    spy.assert_called_once_with(["2", "3"], preserve_order=False)
+
+    repo.get_many(["1", "2"])
+    assert spy.call_count == 1
+
+
 def test_find_delegates_directly(repo, inner, mocker):
     repo.add(Item("1"))
     repo.add(Item("2"))
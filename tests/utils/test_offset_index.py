@@ -0,0 +1,193 @@
+import json
+import os
+
+import pytest
+
+from fractal_repositories.utils.offset_index import OffsetIndex
+
+
+def _parse(raw):
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    if "$deleted" in data:
+        return True, data["$deleted"]
+    return False, data["id"]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "data.jsonl")
+
+
+def _append(path, *records):
+    with open(path, "ab") as fp:
+        for record in records:
+            fp.write(
+                record if isinstance(record, bytes) else json.dumps(record).encode()
+            )
+            fp.write(b"\n")
+
+
+def test_sync_missing_file(path):
+    index = OffsetIndex(path, _parse)
+
+    index.sync()
+
+    assert index.offsets == {}
+    assert index.count == 0
+
+
+def test_read(path):
+    _append(path, {"id": "1", "v": 1}, {"id": "2", "v": 2}, {"id": "3", "v": 3})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    assert index.count == 3
+    assert [json.loads(raw) for raw in index.read(["3", "missing", "1"])] == [
+        {"id": "1", "v": 1},
+        {"id": "3", "v": 3},
+    ]
+
+
+def test_first_line_wins(path):
+    _append(path, {"id": "1", "v": 1}, {"id": "1", "v": 2})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    assert index.count == 2
+    assert json.loads(index.read(["1"])[0])["v"] == 1
+
+
+def test_last_wins(path):
+    _append(path, {"id": "1", "v": 1}, {"id": "2"}, {"id": "1", "v": 2})
+    _append(path, {"$deleted": "2"})
+    index = OffsetIndex(path, _parse, last_wins=True)
+    index.sync()
+
+    assert index.count == 1
+    assert json.loads(index.read(["1"])[0])["v"] == 2
+    assert index.read(["2"]) == []
+    # Every valid line, superseded versions and tombstones included.
+    assert index.records == 4
+
+
+def test_sync_tail(path, mocker):
+    _append(path, {"id": "1"})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+    parse = mocker.patch.object(index, "parse", side_effect=_parse)
+
+    _append(path, {"id": "2"})
+    index.sync()
+
+    parse.assert_called_once_with(b'{"id": "2"}')
+    assert index.count == 2
+
+
+def test_sync_unchanged(path, mocker):
+    _append(path, {"id": "1"})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+    parse = mocker.patch.object(index, "parse", side_effect=_parse)
+
+    index.sync()
+
+    parse.assert_not_called()
+
+
+def test_sync_rewrite_rebuilds(path):
+    _append(path, {"id": "1"}, {"id": "2"})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    replacement = path + ".new"
+    _append(replacement, {"id": "2"})
+    os.replace(replacement, path)
+    index.sync()
+
+    assert list(index.offsets) == ["2"]
+    assert index.read(["2"]) == [b'{"id": "2"}']
+
+
+def test_torn_line(path):
+    _append(path, {"id": "1"}, b"{corrupt")
+    with open(path, "ab") as fp:
+        fp.write(b'{"id": "2"')
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    # The corrupt line is skipped, the unterminated one left for later.
+    assert list(index.offsets) == ["1"]
+
+    # Appending after a torn line continues it, so the merged line is corrupt.
+    _append(path, {"id": "3"})
+    _append(path, {"id": "4"})
+    index.sync()
+    assert list(index.offsets) == ["1", "4"]
+
+
+def test_persist(path, mocker):
+    _append(path, {"id": "1"}, {"id": "2"})
+    index = OffsetIndex(path, _parse, persist=True)
+    index.sync()
+    assert os.path.exists(index.index_path)
+
+    _append(path, {"id": "3"})
+    reopened = OffsetIndex(path, _parse, persist=True)
+    parse = mocker.patch.object(reopened, "parse", side_effect=_parse)
+    reopened.sync()
+
+    parse.assert_called_once_with(b'{"id": "3"}')
+    assert list(reopened.offsets) == ["1", "2", "3"]
+    assert reopened.records == 3
+
+
+def test_persist_stale_index_rebuilds(path):
+    _append(path, {"id": "1"}, {"id": "2"})
+    OffsetIndex(path, _parse, persist=True).sync()
+    with open(path, "wb") as fp:
+        fp.write(b'{"id": "9"}\n')
+
+    index = OffsetIndex(path, _parse, persist=True)
+    index.sync()
+
+    assert list(index.offsets) == ["9"]
+
+
+def test_persist_unreadable_index(path):
+    _append(path, {"id": "1"})
+    with open(path + ".idx", "w") as fp:
+        fp.write("{not json")
+
+    index = OffsetIndex(path, _parse, persist=True)
+    index.sync()
+
+    assert list(index.offsets) == ["1"]
+
+
+def test_sync_rewrite_in_place_that_grows(path):
+    _append(path, {"id": "1"}, {"id": "2"})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    # Bigger, same inode, a line break where the last line ended: only the
+    # last line tells it is not an append.
+    with open(path, "wb") as fp:
+        fp.write(b'{"id": "3"}\n{"id": "4"}\n{"id": "5"}\n')
+    index.sync()
+
+    assert list(index.offsets) == ["3", "4", "5"]
+
+
+def test_invalidate(path):
+    _append(path, {"id": "1"})
+    index = OffsetIndex(path, _parse)
+    index.sync()
+
+    index.invalidate()
+
+    assert index.offsets == {}
+    index.sync()
+    assert list(index.offsets) == ["1"]
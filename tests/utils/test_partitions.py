@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+
+import pytest
+from fractal_specifications.generic.specification import Specification
+
+from fractal_repositories.core.entity import Entity
+from fractal_repositories.utils.partitions import (
+    hash_segment,
+    partition_predicate,
+    prunable_field,
+    segment_name,
+    segment_value,
+    stored_values,
+)
+
+
+@pytest.mark.parametrize(
+    "value", ["2024-01-01", "a/b", "=x", "", 5, 1.5, None, True, [1, "a"]]
+)
+def test_segment_name_roundtrip(value):
+    name = segment_name(value)
+
+    assert "/" not in name
+    assert segment_value(name) == value
+    assert type(segment_value(name)) is type(value)
+
+
+def test_segment_name_strings_and_values_differ():
+    assert segment_name("5") != segment_name(5)
+    assert segment_name("=5") != segment_name(5)
+
+
+def test_hash_segment():
+    names = {hash_segment(str(i), 16) for i in range(200)}
+
+    assert names == {f"{i:02d}" for i in range(16)}
+    assert hash_segment(1.0, 16) == hash_segment(1, 16)
+    assert hash_segment("1", 1) == "0"
+
+
+def test_stored_values():
+    assert stored_values(Specification.parse(id=1), "id") == [1]
+    assert stored_values(Specification.parse(day=date(2024, 1, 2)), "day") == [
+        "2024-01-02"
+    ]
+    assert stored_values(Specification.parse(id__in=[1, 2], name="a"), "id") == [1, 2]
+    assert stored_values(Specification.parse(name="a"), "id") is None
+
+
+def test_partition_predicate():
+    predicate = partition_predicate(
+        Specification.parse(day__gte=date(2024, 1, 2), day__lt=date(2024, 2, 1)),
+        "day",
+    )
+
+    assert predicate is not None
+    assert [predicate(v) for v in ["2024-01-01", "2024-01-02", "2024-02-01"]] == [
+        False,
+        True,
+        False,
+    ]
+    assert predicate(None)  # not comparable: kept
+
+
+def test_partition_predicate_or():
+    either = Specification.parse(value=1) | Specification.parse(value__gt=10)
+    predicate = partition_predicate(either, "value")
+
+    assert predicate is not None
+    assert [predicate(v) for v in [1, 5, 11]] == [True, False, True]
+    assert partition_predicate(either | Specification.parse(name="a"), "value") is None
+
+
+def test_partition_predicate_other_field():
+    assert partition_predicate(Specification.parse(name="a"), "value") is None
+
+
+class Colour(Enum):
+    RED = "red"
+
+
+@dataclass
+class Row(Entity):
+    id: str
+    day: date
+    at: datetime
+    amount: Decimal
+    colour: Colour
+    label: Optional[str] = None
+
+
+@pytest.mark.parametrize(
+    "field, prunable",
+    [
+        ("id", True),
+        ("day", True),
+        ("at", False),
+        ("amount", False),
+        ("colour", True),
+        ("label", True),
+        ("missing", False),
+    ],
+)
+def test_prunable_field(field, prunable):
+    assert prunable_field(Row, field) is prunable
@@ -0,0 +1,52 @@
+import random
+from dataclasses import dataclass
+
+import pytest
+
+from fractal_repositories.utils.sorting import order_entities
+
+
+@dataclass
+class Item:
+    id: int
+    rank: int
+
+
+@pytest.fixture
+def items():
+    rng = random.Random(42)
+    items = [Item(id, rng.randint(0, 5)) for id in range(50)]
+    rng.shuffle(items)
+    return items
+
+
+def _reference(items, order_by):
+    # The full sort find() used to do: ties in id order.
+    reverse = order_by.startswith("-")
+    field = order_by.lstrip("-")
+    ordered = sorted(items, key=lambda i: i.id)
+    return sorted(ordered, key=lambda i: getattr(i, field), reverse=reverse)
+
+
+@pytest.mark.parametrize("order_by", ["rank", "-rank", "id", "-id"])
+@pytest.mark.parametrize("offset, limit", [(0, 0), (0, 1), (0, 7), (10, 7), (45, 10)])
+def test_order_entities_matches_full_sort(items, order_by, offset, limit):
+    expected = _reference(items, order_by)
+    if limit:
+        expected = expected[offset : offset + limit]
+
+    assert order_entities(items, order_by, offset=offset, limit=limit) == expected
+
+
+def test_order_entities_unordered(items):
+    assert order_entities(items, "") == items
+    assert order_entities(iter(items), "", offset=3, limit=2) == items[3:5]
+
+
+def test_order_entities_value_getter():
+    rows = [{"id": 2, "rank": 1}, {"id": 1, "rank": 1}, {"id": 3, "rank": 0}]
+
+    assert order_entities(rows, "-rank", limit=2, value=dict.__getitem__) == [
+        {"id": 1, "rank": 1},
+        {"id": 2, "rank": 1},
+    ]
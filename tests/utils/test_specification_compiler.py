@@ -0,0 +1,128 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import pytest
+from fractal_specifications.generic.collections import (
+    AndSpecification,
+    OrSpecification,
+)
+from fractal_specifications.generic.operators import (
+    ContainsSpecification,
+    EqualsSpecification,
+    IsNoneSpecification,
+    RegexStringMatchSpecification,
+)
+from fractal_specifications.generic.specification import (
+    EmptySpecification,
+    Specification,
+)
+
+from fractal_repositories.utils.specification_compiler import compile_specification
+
+
+@dataclass
+class Address:
+    city: str
+
+
+@dataclass
+class Person:
+    id: int
+    name: Optional[str]
+    age: int
+    tags: List[str] = field(default_factory=list)
+    address: Any = None
+
+
+people = [
+    Person(1, "alice", 30, ["a", "b"], Address("Amsterdam")),
+    Person(2, "bob", 25, [], Address("Berlin")),
+    Person(3, None, 40, ["b"], Address("Amsterdam")),
+    Person(4, "carol", 25, ["c"], Address("Cairo")),
+]
+
+specifications = [
+    Specification.parse(name="alice"),
+    Specification.parse(name__neq="alice"),
+    Specification.parse(age__lt=30),
+    Specification.parse(age__lte=30),
+    Specification.parse(age__gt=25),
+    Specification.parse(age__gte=30),
+    Specification.parse(id__in=[1, 4]),
+    Specification.parse(tags__contains="b"),
+    Specification.parse(name__matches="^[ab]"),
+    Specification.parse(address__city="Amsterdam"),
+    Specification.parse(_lookup_separator="__", address__city="Cairo"),
+    IsNoneSpecification("name"),
+    Specification.parse(name="bob", age=25),
+    Specification.parse(name="bob") | Specification.parse(age__gt=30),
+    Specification.Not(Specification.parse(age=25) | IsNoneSpecification("name")),
+    AndSpecification([]),
+    OrSpecification([]),
+    EmptySpecification(),
+]
+
+
+@pytest.mark.parametrize("specification", specifications, ids=str)
+def test_compiled_matches_is_satisfied_by(specification):
+    is_match = compile_specification(specification)
+
+    for person in people:
+        assert bool(is_match(person)) == bool(specification.is_satisfied_by(person))
+
+
+def test_compiled_pre_processor():
+    specification = EqualsSpecification("name", "ALICE")
+    specification.pre_processor = lambda v: v.upper() if v else v
+
+    assert [p.id for p in people if compile_specification(specification)(p)] == [1]
+
+
+def test_compiled_subclass_uses_own_is_satisfied_by():
+    class StartsWith(ContainsSpecification):
+        def is_satisfied_by(self, obj):
+            return (obj.name or "").startswith(self.value)
+
+    specification = StartsWith("name", "ca") & Specification.parse(age=25)
+
+    assert [p.id for p in people if compile_specification(specification)(p)] == [4]
+
+
+def test_compiled_raises_like_is_satisfied_by():
+    specification = Specification.parse(missing=1)
+
+    with pytest.raises(AttributeError):
+        specification.is_satisfied_by(people[0])
+    with pytest.raises(AttributeError):
+        compile_specification(specification)(people[0])
+
+    specification = Specification.parse(name__gt="a")
+    with pytest.raises(TypeError):
+        compile_specification(specification)(people[2])
+
+
+def test_compiled_field_names_are_not_code():
+    specification = EqualsSpecification("name) or (True", "x")
+
+    with pytest.raises(AttributeError):
+        compile_specification(specification)(people[0])
+
+
+def test_compiled_code_is_shared_per_shape():
+    first = compile_specification(Specification.parse(name="alice", age__gt=1))
+    second = compile_specification(Specification.parse(name="bob", age__gt=20))
+    other = compile_specification(Specification.parse(name="bob", age__lt=20))
+
+    assert first.__code__ is second.__code__
+    assert first.__code__ is not other.__code__
+    assert [p.id for p in people if first(p)] == [1]
+    assert [p.id for p in people if second(p)] == [2]
+
+
+def test_compiled_regex_matches_lazily():
+    # Like is_satisfied_by, an invalid pattern only fails when evaluated.
+    is_match = compile_specification(RegexStringMatchSpecification("name", "("))
+
+    with pytest.raises(re.error):
+        is_match(people[0])